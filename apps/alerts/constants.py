@@ -2,6 +2,11 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 
 ISSUE_IDS_KEY = "alert_issue_ids"
+ALERT_DIGEST_KEY = "alert_digest:{}"
+ISSUE_COUNTS_KEY = "alert_issue_counts:{}"
+# Alerts with a longer timespan are evaluated against the database
+ISSUE_COUNTS_MINUTES = 1440
+
 
 class RecipientType(models.TextChoices):
     EMAIL = "email", _("Email")
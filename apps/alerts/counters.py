@@ -0,0 +1,78 @@
+"""
+Sliding window issue event counters for alerts
+
+At ingest, events are counted per issue in per minute redis hashes of issue id
+to event count. Alert evaluation sums the minute buckets of an alert's timespan,
+so it never needs to aggregate IssueEvent. Buckets expire once they are older
+than the longest window they may serve.
+
+Counters start empty, when first deployed or after redis data is lost, and
+only count events ingested since. Until a window's timespan has passed, up to
+ISSUE_COUNTS_MINUTES, its alerts may under count and fire late or not at all.
+"""
+
+from collections import defaultdict
+from datetime import datetime
+
+from django_redis import get_redis_connection
+
+from .constants import ISSUE_COUNTS_KEY, ISSUE_COUNTS_MINUTES
+
+
+def _get_minute(value: datetime) -> int:
+    return int(value.timestamp()) // 60
+
+
+def _get_key(minute: int) -> str:
+    return ISSUE_COUNTS_KEY.format(minute)
+
+
+def increment_issue_counts(issue_events: list[tuple[int, datetime]]):
+    """Count (issue id, received) pairs into their minute buckets"""
+    counts: defaultdict[int, defaultdict[int, int]] = defaultdict(
+        lambda: defaultdict(int)
+    )
+    for issue_id, received in issue_events:
+        counts[_get_minute(received)][issue_id] += 1
+    if not counts:
+        return
+
+    with get_redis_connection("default") as con:
+        pipe = con.pipeline(transaction=False)
+        for minute, issue_counts in sorted(counts.items()):
+            key = _get_key(minute)
+            for issue_id, count in issue_counts.items():
+                pipe.hincrby(key, issue_id, count)
+            pipe.expireat(key, (minute + ISSUE_COUNTS_MINUTES + 1) * 60)
+        pipe.execute()
+
+
+def get_window_counts(
+    issue_ids: list[int], timespans: set[int], now: datetime
+) -> dict[int, dict[int, int]]:
+    """
+    Get event counts per issue for each timespan in minutes, ending now
+
+    A window includes the partial minute at its start, matching a query on
+    received >= now - timespan to the minute.
+    """
+    if not issue_ids or not timespans:
+        return {}
+    current = _get_minute(now)
+    longest = max(timespans)
+    with get_redis_connection("default") as con:
+        pipe = con.pipeline(transaction=False)
+        for minute in range(current, current - longest - 1, -1):
+            pipe.hmget(_get_key(minute), issue_ids)
+        buckets = pipe.execute()
+
+    totals = dict.fromkeys(issue_ids, 0)
+    result: dict[int, dict[int, int]] = {}
+    # Buckets are newest first, accumulate until each timespan is reached
+    for age, bucket in enumerate(buckets):
+        for issue_id, count in zip(issue_ids, bucket):
+            if count is not None:
+                totals[issue_id] += int(count)
+        if age in timespans:
+            result[age] = totals.copy()
+    return result
@@ -14,8 +14,8 @@ class AlertEmail(GlitchTipEmail):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        notification = self.notification
-        first_issue = notification.issues.all().first()
+        payload = self.notification.payload
+        first_issue = payload.first_issue
         base_url = settings.GLITCHTIP_URL.geturl()
         org_slug = first_issue.project.organization.slug
         issue_link = f"{base_url}/{org_slug}/issues/{first_issue.id}"
@@ -26,8 +26,8 @@ class AlertEmail(GlitchTipEmail):
         context["project_name"] = first_issue.project
         context["first_issue"] = first_issue
         context["issue_link"] = issue_link
-        context["issues"] = notification.issues.all()
-        context["issue_count"] = notification.issues.count()
+        context["issues"] = payload.issues
+        context["issue_count"] = payload.issue_count
         context["project_notification_settings_link"] = settings_link
         context["org_slug"] = org_slug
         context[
@@ -1,10 +1,13 @@
 from django.db import models
+from django.utils.functional import cached_property
 
 from glitchtip.base_models import CreatedModel
 
 from .constants import RecipientType
 from .email import send_email_notification
-from .webhooks import send_webhook_notification
+from .payload import NotificationPayload, build_notification_payload
+from .throttle import is_rate_limited
+from .webhooks import send_webhook_notifications
 
 
 class ProjectAlert(CreatedModel):
@@ -43,7 +46,7 @@ class AlertRecipient(models.Model):
         if self.recipient_type == RecipientType.EMAIL:
             send_email_notification(notification)
         elif self.is_webhook:
-            send_webhook_notification(notification, self.url, self.recipient_type)
+            send_webhook_notifications(notification, [self])
 
 
 class Notification(CreatedModel):
@@ -51,11 +54,25 @@ class Notification(CreatedModel):
     is_sent = models.BooleanField(default=False)
     issues = models.ManyToManyField("issue_events.Issue")
 
+    @cached_property
+    def payload(self) -> NotificationPayload:
+        """Issue data shared by all recipients of this notification"""
+        return build_notification_payload(self.issues.all())
+
     def send_notifications(self):
-        for recipient in self.project_alert.alertrecipient_set.all():
-            recipient.send(self)
+        recipients = list(self.project_alert.alertrecipient_set.all())
         # Temp backwards compat hack - no recipients means not set up yet
-        if self.project_alert.alertrecipient_set.all().exists() is False:
+        if not recipients:
             send_email_notification(self)
+        recipients = [
+            recipient for recipient in recipients if not is_rate_limited(recipient)
+        ]
+        for recipient in recipients:
+            if not recipient.is_webhook:
+                recipient.send(self)
+        # Webhooks are delivered concurrently, one slow endpoint delays no other
+        send_webhook_notifications(
+            self, [recipient for recipient in recipients if recipient.is_webhook]
+        )
         self.is_sent = True
         self.save()
@@ -0,0 +1,49 @@
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db.models import OuterRef, QuerySet, Subquery
+
+from apps.issue_events.models import Issue, IssueTag
+
+
+def _latest_tag_value(key: str) -> Subquery:
+    return Subquery(
+        IssueTag.objects.filter(issue=OuterRef("pk"), tag_key__key=key)
+        .order_by("-date")
+        .values("tag_value__value")[:1]
+    )
+
+
+def with_notification_details(queryset: QuerySet[Issue]) -> QuerySet[Issue]:
+    """
+    Load everything notifications display about issues in the issue query itself:
+    project, organization (for links) and latest environment and release tags
+    """
+    return queryset.select_related("project__organization").annotate(
+        latest_environment=_latest_tag_value("environment"),
+        latest_release=_latest_tag_value("release"),
+    )
+
+
+@dataclass
+class NotificationPayload:
+    issues: list[Issue]
+    issue_count: int
+
+    @property
+    def first_issue(self) -> Issue:
+        return self.issues[0]
+
+
+def build_notification_payload(queryset: QuerySet[Issue]) -> NotificationPayload:
+    """
+    Fetch the issues shared by every notification channel, up to
+    MAX_ISSUES_PER_ALERT, in two queries
+    """
+    issue_count = queryset.count()
+    issues = list(
+        with_notification_details(queryset.order_by("id"))[
+            : settings.MAX_ISSUES_PER_ALERT
+        ]
+    )
+    return NotificationPayload(issues=issues, issue_count=issue_count)
@@ -1,15 +1,18 @@
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 from celery import shared_task
 from django.conf import settings
+from django.core.cache import cache
 from django.db.models import Count
 from django.utils import timezone
 from django_redis import get_redis_connection
 
 from apps.issue_events.models import Issue
 
-from .constants import ISSUE_IDS_KEY
+from .constants import ALERT_DIGEST_KEY, ISSUE_COUNTS_MINUTES, ISSUE_IDS_KEY
+from .counters import get_window_counts
 from .models import Notification, ProjectAlert
+from .payload import build_notification_payload
 
 # Lua script for atomic smembers + del
 LUA_SCRIPT = """
@@ -19,10 +22,69 @@ return members
 """
 
 
+def queue_notification(notification: Notification):
+    """
+    Send a notification, or with ALERT_DIGEST_WINDOW, coalesce it with the alert's
+    other notifications in the window into one digest delivery
+    """
+    window = settings.ALERT_DIGEST_WINDOW
+    if not window:
+        send_notification.delay(notification.pk)
+        return
+    # The first notification in a window schedules the digest, later ones join it
+    key = ALERT_DIGEST_KEY.format(notification.project_alert_id)
+    if cache.add(key, True, window):
+        send_alert_digest.apply_async(
+            args=(notification.project_alert_id,), countdown=window
+        )
+
+
 def process_alert(project_alert_id: int, issue_ids: list[int]):
     notification = Notification.objects.create(project_alert_id=project_alert_id)
     notification.issues.add(*issue_ids)
-    send_notification.delay(notification.pk)
+    queue_notification(notification)
+
+
+def process_windowed_alerts(
+    project_alerts: list[ProjectAlert], issue_ids: list[int], now: datetime
+):
+    """
+    Evaluate alerts against the redis per minute issue counters, with a fixed
+    number of queries regardless of the quantity of alerts
+    """
+    if not project_alerts:
+        return
+    issue_projects = dict(
+        Issue.objects.filter(
+            id__in=issue_ids,
+            project_id__in={alert.project_id for alert in project_alerts},
+        ).values_list("id", "project_id")
+    )
+    if not issue_projects:
+        return  # Issues were deleted since their events were counted
+    notified = set(
+        Notification.issues.through.objects.filter(
+            notification__project_alert__in=project_alerts,
+            issue_id__in=issue_projects.keys(),
+        ).values_list("notification__project_alert_id", "issue_id")
+    )
+    window_counts = get_window_counts(
+        list(issue_projects.keys()),
+        {alert.timespan_minutes for alert in project_alerts},
+        now,
+    )
+
+    for alert in project_alerts:
+        counts = window_counts[alert.timespan_minutes]
+        alert_issue_ids = [
+            issue_id
+            for issue_id, project_id in issue_projects.items()
+            if project_id == alert.project_id
+            and (alert.id, issue_id) not in notified
+            and counts[issue_id] >= alert.quantity
+        ]
+        if alert_issue_ids:
+            process_alert(alert.id, alert_issue_ids)
 
 
 @shared_task
@@ -46,9 +108,18 @@ def process_event_alerts():
         return  # There are no new issues, no work to do
 
     if issue_ids:
-        project_alerts = project_alerts.filter(
-            project__issues__id__in=issue_ids
-        ).distinct()
+        project_alerts = list(
+            project_alerts.filter(project__issues__id__in=issue_ids).distinct()
+        )
+        windowed_alerts = [
+            alert
+            for alert in project_alerts
+            if alert.timespan_minutes <= ISSUE_COUNTS_MINUTES
+        ]
+        process_windowed_alerts(windowed_alerts, issue_ids, now)
+        project_alerts = [
+            alert for alert in project_alerts if alert not in windowed_alerts
+        ]
 
     for alert in project_alerts:
         start_time = now - timedelta(minutes=alert.timespan_minutes)
@@ -67,10 +138,37 @@ def process_event_alerts():
         if issues:
             notification = alert.notification_set.create()
             notification.issues.add(*issues)
-            send_notification.delay(notification.pk)
+            queue_notification(notification)
 
 
 @shared_task
 def send_notification(notification_id: int):
-    notification = Notification.objects.get(pk=notification_id)
+    notification = Notification.objects.select_related("project_alert").get(
+        pk=notification_id
+    )
+    notification.send_notifications()
+
+
+@shared_task
+def send_alert_digest(project_alert_id: int):
+    """
+    Send all unsent notifications of an alert as one delivery per recipient.
+    Each notification keeps its own issues, the digest shows their union.
+    """
+    # Notifications created from now on schedule the next digest
+    cache.delete(ALERT_DIGEST_KEY.format(project_alert_id))
+    notification_ids = list(
+        Notification.objects.filter(
+            project_alert_id=project_alert_id, is_sent=False
+        ).values_list("pk", flat=True)
+    )
+    if not notification_ids:
+        return
+    notification = Notification.objects.select_related("project_alert").get(
+        pk=max(notification_ids)
+    )
+    notification.payload = build_notification_payload(
+        Issue.objects.filter(notification__in=notification_ids).distinct()
+    )
     notification.send_notifications()
+    Notification.objects.filter(pk__in=notification_ids).update(is_sent=True)
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from unittest import mock
+
+from django.test import TestCase
+from freezegun import freeze_time
+from model_bakery import baker
+
+from glitchtip.test_utils.fake_redis import FakeRedis
+
+from ..constants import ISSUE_COUNTS_MINUTES
+from ..counters import get_window_counts, increment_issue_counts
+from ..models import Notification
+from ..tasks import process_windowed_alerts
+
+
+class IssueCountersTestCase(TestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+        patcher = mock.patch(
+            "apps.alerts.counters.get_redis_connection", return_value=self.redis
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.now = datetime(2024, 1, 1, 12, 0, 30, tzinfo=dt_timezone.utc)
+        freezer = freeze_time(self.now)
+        freezer.start()
+        self.addCleanup(freezer.stop)
+
+    def test_window_edges(self):
+        increment_issue_counts(
+            [
+                (1, self.now),
+                (1, self.now - timedelta(minutes=9)),
+                # The partial minute at the start of a 10 minute window counts
+                (1, self.now - timedelta(minutes=10, seconds=30)),
+                (1, self.now - timedelta(minutes=10, seconds=31)),
+                (2, self.now - timedelta(minutes=5)),
+            ]
+        )
+        counts = get_window_counts([1, 2, 3], {1, 10}, self.now)
+        self.assertEqual(counts[1], {1: 1, 2: 0, 3: 0})
+        self.assertEqual(counts[10], {1: 3, 2: 1, 3: 0})
+
+    def test_bucket_expiry(self):
+        increment_issue_counts([(1, self.now)])
+        later = self.now + timedelta(minutes=ISSUE_COUNTS_MINUTES)
+        with freeze_time(later):
+            counts = get_window_counts([1], {ISSUE_COUNTS_MINUTES}, later)
+            self.assertEqual(counts[ISSUE_COUNTS_MINUTES][1], 1)
+        # Expired once no window can include the bucket
+        with freeze_time(later + timedelta(minutes=1)):
+            self.assertEqual(self.redis.keys(), [])
+
+    def test_alert_quantity(self):
+        project = baker.make("projects.Project")
+        alert = baker.make(
+            "alerts.ProjectAlert", project=project, timespan_minutes=5, quantity=3
+        )
+        issue, other_issue = baker.make(
+            "issue_events.Issue", project=project, _quantity=2
+        )
+        increment_issue_counts([(issue.id, self.now)] * 3)
+        increment_issue_counts([(other_issue.id, self.now)] * 2)
+        process_windowed_alerts([alert], [issue.id, other_issue.id], self.now)
+        notification = Notification.objects.get()
+        self.assertEqual(list(notification.issues.all()), [issue])
@@ -1,7 +1,10 @@
 import json
 from datetime import timedelta
+from unittest import mock
 
 from django.core import mail
+from django.core.cache import cache
+from django.test import override_settings
 from django.urls import reverse
 from django.utils import timezone
 from freezegun import freeze_time
@@ -13,7 +16,7 @@ from apps.projects.models import ProjectAlertStatus
 from glitchtip.test_utils.test_case import GlitchTipTestCase
 
 from ..models import Notification
-from ..tasks import process_event_alerts
+from ..tasks import process_event_alerts, process_windowed_alerts, send_alert_digest
 
 
 class AlertTestCase(GlitchTipTestCase):
@@ -214,6 +217,65 @@ class AlertTestCase(GlitchTipTestCase):
         with self.assertNumQueries(5):
             process_event_alerts()
 
+    @override_settings(ALERT_DIGEST_WINDOW=60)
+    def test_alert_digest(self):
+        alert = baker.make(
+            "alerts.ProjectAlert",
+            project=self.project,
+            timespan_minutes=1,
+            quantity=1,
+        )
+        cache.clear()
+        with mock.patch("apps.alerts.tasks.send_alert_digest.apply_async") as digest:
+            issue1 = baker.make("issue_events.Issue", project=self.project)
+            baker.make("issue_events.IssueEvent", issue=issue1)
+            process_event_alerts()
+            issue2 = baker.make("issue_events.Issue", project=self.project)
+            baker.make("issue_events.IssueEvent", issue=issue2)
+            process_event_alerts()
+        # Only the first notification in the window schedules a digest
+        digest.assert_called_once()
+        self.assertEqual(Notification.objects.count(), 2)
+        self.assertEqual(len(mail.outbox), 0)
+
+        send_alert_digest(alert.pk)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("2 errors reported", mail.outbox[0].subject)
+        self.assertFalse(Notification.objects.filter(is_sent=False).exists())
+        # Notifications keep their own issues
+        self.assertEqual(
+            list(Notification.objects.values_list("issues", flat=True).order_by("pk")),
+            [issue1.pk, issue2.pk],
+        )
+
+    @override_settings(ALERT_RATE_LIMITS={"email": 1})
+    def test_alert_rate_limit(self):
+        alert = baker.make(
+            "alerts.ProjectAlert",
+            project=self.project,
+            timespan_minutes=1,
+            quantity=1,
+        )
+        baker.make("alerts.AlertRecipient", alert=alert, recipient_type="email")
+        cache.clear()
+        for _i in range(2):
+            baker.make("issue_events.IssueEvent", issue__project=self.project)
+            process_event_alerts()
+        self.assertEqual(Notification.objects.count(), 2)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_windowed_alert_deleted_issue(self):
+        alert = baker.make(
+            "alerts.ProjectAlert",
+            project=self.project,
+            timespan_minutes=1,
+            quantity=1,
+        )
+        # The id of an issue removed after its events were counted
+        issue_id = baker.make("issue_events.Issue", project=self.project).id + 1
+        process_windowed_alerts([alert], [issue_id], timezone.now())
+        self.assertEqual(Notification.objects.count(), 0)
+
 
 class AlertWithUserProjectAlert(GlitchTipTestCase):
     def setUp(self):
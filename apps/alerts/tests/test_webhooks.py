@@ -2,9 +2,12 @@ import json
 from datetime import datetime
 from unittest import mock
 
+import aiohttp
+from aioresponses import aioresponses
 from model_bakery import baker
 
 from apps.issue_events.constants import LogLevel
+from apps.issue_events.models import Issue
 from apps.uptime.constants import MonitorType
 from apps.uptime.models import Monitor, MonitorCheck
 from apps.uptime.webhooks import send_uptime_as_webhook
@@ -12,8 +15,11 @@ from glitchtip.test_utils.test_case import GlitchTipTestCase
 
 from ..constants import RecipientType
 from ..models import AlertRecipient, Notification
-from ..tasks import process_event_alerts
+from ..payload import with_notification_details
+from ..tasks import process_event_alerts, send_notification
 from ..webhooks import (
+    WebhookRequest,
+    post_webhooks,
     send_issue_as_discord_webhook,
     send_issue_as_googlechat_webhook,
     send_issue_as_webhook,
@@ -59,9 +65,56 @@ class WebhookTestCase(GlitchTipTestCase):
             tag_key=key_release,
             tag_value=release_value,
         )
-        return issue
-
-    @mock.patch("requests.post")
+        return with_notification_details(Issue.objects.filter(pk=issue.pk)).get()
+
+    @aioresponses()
+    def test_post_webhooks(self, mocked):
+        mocked.post(TEST_URL, status=500)
+        mocked.post(TEST_URL, status=200)
+        for _i in range(3):
+            mocked.post(DISCORD_TEST_URL, exception=aiohttp.ClientConnectionError())
+
+        with mock.patch("apps.alerts.webhooks.WEBHOOK_BACKOFF", 0):
+            results = post_webhooks(
+                [
+                    WebhookRequest(TEST_URL, {"text": "test"}),
+                    WebhookRequest(DISCORD_TEST_URL, {"content": "test"}),
+                ]
+            )
+        # Server error is retried, a failing recipient does not affect others
+        self.assertEqual(results[0], 200)
+        self.assertIsInstance(results[1], aiohttp.ClientConnectionError)
+
+    @mock.patch("apps.alerts.webhooks.apost_webhook")
+    def test_notification_queries(self, mock_post):
+        """Queries should not scale with the number of issues or recipients"""
+        alert = baker.make("alerts.ProjectAlert", project=self.project)
+        baker.make(AlertRecipient, alert=alert, recipient_type=RecipientType.EMAIL)
+        for recipient_type, url in [
+            (RecipientType.GENERAL_WEBHOOK, TEST_URL),
+            (RecipientType.DISCORD, DISCORD_TEST_URL),
+            (RecipientType.GOOGLE_CHAT, GOOGLE_CHAT_TEST_URL),
+        ]:
+            baker.make(AlertRecipient, alert=alert, recipient_type=recipient_type, url=url)
+        key = baker.make("issue_events.TagKey", key="environment")
+        value = baker.make("issue_events.TagValue", value=self.environment_name)
+
+        for quantity in [1, 5]:
+            issues = baker.make(
+                "issue_events.Issue", project=self.project, _quantity=quantity
+            )
+            for issue in issues:
+                baker.make(
+                    "issue_events.IssueTag", issue=issue, tag_key=key, tag_value=value
+                )
+            notification = baker.make(Notification, project_alert=alert)
+            notification.issues.add(*issues)
+            with self.assertNumQueries(8):
+                send_notification(notification.pk)
+        self.assertEqual(mock_post.call_count, 6)
+        self.assertIn(self.environment_name, json.dumps(mock_post.call_args.args[1].payload))
+
+    @mock.patch("apps.alerts.webhooks.apost_webhook")
     def test_send_webhook(self, mock_post):
         send_webhook(
             TEST_URL,
@@ -69,18 +122,21 @@ class WebhookTestCase(GlitchTipTestCase):
         )
         mock_post.assert_called_once()
 
-    @mock.patch("requests.post")
+    @mock.patch("apps.alerts.webhooks.apost_webhook")
     def test_send_issue_as_webhook(self, mock_post):
         issue = self.generate_issue_with_tags()
         issue2 = baker.make("issue_events.Issue", level=LogLevel.ERROR, short_id=2)
         issue3 = baker.make("issue_events.Issue", level=LogLevel.NOTSET)
 
-        send_issue_as_webhook(TEST_URL, [issue, issue2, issue3], 3)
+        issues = with_notification_details(
+            Issue.objects.filter(pk__in=[issue.pk, issue2.pk, issue3.pk]).order_by("pk")
+        )
+        send_issue_as_webhook(TEST_URL, issues, 3)
 
         mock_post.assert_called_once()
 
         first_issue_json_data = json.dumps(
-            mock_post.call_args.kwargs["json"]["attachments"][0]
+            mock_post.call_args.args[1].payload["attachments"][0]
         )
         self.assertIn(
             f'"title": "Environment", "value": "{self.environment_name}"',
@@ -90,7 +146,7 @@ class WebhookTestCase(GlitchTipTestCase):
             f'"title": "Release", "value": "{self.release_name}"', first_issue_json_data
         )
 
-    @mock.patch("requests.post")
+    @mock.patch("apps.alerts.webhooks.apost_webhook")
     def test_trigger_webhook(self, mock_post):
         project = baker.make("projects.Project")
         alert = baker.make(
@@ -121,30 +177,30 @@ class WebhookTestCase(GlitchTipTestCase):
         )
         mock_post.assert_called_once()
         self.assertIn(
-            issue.title, mock_post.call_args[1]["json"]["sections"][0]["activityTitle"]
+            issue.title, mock_post.call_args.args[1].payload["sections"][0]["activityTitle"]
         )
 
-    @mock.patch("requests.post")
+    @mock.patch("apps.alerts.webhooks.apost_webhook")
     def test_send_issue_with_tags_as_discord_webhook(self, mock_post):
         issue = self.generate_issue_with_tags()
         send_issue_as_discord_webhook(DISCORD_TEST_URL, [issue])
 
         mock_post.assert_called_once()
 
-        json_data = json.dumps(mock_post.call_args.kwargs["json"])
+        json_data = json.dumps(mock_post.call_args.args[1].payload)
         self.assertIn(
             f'"name": "Environment", "value": "{self.environment_name}"', json_data
         )
         self.assertIn(f'"name": "Release", "value": "{self.release_name}"', json_data)
 
-    @mock.patch("requests.post")
+    @mock.patch("apps.alerts.webhooks.apost_webhook")
     def test_send_issue_with_tags_as_googlechat_webhook(self, mock_post):
         issue = self.generate_issue_with_tags()
         send_issue_as_googlechat_webhook(GOOGLE_CHAT_TEST_URL, [issue])
 
         mock_post.assert_called_once()
 
-        json_data = json.dumps(mock_post.call_args.kwargs["json"])
+        json_data = json.dumps(mock_post.call_args.args[1].payload)
         self.assertIn(
             f'"topLabel": "Release", "text": "{self.release_name}"', json_data
         )
@@ -153,7 +209,7 @@ class WebhookTestCase(GlitchTipTestCase):
             json_data,
         )
 
-    @mock.patch("requests.post")
+    @mock.patch("apps.alerts.webhooks.apost_webhook")
     def test_send_uptime_events_generic_webhook(self, mock_post):
         recipient = baker.make(AlertRecipient, recipient_type=RecipientType.GENERAL_WEBHOOK, url=TEST_URL)
 
@@ -165,7 +221,7 @@ class WebhookTestCase(GlitchTipTestCase):
         )
 
         mock_post.assert_called_once()
-        json_data = json.dumps(mock_post.call_args.kwargs["json"])
+        json_data = json.dumps(mock_post.call_args.args[1].payload)
         self.assertIn(f'"text": "{self.expected_subject}"', json_data)
         self.assertIn(f'"title": "{self.monitor.name}"', json_data)
         self.assertIn(f'"text": "{self.expected_message_down}"', json_data)
@@ -180,12 +236,12 @@ class WebhookTestCase(GlitchTipTestCase):
         )
 
         mock_post.assert_called_once()
-        json_data = json.dumps(mock_post.call_args.kwargs["json"])
+        json_data = json.dumps(mock_post.call_args.args[1].payload)
         self.assertIn(f'"text": "{self.expected_subject}"', json_data)
         self.assertIn(f'"title": "{self.monitor.name}"', json_data)
         self.assertIn(f'"text": "{self.expected_message_up}"', json_data)
 
-    @mock.patch("requests.post")
+    @mock.patch("apps.alerts.webhooks.apost_webhook")
     def test_send_uptime_events_google_chat_webhook(self, mock_post):
         recipient = baker.make(AlertRecipient, recipient_type=RecipientType.GOOGLE_CHAT, url=GOOGLE_CHAT_TEST_URL)
 
@@ -197,7 +253,7 @@ class WebhookTestCase(GlitchTipTestCase):
         )
 
         mock_post.assert_called_once()
-        json_data = json.dumps(mock_post.call_args.kwargs["json"])
+        json_data = json.dumps(mock_post.call_args.args[1].payload)
         self.assertIn(f'"title": "{self.expected_subject}", "subtitle": "{self.monitor.name}"', json_data)
         self.assertIn(f'"text": "{self.expected_message_down}"', json_data)
 
@@ -211,11 +267,11 @@ class WebhookTestCase(GlitchTipTestCase):
         )
 
         mock_post.assert_called_once()
-        json_data = json.dumps(mock_post.call_args.kwargs["json"])
+        json_data = json.dumps(mock_post.call_args.args[1].payload)
         self.assertIn(f'"title": "{self.expected_subject}", "subtitle": "{self.monitor.name}"', json_data)
         self.assertIn(f'"text": "{self.expected_message_up}"', json_data)
 
-    @mock.patch("requests.post")
+    @mock.patch("apps.alerts.webhooks.apost_webhook")
     def test_send_uptime_events_discord_webhook(self, mock_post):
         recipient = baker.make(AlertRecipient, recipient_type=RecipientType.DISCORD, url=DISCORD_TEST_URL)
 
@@ -227,7 +283,7 @@ class WebhookTestCase(GlitchTipTestCase):
         )
 
         mock_post.assert_called_once()
-        json_data = json.dumps(mock_post.call_args.kwargs["json"])
+        json_data = json.dumps(mock_post.call_args.args[1].payload)
         self.assertIn(f'"content": "{self.expected_subject}"', json_data)
         self.assertIn(f'"title": "{self.monitor.name}", "description": "{self.expected_message_down}"', json_data)
 
@@ -241,6 +297,6 @@ class WebhookTestCase(GlitchTipTestCase):
         )
 
         mock_post.assert_called_once()
-        json_data = json.dumps(mock_post.call_args.kwargs["json"])
+        json_data = json.dumps(mock_post.call_args.args[1].payload)
         self.assertIn(f'"content": "{self.expected_subject}"', json_data)
         self.assertIn(f'"title": "{self.monitor.name}", "description": "{self.expected_message_up}"', json_data)
@@ -0,0 +1,33 @@
+import logging
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+if TYPE_CHECKING:
+    from .models import AlertRecipient
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_KEY = "alert_rate_limit:{}:{}"
+
+
+def is_rate_limited(recipient: "AlertRecipient") -> bool:
+    """
+    Count a delivery to the recipient in the current hour. Returns True when
+    the recipient's channel limit is exceeded, and the delivery should be skipped.
+    """
+    limit = settings.ALERT_RATE_LIMITS.get(recipient.recipient_type)
+    if not limit:
+        return False
+    key = RATE_LIMIT_KEY.format(recipient.pk, timezone.now().strftime("%Y%m%d%H"))
+    cache.add(key, 0, 3600)
+    try:
+        count = cache.incr(key)
+    except ValueError:  # Expired between add and incr
+        return False
+    if count > limit:
+        logger.warning("Alert recipient %s is rate limited", recipient.pk)
+        return True
+    return False
@@ -1,14 +1,90 @@
+import asyncio
+import logging
 from dataclasses import asdict, dataclass, field
 from typing import TYPE_CHECKING
 
-import requests
+import aiohttp
+from aiohttp import ClientTimeout
+from asgiref.sync import async_to_sync
 from django.conf import settings
-from django.db.models import F
 
 from .constants import RecipientType
 
 if TYPE_CHECKING:
-    from .models import Notification
+    from .models import AlertRecipient, Notification
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_TIMEOUT = 10  # Seconds
+WEBHOOK_RETRIES = 2
+WEBHOOK_BACKOFF = 1  # Seconds, doubled on each retry
+WEBHOOK_MAX_RETRY_AFTER = 30  # Seconds
+WEBHOOK_LIMIT = 100  # Concurrent connections
+WEBHOOK_LIMIT_PER_HOST = 4
+
+
+@dataclass
+class WebhookRequest:
+    url: str
+    payload: dict
+
+
+def _get_retry_delay(attempt: int, response: aiohttp.ClientResponse | None) -> float:
+    """Exponential backoff, unless the server asks for a (short) Retry-After"""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(int(retry_after), WEBHOOK_MAX_RETRY_AFTER)
+    return WEBHOOK_BACKOFF * 2**attempt
+
+
+async def apost_webhook(session: aiohttp.ClientSession, request: WebhookRequest) -> int:
+    """
+    Post a webhook, retrying connection errors, timeouts, 429 and 5xx responses.
+    Returns the final response status.
+    """
+    attempt = 0
+    while True:
+        response = None
+        try:
+            async with session.post(request.url, json=request.payload) as response:
+                is_retryable = response.status == 429 or response.status >= 500
+                if not is_retryable or attempt == WEBHOOK_RETRIES:
+                    return response.status
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if attempt == WEBHOOK_RETRIES:
+                raise
+        await asyncio.sleep(_get_retry_delay(attempt, response))
+        attempt += 1
+
+
+async def apost_webhooks(requests: list[WebhookRequest]) -> list[int | BaseException]:
+    """
+    Post webhooks concurrently over one pooled session. A slow or failing
+    endpoint does not delay the others. Connections are limited per host to
+    avoid flooding any one service. Failures are logged and returned.
+    """
+    if not requests:
+        return []
+    connector = aiohttp.TCPConnector(
+        limit=WEBHOOK_LIMIT, limit_per_host=WEBHOOK_LIMIT_PER_HOST
+    )
+    async with aiohttp.ClientSession(
+        connector=connector,
+        timeout=ClientTimeout(total=WEBHOOK_TIMEOUT),
+        headers={"User-Agent": "GlitchTip/" + settings.GLITCHTIP_VERSION},
+    ) as session:
+        results = await asyncio.gather(
+            *[apost_webhook(session, request) for request in requests],
+            return_exceptions=True,
+        )
+    for request, result in zip(requests, results):
+        if isinstance(result, BaseException):
+            logger.warning("Webhook to %s failed: %r", request.url, result)
+    return results
+
+
+post_webhooks = async_to_sync(apost_webhooks)
 
 
 @dataclass
@@ -48,12 +124,11 @@ class WebhookPayload:
     sections: list[MSTeamsSection]
 
 
-def send_webhook(
-    url: str,
+def get_webhook_payload(
     message: str,
     attachments: list[WebhookAttachment] | None = None,
     sections: list[MSTeamsSection] | None = None,
-):
+) -> dict:
     if not attachments:
         attachments = []
     if not sections:
@@ -61,16 +136,24 @@ def send_webhook(
     data = WebhookPayload(
         alias="GlitchTip", text=message, attachments=attachments, sections=sections
     )
-    return requests.post(
-        url, json=asdict(data), headers={"Content-type": "application/json"}, timeout=10
-    )
+    return asdict(data)
 
 
-def send_issue_as_webhook(url, issues: list, issue_count: int = 1):
+def send_webhook(
+    url: str,
+    message: str,
+    attachments: list[WebhookAttachment] | None = None,
+    sections: list[MSTeamsSection] | None = None,
+):
+    payload = get_webhook_payload(message, attachments, sections)
+    return post_webhooks([WebhookRequest(url, payload)])[0]
+
+
+def get_issue_webhook_payload(issues: list, issue_count: int = 1) -> dict:
     """
     Notification about issues via webhook.
-    url: Webhook URL
-    issues: This should be only the issues to send as attachment
+    issues: This should be only the issues to send as attachment, loaded
+    with_notification_details
     issue_count - total issues, may be greater than len(issues)
     """
     attachments: list[WebhookAttachment] = []
@@ -83,29 +166,19 @@ def send_issue_as_webhook(url, issues: list, issue_count: int = 1):
                 short=True,
             )
         ]
-        environment = (
-            issue.issuetag_set.filter(tag_key__key="environment")
-            .values(value=F("tag_value__value"))
-            .first()
-        )
-        if environment:
+        if issue.latest_environment:
             fields.append(
                 WebhookAttachmentField(
                     title="Environment",
-                    value=environment["value"],
+                    value=issue.latest_environment,
                     short=True,
                 )
             )
-        release = (
-            issue.issuetag_set.filter(tag_key__key="release")
-            .values(value=F("tag_value__value"))
-            .first()
-        )
-        if release:
+        if issue.latest_release:
             fields.append(
                 WebhookAttachmentField(
                     title="Release",
-                    value=release["value"],
+                    value=issue.latest_release,
                     short=False,
                 )
             )
@@ -128,7 +201,12 @@ def send_issue_as_webhook(url, issues: list, issue_count: int = 1):
     message = "GlitchTip Alert"
     if issue_count > 1:
         message += f" ({issue_count} issues)"
-    return send_webhook(url, message, attachments, sections)
+    return get_webhook_payload(message, attachments, sections)
+
+
+def send_issue_as_webhook(url, issues: list, issue_count: int = 1):
+    payload = get_issue_webhook_payload(issues, issue_count)
+    return post_webhooks([WebhookRequest(url, payload)])[0]
 
 
 @dataclass
@@ -153,7 +231,7 @@ class DiscordWebhookPayload:
     embeds: list[DiscordEmbed]
 
 
-def send_issue_as_discord_webhook(url, issues: list, issue_count: int = 1):
+def get_issue_discord_webhook_payload(issues: list, issue_count: int = 1) -> dict:
     embeds: list[DiscordEmbed] = []
 
     for issue in issues:
@@ -164,29 +242,19 @@ def send_issue_as_discord_webhook(url, issues: list, issue_count: int = 1):
                 inline=True,
             )
         ]
-        environment = (
-            issue.issuetag_set.filter(tag_key__key="environment")
-            .values(value=F("tag_value__value"))
-            .first()
-        )
-        if environment:
+        if issue.latest_environment:
             fields.append(
                 DiscordField(
                     name="Environment",
-                    value=environment["value"],
+                    value=issue.latest_environment,
                     inline=True,
                 )
             )
-        release = (
-            issue.issuetag_set.filter(tag_key__key="release")
-            .values(value=F("tag_value__value"))
-            .first()
-        )
-        if release:
+        if issue.latest_release:
             fields.append(
                 DiscordField(
                     name="Release",
-                    value=release["value"],
+                    value=issue.latest_release,
                     inline=False,
                 )
             )
@@ -207,12 +275,21 @@ def send_issue_as_discord_webhook(url, issues: list, issue_count: int = 1):
     if issue_count > 1:
         message += f" ({issue_count} issues)"
 
-    return send_discord_webhook(url, message, embeds)
+    return get_discord_webhook_payload(message, embeds)
+
+
+def send_issue_as_discord_webhook(url, issues: list, issue_count: int = 1):
+    payload = get_issue_discord_webhook_payload(issues, issue_count)
+    return post_webhooks([WebhookRequest(url, payload)])[0]
+
+
+def get_discord_webhook_payload(message: str, embeds: list[DiscordEmbed]) -> dict:
+    return asdict(DiscordWebhookPayload(content=message, embeds=embeds))
 
 
 def send_discord_webhook(url: str, message: str, embeds: list[DiscordEmbed]):
-    payload = DiscordWebhookPayload(content=message, embeds=embeds)
-    return requests.post(url, json=asdict(payload), timeout=10)
+    payload = get_discord_webhook_payload(message, embeds)
+    return post_webhooks([WebhookRequest(url, payload)])[0]
 
 
 @dataclass
@@ -248,27 +325,17 @@ class GoogleChatCard:
         )
         widgets = []
         widgets.append(dict(decoratedText=dict(topLabel="Culprit", text=issue.culprit)))
-        environment = (
-            issue.issuetag_set.filter(tag_key__key="environment")
-            .values(value=F("tag_value__value"))
-            .first()
-        )
-        if environment:
+        if issue.latest_environment:
             widgets.append(
                 dict(
                     decoratedText=dict(
-                        topLabel="Environment", text=environment["value"]
+                        topLabel="Environment", text=issue.latest_environment
                     )
                 )
             )
-        release = (
-            issue.issuetag_set.filter(tag_key__key="release")
-            .values(value=F("tag_value__value"))
-            .first()
-        )
-        if release:
+        if issue.latest_release:
             widgets.append(
-                dict(decoratedText=dict(topLabel="Release", text=release["value"]))
+                dict(decoratedText=dict(topLabel="Release", text=issue.latest_release))
             )
         widgets.append(
             dict(
@@ -294,35 +361,57 @@ class GoogleChatWebhookPayload:
         return self.cardsV2.append(dict(cardId="createCardMessage", card=card))
 
 
-def send_googlechat_webhook(url: str, cards: list[GoogleChatCard]):
+def get_googlechat_webhook_payload(cards: list[GoogleChatCard]) -> dict:
     """
-    Send Google Chat compatible message as documented in
+    Google Chat compatible message as documented in
     https://developers.google.com/chat/messages-overview
     """
     payload = GoogleChatWebhookPayload()
     [payload.add_card(card) for card in cards]
-    return requests.post(url, json=asdict(payload), timeout=10)
+    return asdict(payload)
 
 
-def send_issue_as_googlechat_webhook(url, issues: list):
+def send_googlechat_webhook(url: str, cards: list[GoogleChatCard]):
+    payload = get_googlechat_webhook_payload(cards)
+    return post_webhooks([WebhookRequest(url, payload)])[0]
+
+
+def get_issue_googlechat_webhook_payload(issues: list) -> dict:
     cards = []
     for issue in issues:
         card = GoogleChatCard().construct_issue_card(
             title="GlitchTip Alert", issue=issue
         )
         cards.append(card)
-    return send_googlechat_webhook(url, cards)
+    return get_googlechat_webhook_payload(cards)
+
+
+def send_issue_as_googlechat_webhook(url, issues: list):
+    payload = get_issue_googlechat_webhook_payload(issues)
+    return post_webhooks([WebhookRequest(url, payload)])[0]
 
 
-def send_webhook_notification(
-    notification: "Notification", url: str, recipient_type: str
+def send_webhook_notifications(
+    notification: "Notification", recipients: list["AlertRecipient"]
 ):
-    issue_count = notification.issues.count()
-    issues = notification.issues.all()[: settings.MAX_ISSUES_PER_ALERT]
-
-    if recipient_type == RecipientType.DISCORD:
-        send_issue_as_discord_webhook(url, issues, issue_count)
-    elif recipient_type == RecipientType.GOOGLE_CHAT:
-        send_issue_as_googlechat_webhook(url, issues)
-    else:
-        send_issue_as_webhook(url, issues, issue_count)
+    """Send a notification to all webhook recipients concurrently"""
+    if not recipients:
+        return []
+    issues = notification.payload.issues
+    issue_count = notification.payload.issue_count
+
+    # Payloads only depend on the recipient type
+    payloads: dict[str, dict] = {}
+    requests: list[WebhookRequest] = []
+    for recipient in recipients:
+        recipient_type = recipient.recipient_type
+        if recipient_type not in payloads:
+            if recipient_type == RecipientType.DISCORD:
+                payload = get_issue_discord_webhook_payload(issues, issue_count)
+            elif recipient_type == RecipientType.GOOGLE_CHAT:
+                payload = get_issue_googlechat_webhook_payload(issues)
+            else:
+                payload = get_issue_webhook_payload(issues, issue_count)
+            payloads[recipient_type] = payload
+        requests.append(WebhookRequest(recipient.url, payloads[recipient_type]))
+    return post_webhooks(requests)
@@ -17,6 +17,7 @@ from symbolic import ProguardMapper
 
 from apps.files.models import File, FileBlob
 from apps.organizations_ext.models import Organization
+from apps.organizations_ext.quotas import increment_quotas
 from apps.projects.models import Project
 from glitchtip.api.authentication import AuthHttpRequest
 from glitchtip.utils import async_call_celery_task
@@ -173,6 +174,9 @@ async def create_dif_from_read_only_file(proguard_file, project, proguard_id, fi
                 "features": ["mapping"],
             }
             await dif.asave()
+            await sync_to_async(increment_quotas)(
+                "file_size", {project.organization_id: size}
+            )
 
         result = {
             "id": dif.id,
@@ -10,6 +10,7 @@ from apps.difs.models import DebugInformationFile
 from apps.difs.stacktrace_processor import StacktraceProcessor
 from apps.event_ingest.schema import ErrorIssueEventSchema, StackTraceFrame
 from apps.files.models import File, FileBlob
+from apps.organizations_ext.quotas import increment_quotas
 from apps.projects.models import Project
 
 
@@ -186,3 +187,4 @@ def difs_create_difs(project, name, file):
             },
         )
         dif.save()
+        increment_quotas("file_size", {project.organization_id: file.size})
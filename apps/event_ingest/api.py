@@ -8,6 +8,8 @@ from ninja.errors import ValidationError
 from glitchtip.utils import async_call_celery_task
 
 from .authentication import EventAuthHttpRequest, event_auth
+from .dedupe import is_new_event
+from .sampling import get_sample_weight
 from .schema import (
     CSPIssueEventSchema,
     EnvelopeSchema,
@@ -16,12 +18,12 @@ from .schema import (
     EventUser,
     IngestIssueEvent,
     InterchangeIssueEvent,
+    InterchangeTransactionEvent,
     IssueEventSchema,
     SecuritySchema,
     TransactionEventSchema,
 )
 from .tasks import ingest_event, ingest_transaction
-from .utils import cache_set_nx
 
 router = Router(auth=event_auth)
 
@@ -64,7 +66,7 @@ async def event_store(
     Event store is the original event ingest API from OSS Sentry but is used less often
     Unlike Envelope, it accepts only one Issue event.
     """
-    if cache_set_nx("uuid" + payload.event_id.hex, True) is False:
+    if not await is_new_event(payload.event_id):
         raise ValidationError([{"message": "Duplicate event id"}])
 
     if client_ip := get_ip_address(request):
@@ -121,18 +123,21 @@ async def event_envelope(
             interchange_event = InterchangeIssueEvent(**interchange_event_kwargs)
             # Faux unique uuid as GlitchTip can accept duplicate UUIDs
             # The primary key of an event is uuid, received
-            if cache_set_nx("uuid" + interchange_event.event_id.hex, True) is True:
+            if await is_new_event(interchange_event.event_id):
                 await async_call_celery_task(ingest_event, interchange_event.dict())
         elif item_header.type == "transaction" and isinstance(
             item, TransactionEventSchema
         ):
-            interchange_event_kwargs = {
-                "project_id": project_id,
-                "organization_id": request.auth.organization_id,
-                "payload": TransactionEventSchema(**item.dict()),
-            }
-            interchange_event = InterchangeIssueEvent(**interchange_event_kwargs)
-            if cache_set_nx("uuid" + interchange_event.event_id.hex, True) is True:
+            sample_weight = get_sample_weight(request.auth, item)
+            if sample_weight is None:
+                continue
+            interchange_event = InterchangeTransactionEvent(
+                project_id=project_id,
+                organization_id=request.auth.organization_id,
+                payload=TransactionEventSchema(**item.dict()),
+                sample_weight=sample_weight,
+            )
+            if await is_new_event(interchange_event.event_id):
                 await async_call_celery_task(
                     ingest_transaction, interchange_event.dict()
                 )
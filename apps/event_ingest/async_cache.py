@@ -0,0 +1,72 @@
+"""
+Asyncio cache client for the event ingest hot path
+
+Ingest views are async, but the django-redis cache is synchronous, so every block
+check and event id dedupe would stall the event loop for a redis round trip.
+With a redis cache, these helpers use a redis.asyncio client instead, with one
+connection pool per event loop. Keys and values are encoded the same way as
+django-redis, so they are interchangeable with the sync cache.
+
+Other cache backends, and redis sentinel, fall back to django's async cache
+methods, which run the sync cache in a thread.
+"""
+
+import asyncio
+import weakref
+from typing import Any, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from redis.asyncio import ConnectionPool, Redis
+
+_pools: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ConnectionPool] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def is_async_redis() -> bool:
+    return settings.CACHE_IS_REDIS and "SENTINELS" not in settings.CACHES[
+        "default"
+    ].get("OPTIONS", {})
+
+
+def get_client() -> Redis:
+    """Redis client of the cache server, sharing a pool within the running loop"""
+    loop = asyncio.get_running_loop()
+    if (pool := _pools.get(loop)) is None:
+        cache_settings = settings.CACHES["default"]
+        location = cache_settings["LOCATION"]
+        if isinstance(location, list):
+            location = location[0]
+        pool = ConnectionPool.from_url(
+            location,
+            **cache_settings.get("OPTIONS", {}).get("CONNECTION_POOL_KWARGS", {}),
+        )
+        _pools[loop] = pool
+    return Redis(connection_pool=pool)
+
+
+async def aget(key: str) -> Any:
+    if not is_async_redis():
+        return await cache.aget(key)
+    value = await get_client().get(cache.make_key(key))
+    if value is None:
+        return None
+    return cache.client.decode(value)
+
+
+async def aset(key: str, value: Any, timeout: Optional[int] = 300):
+    if not is_async_redis():
+        return await cache.aset(key, value, timeout)
+    await get_client().set(cache.make_key(key), cache.client.encode(value), ex=timeout)
+
+
+async def aset_nx(key: str, value: Any, timeout: Optional[int] = 300) -> bool:
+    """Set key only when it does not exist. Returns True when it was set."""
+    if not is_async_redis():
+        return await cache.aadd(key, value, timeout)
+    return bool(
+        await get_client().set(
+            cache.make_key(key), cache.client.encode(value), ex=timeout, nx=True
+        )
+    )
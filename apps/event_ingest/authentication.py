@@ -2,7 +2,7 @@ from typing import Literal, Optional
 from uuid import UUID
 
 from django.conf import settings
-from django.core.cache import cache
+from django.db.models import F
 from django.http import HttpRequest
 from ninja.errors import AuthenticationError, HttpError, ValidationError
 
@@ -10,7 +10,9 @@ from apps.projects.models import Project
 from glitchtip.api.exceptions import ThrottleException
 from sentry.utils.auth import parse_auth_header
 
+from .async_cache import aget, aset
 from .constants import EVENT_BLOCK_CACHE_KEY
+from .rate_limit import RateLimit, check_rate_limits
 
 
 class EventAuthHttpRequest(HttpRequest):
@@ -62,6 +64,28 @@ def deserialize_throttle(input: str) -> None | tuple[int, int]:
         return int(parts[1]), int(parts[2])
 
 
+def get_rate_limits(project: Project, sentry_key: UUID) -> list[RateLimit]:
+    """Rate limits of the project and the DSN key used, when set"""
+    limits = []
+    if project.rate_limit_count and project.rate_limit_window:
+        limits.append(
+            RateLimit(
+                f"project:{project.id}",
+                project.rate_limit_count,
+                project.rate_limit_window,
+            )
+        )
+    if project.key_rate_limit_count and project.key_rate_limit_window:
+        limits.append(
+            RateLimit(
+                f"key:{sentry_key.hex}",
+                project.key_rate_limit_count,
+                project.key_rate_limit_window,
+            )
+        )
+    return limits
+
+
 async def get_project(request: HttpRequest) -> Optional[Project]:
     """
     Return the valid and accepting events project based on a request.
@@ -80,7 +104,7 @@ async def get_project(request: HttpRequest) -> Optional[Project]:
 
     # block cache check should be right before database call
     block_cache_key = EVENT_BLOCK_CACHE_KEY + str(project_id)
-    if block_value := cache.get(block_cache_key):
+    if block_value := await aget(block_cache_key):
         # Repeat the original message until cache expires
         raise REJECTION_MAP[block_value]
 
@@ -89,6 +113,10 @@ async def get_project(request: HttpRequest) -> Optional[Project]:
             id=project_id,
             projectkey__public_key=sentry_key,
         )
+        .annotate(
+            key_rate_limit_count=F("projectkey__rate_limit_count"),
+            key_rate_limit_window=F("projectkey__rate_limit_window"),
+        )
         .select_related("organization")
         .only(
             "id",
@@ -98,17 +126,22 @@ async def get_project(request: HttpRequest) -> Optional[Project]:
             "organization__event_throttle_rate",
             "organization__scrub_ip_addresses",
             "event_throttle_rate",
+            "transaction_sample_rate",
+            "dynamic_transaction_sampling",
+            "rate_limit_count",
+            "rate_limit_window",
         )
         .afirst()
     )
     if not project:
-        cache.set(block_cache_key, "v", REJECTION_WAIT)
+        await aset(block_cache_key, "v", REJECTION_WAIT)
         raise REJECTION_MAP["v"]
     if not project.organization.is_accepting_events:
-        cache.set(block_cache_key, "t", REJECTION_WAIT)
+        await aset(block_cache_key, "t", REJECTION_WAIT)
         raise REJECTION_MAP["t"]
     if not project.is_accepting_events:
         raise REJECTION_MAP["t"]
+    await check_rate_limits(get_rate_limits(project, sentry_key))
     return project
 
 
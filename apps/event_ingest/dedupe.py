@@ -0,0 +1,101 @@
+"""
+Event id dedupe
+
+Ingest rejects event ids seen within the last DEDUPE_WINDOW seconds. The default
+"key" backend sets one cache key per event id, around a hundred bytes of redis
+memory per event plus expiry bookkeeping. With a redis cache, two compact
+backends keep ids in per minute buckets instead, checking the current and
+previous buckets in one atomic MULTI round trip. Whole buckets expire at once.
+
+- "set" adds the 16 byte binary id to a redis set, exact with a few times less
+  memory than a key per event.
+- "bloom" sets bits of a bloom filter bitmap sized by
+  GLITCHTIP_EVENT_DEDUPE_BLOOM_CAPACITY ids per minute, with a
+  GLITCHTIP_EVENT_DEDUPE_BLOOM_ERROR_RATE chance per bucket checked of dropping
+  a new event as a duplicate. At the defaults, about 3.6 bytes per event. Each
+  bucket's bits are read or set by a single BITFIELD command.
+"""
+
+import hashlib
+import math
+import time
+import uuid
+
+from django.conf import settings
+
+from .async_cache import aset_nx, get_client, is_async_redis
+
+DEDUPE_WINDOW = 300  # Seconds
+BUCKET_SIZE = 60  # Seconds
+DEDUPE_KEY = "dedupe:{}:{}"
+
+
+def get_bloom_parameters(capacity: int, error_rate: float) -> tuple[int, int]:
+    """Optimal bitmap size and number of hashes for a bloom filter"""
+    size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+    hash_count = max(1, round(size / capacity * math.log(2)))
+    return size, hash_count
+
+
+def get_bit_positions(event_id: uuid.UUID, size: int, hash_count: int) -> list[int]:
+    # Event ids are client supplied and may not be random, so hash them
+    digest = hashlib.blake2b(event_id.bytes, digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "big")
+    h2 = int.from_bytes(digest[8:], "big") | 1
+    # Kirsch-Mitzenmacher double hashing
+    return [(h1 + i * h2) % size for i in range(hash_count)]
+
+
+def get_bucket_keys(backend: str) -> list[str]:
+    """Keys of the current bucket, then previous buckets covering the window"""
+    bucket = int(time.time() // BUCKET_SIZE)
+    return [
+        DEDUPE_KEY.format(backend, bucket - i)
+        for i in range(math.ceil(DEDUPE_WINDOW / BUCKET_SIZE) + 1)
+    ]
+
+
+async def is_new_event_set(event_id: uuid.UUID) -> bool:
+    current, *previous = get_bucket_keys("set")
+    async with get_client().pipeline(transaction=True) as pipe:
+        for key in previous:
+            pipe.sismember(key, event_id.bytes)
+        pipe.sadd(current, event_id.bytes)
+        pipe.expire(current, DEDUPE_WINDOW + BUCKET_SIZE)
+        *seen, added, _ = await pipe.execute()
+    return bool(added) and not any(seen)
+
+
+async def is_new_event_bloom(event_id: uuid.UUID) -> bool:
+    size, hash_count = get_bloom_parameters(
+        settings.GLITCHTIP_EVENT_DEDUPE_BLOOM_CAPACITY,
+        settings.GLITCHTIP_EVENT_DEDUPE_BLOOM_ERROR_RATE,
+    )
+    positions = get_bit_positions(event_id, size, hash_count)
+    current, *previous = get_bucket_keys("bloom")
+    async with get_client().pipeline(transaction=True) as pipe:
+        # One BITFIELD per bucket reads or sets all of the id's bits
+        for key in previous:
+            bitfield = pipe.bitfield(key)
+            for position in positions:
+                bitfield.get("u1", position)
+            bitfield.execute()
+        bitfield = pipe.bitfield(current)
+        for position in positions:
+            bitfield.set("u1", position, 1)
+        bitfield.execute()
+        pipe.expire(current, DEDUPE_WINDOW + BUCKET_SIZE)
+        *bitmaps, _ = await pipe.execute()
+    # An id is present in a bitmap when all of its bits were already set. SET
+    # returns the previous bits of the current bucket.
+    return not any(all(bits) for bits in bitmaps)
+
+
+async def is_new_event(event_id: uuid.UUID) -> bool:
+    """Record an event id, returning False when it was already seen recently"""
+    backend = settings.GLITCHTIP_EVENT_DEDUPE
+    if backend == "set" and is_async_redis():
+        return await is_new_event_set(event_id)
+    if backend == "bloom" and is_async_redis():
+        return await is_new_event_bloom(event_id)
+    return await aset_nx("uuid" + event_id.hex, True, DEDUPE_WINDOW)
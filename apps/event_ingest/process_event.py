@@ -1,6 +1,8 @@
-from collections import defaultdict
+import json
+from collections import OrderedDict, defaultdict
 from dataclasses import dataclass
 from datetime import datetime
+from datetime import timezone as dt_timezone
 from operator import itemgetter
 from typing import Any, Optional, Union
 from urllib.parse import urlparse
@@ -23,11 +25,13 @@ from ninja import Schema
 from user_agents import parse
 
 from apps.alerts.constants import ISSUE_IDS_KEY
+from apps.alerts.counters import increment_issue_counts
 from apps.alerts.models import Notification
 from apps.difs.models import DebugInformationFile
 from apps.difs.tasks import event_difs_resolve_stacktrace
 from apps.environments.models import Environment, EnvironmentProject
 from apps.issue_events.constants import EventStatus, LogLevel
+from apps.issue_events.locator import record_event_locations
 from apps.issue_events.models import (
     Issue,
     IssueEvent,
@@ -36,7 +40,19 @@ from apps.issue_events.models import (
     TagKey,
     TagValue,
 )
-from apps.performance.models import TransactionEvent, TransactionGroup
+from apps.organizations_ext.quotas import get_quota_upsert_sql
+from apps.performance.models import (
+    TransactionEvent,
+    TransactionGroup,
+    TransactionGroupHourlyStatistic,
+    TransactionGroupTag,
+)
+from apps.performance.sketch import (
+    MERGE_SKETCHES_SQL,
+    build_sketch,
+    stochastic_round,
+)
+from apps.performance.spans import pack_spans
 from apps.projects.models import Project
 from apps.releases.models import Release
 from sentry.culprit import generate_culprit
@@ -56,6 +72,7 @@ from .schema import (
     IngestIssueEvent,
     InterchangeIssueEvent,
     InterchangeTransactionEvent,
+    TransactionEventSchema,
 )
 from .utils import generate_hash, remove_bad_chars, transform_parameterized_message
 
@@ -601,6 +618,9 @@ def process_issue_events(ingest_events: list[InterchangeIssueEvent]):
                 # We want all keys to have a long "sanity check" TTL to avoid redis out
                 # of memory errors (we can't ensure end users use all keys lru eviction)
                 con.expire(ISSUE_IDS_KEY, 3600)
+        increment_issue_counts(
+            [(event.issue_id, event.event.received) for event in processing_events]
+        )
 
     if issues_to_reopen:
         Issue.objects.filter(id__in=issues_to_reopen).update(
@@ -610,48 +630,81 @@ def process_issue_events(ingest_events: list[InterchangeIssueEvent]):
 
     # ignore_conflicts because we could have an invalid duplicate event_id, received
     IssueEvent.objects.bulk_create(issue_events, ignore_conflicts=True)
+    record_event_locations(issue_events)
 
     # Group events by time and project for event count statistics
     data_stats: defaultdict[datetime, defaultdict[int, int]] = defaultdict(
         lambda: defaultdict(int)
     )
     for processing_event in processing_events:
-        hour_received = processing_event.event.received.replace(
-            minute=0, second=0, microsecond=0
+        minute_received = processing_event.event.received.replace(
+            second=0, microsecond=0
         )
-        data_stats[hour_received][processing_event.event.project_id] += 1
+        data_stats[minute_received][processing_event.event.project_id] += 1
 
     update_tags(processing_events)
     update_statistics(data_stats)
 
 
 def update_statistics(
-    project_event_stats: defaultdict[datetime, defaultdict[int, int]], is_issue=True
+    project_event_stats: defaultdict[datetime, defaultdict[int, float]], is_issue=True
 ):
+    """
+    Add per minute project event counts to the minute, hourly and daily rollup
+    tables. The coarser rollups and organization quota counters are aggregated
+    in the same statement, so all are written in one round trip. Counts may be
+    sums of sample weights, stochastically rounded to integers.
+    """
     # Flatten data for a sql param friendly format and sort to mitigate deadlocks
     data = sorted(
         [
-            [year, key, value]
-            for year, inner_dict in project_event_stats.items()
+            [minute, key, stochastic_round(value)]
+            for minute, inner_dict in project_event_stats.items()
             for key, value in inner_dict.items()
         ],
         key=itemgetter(0, 1),
     )
-    table = (
-        "projects_issueeventprojecthourlystatistic"
-        if is_issue
-        else "projects_transactioneventprojecthourlystatistic"
-    )
+    if not data:
+        return
+    prefix = "projects_issueevent" if is_issue else "projects_transactionevent"
+    minute_table = f"{prefix}projectminutestatistic"
+    hourly_table = f"{prefix}projecthourlystatistic"
+    daily_table = f"{prefix}projectdailystatistic"
+    quota_sql = ""
+    if settings.BILLING_ENABLED:
+        usage_sql = (
+            "SELECT organization_id, sum(count) AS count FROM stats\n"
+            "JOIN projects_project ON projects_project.id = stats.project_id\n"
+            "GROUP BY 1"
+        )
+        quota_field = "issue_event_count" if is_issue else "transaction_count"
+        quota_sql = f", quota AS ({get_quota_upsert_sql(quota_field, usage_sql)})\n"
     # Django ORM cannot support F functions in a bulk_update
     # psycopg does not support execute_values
     # https://github.com/psycopg/psycopg/issues/114
     with connection.cursor() as cursor:
         args_str = ",".join(cursor.mogrify("(%s,%s,%s)", x) for x in data)
         sql = (
-            f"INSERT INTO {table} (date, project_id, count)\n"
-            f"VALUES {args_str}\n"
+            f"WITH stats (date, project_id, count) AS (VALUES {args_str}),\n"
+            "hourly AS (\n"
+            f"  INSERT INTO {hourly_table} (date, project_id, count)\n"
+            "  SELECT date_trunc('hour', date, 'UTC'), project_id, sum(count)\n"
+            "  FROM stats GROUP BY 1, 2 ORDER BY 1, 2\n"
+            "  ON CONFLICT (project_id, date)\n"
+            f"  DO UPDATE SET count = {hourly_table}.count + EXCLUDED.count\n"
+            "),\n"
+            "daily AS (\n"
+            f"  INSERT INTO {daily_table} (date, project_id, count)\n"
+            "  SELECT date_trunc('day', date, 'UTC'), project_id, sum(count)\n"
+            "  FROM stats GROUP BY 1, 2 ORDER BY 1, 2\n"
+            "  ON CONFLICT (project_id, date)\n"
+            f"  DO UPDATE SET count = {daily_table}.count + EXCLUDED.count\n"
+            ")\n"
+            f"{quota_sql}"
+            f"INSERT INTO {minute_table} (date, project_id, count)\n"
+            "SELECT date, project_id, count FROM stats\n"
             "ON CONFLICT (project_id, date)\n"
-            f"DO UPDATE SET count = {table}.count + EXCLUDED.count;"
+            f"DO UPDATE SET count = {minute_table}.count + EXCLUDED.count;"
         )
         cursor.execute(sql)
 
@@ -662,11 +715,12 @@ TagStats = defaultdict[
 ]
 
 
-def update_tags(processing_events: list[ProcessingEvent]):
-    keys = sorted({key for d in processing_events for key in d.event_tags.keys()})
-    values = sorted(
-        {value for d in processing_events for value in d.event_tags.values()}
-    )
+def get_tag_ids(
+    tags: list[dict[str, str]],
+) -> tuple[dict[str, int], dict[str, int]]:
+    """Get or create TagKey and TagValue ids of all keys and values in tags"""
+    keys = sorted({key for d in tags for key in d.keys()})
+    values = sorted({value for d in tags for value in d.values()})
 
     TagKey.objects.bulk_create([TagKey(key=key) for key in keys], ignore_conflicts=True)
     TagValue.objects.bulk_create(
@@ -680,6 +734,11 @@ def update_tags(processing_events: list[ProcessingEvent]):
         tag["value"]: tag["id"]
         for tag in TagValue.objects.filter(value__in=values).values()
     }
+    return tag_keys, tag_values
+
+
+def update_tags(processing_events: list[ProcessingEvent]):
+    tag_keys, tag_values = get_tag_ids([d.event_tags for d in processing_events])
 
     tag_stats: TagStats = defaultdict(
         lambda: defaultdict(lambda: defaultdict(lambda: defaultdict(int)))
@@ -723,6 +782,221 @@ def update_tags(processing_events: list[ProcessingEvent]):
 
 
 # Transactions
+# project_id, transaction, op, method
+TransactionGroupKey = tuple[int, str, str, Optional[str]]
+
+
+class LRUCache:
+    """Small least recently used mapping, kept per worker process"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.data: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        value = self.data.get(key)
+        if value is not None:
+            self.data.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self.data[key] = value
+        self.data.move_to_end(key)
+        if len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def clear(self):
+        self.data.clear()
+
+
+transaction_group_cache = LRUCache(10_000)
+
+
+def select_transaction_groups(
+    keys: list[TransactionGroupKey],
+) -> dict[TransactionGroupKey, int]:
+    query = Q()
+    for project_id, transaction_name, op, method in keys:
+        query |= Q(
+            project_id=project_id, transaction=transaction_name, op=op, method=method
+        )
+    groups = TransactionGroup.objects.filter(query).values_list(
+        "project_id", "transaction", "op", "method", "id"
+    )
+    return {tuple(group[:4]): group[4] for group in groups}
+
+
+def insert_transaction_groups(
+    keys: list[TransactionGroupKey],
+) -> dict[TransactionGroupKey, int]:
+    """Insert groups, returning ids of those not already created concurrently"""
+    table = TransactionGroup._meta.db_table
+    with connection.cursor() as cursor:
+        args_str = ",".join(
+            cursor.mogrify("(now(),%s,%s,%s,%s,'{}')", key) for key in keys
+        )
+        cursor.execute(
+            f"INSERT INTO {table} (created, project_id, transaction, op, method, tags)\n"
+            f"VALUES {args_str}\n"
+            "ON CONFLICT DO NOTHING\n"
+            "RETURNING project_id, transaction, op, method, id;"
+        )
+        return {tuple(row[:4]): row[4] for row in cursor.fetchall()}
+
+
+def lock_transaction_groups(group_ids: set[int]) -> set[int]:
+    """Lock existing groups against deletion until commit, returning their ids"""
+    table = TransactionGroup._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT id FROM {table} WHERE id = ANY(%s) ORDER BY id FOR KEY SHARE",
+            [list(group_ids)],
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def update_transaction_group_statistics(transactions: list[TransactionEvent]):
+    """
+    Add transaction durations to the per group, per hour count, sum and quantile
+    sketch, weighted by sample weight. Sketches are merged in the upsert by
+    summing counts per bucket key.
+    """
+    durations: defaultdict[tuple[int, datetime], list[tuple[float, float]]] = (
+        defaultdict(list)
+    )
+    for perf_transaction in transactions:
+        hour = perf_transaction.start_timestamp.astimezone(dt_timezone.utc).replace(
+            minute=0, second=0, microsecond=0
+        )
+        durations[(perf_transaction.group_id, hour)].append(
+            (perf_transaction.duration, perf_transaction.sample_weight)
+        )
+    if not durations:
+        return
+
+    # Sort to mitigate deadlocks
+    data = [
+        (
+            group_id,
+            hour,
+            stochastic_round(sum(weight for _, weight in values)),
+            stochastic_round(sum(duration * weight for duration, weight in values)),
+            json.dumps(build_sketch(*zip(*values))),
+        )
+        for (group_id, hour), values in sorted(durations.items())
+    ]
+    table = TransactionGroupHourlyStatistic._meta.db_table
+    merge_sql = MERGE_SKETCHES_SQL.format(
+        rows=(
+            f"(SELECT * FROM jsonb_each_text({table}.duration_sketch) UNION ALL "
+            "SELECT * FROM jsonb_each_text(EXCLUDED.duration_sketch)) sketches"
+        )
+    )
+    with connection.cursor() as cursor:
+        args_str = ",".join(cursor.mogrify("(%s,%s,%s,%s,%s)", x) for x in data)
+        cursor.execute(
+            f"INSERT INTO {table} "
+            "(group_id, date, count, duration_sum, duration_sketch)\n"
+            f"VALUES {args_str}\n"
+            "ON CONFLICT (group_id, date) DO UPDATE SET\n"
+            f"count = {table}.count + EXCLUDED.count,\n"
+            f"duration_sum = {table}.duration_sum + EXCLUDED.duration_sum,\n"
+            f"duration_sketch = ({merge_sql});"
+        )
+
+
+def generate_transaction_tags(event: TransactionEventSchema) -> dict[str, str]:
+    """Generate key-value tags based on context and other transaction data"""
+    tags: dict[str, Optional[str]] = {}
+    if isinstance(event.tags, dict):
+        tags.update(event.tags)
+    elif isinstance(event.tags, list):
+        tags.update({key: value for key, value in event.tags if key is not None})
+
+    if isinstance(contexts := event.contexts, dict):
+        if isinstance(browser := contexts.get("browser"), dict) and browser.get("name"):
+            tags["browser.name"] = browser["name"]
+            if browser.get("version"):
+                tags["browser"] = f"{browser['name']} {browser['version']}"
+        if isinstance(os := contexts.get("os"), dict):
+            tags["os.name"] = os.get("name")
+
+    if environment := event.environment:
+        tags["environment"] = environment
+    if release := event.release:
+        tags["release"] = release
+    if server_name := event.server_name:
+        tags["server_name"] = server_name
+
+    # Exclude None values, truncate to fit TagKey and TagValue
+    return {str(key)[:255]: str(value)[:255] for key, value in tags.items() if value}
+
+
+def update_transaction_tags(transactions: list[TransactionEvent]):
+    """Add transaction tags to the per group, per day TransactionGroupTag aggregate"""
+    tag_keys, tag_values = get_tag_ids([t.tags for t in transactions])
+
+    tag_stats: defaultdict[tuple[datetime, int, int, int], float] = defaultdict(float)
+    for perf_transaction in transactions:
+        day = perf_transaction.start_timestamp.astimezone(dt_timezone.utc).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        for key, value in perf_transaction.tags.items():
+            tag_stats[
+                (day, perf_transaction.group_id, tag_keys[key], tag_values[value])
+            ] += perf_transaction.sample_weight
+    if not tag_stats:
+        return
+
+    # Sort to mitigate deadlocks
+    data = sorted((*key, stochastic_round(count)) for key, count in tag_stats.items())
+    table = TransactionGroupTag._meta.db_table
+    with connection.cursor() as cursor:
+        args_str = ",".join(cursor.mogrify("(%s,%s,%s,%s,%s)", x) for x in data)
+        cursor.execute(
+            f"INSERT INTO {table} (date, group_id, tag_key_id, tag_value_id, count)\n"
+            f"VALUES {args_str}\n"
+            "ON CONFLICT (group_id, date, tag_key_id, tag_value_id)\n"
+            f"DO UPDATE SET count = {table}.count + EXCLUDED.count;"
+        )
+
+
+def resolve_transaction_groups(
+    keys: set[TransactionGroupKey],
+) -> dict[TransactionGroupKey, int]:
+    """
+    Get or create the TransactionGroup id of each unique group key in a batch.
+    Known ids come from a per worker LRU. Misses are selected in one query and
+    groups that still don't exist are inserted in another.
+    """
+    group_ids = {}
+    misses = []
+    for key in keys:
+        if group_id := transaction_group_cache.get(key):
+            group_ids[key] = group_id
+        else:
+            misses.append(key)
+    if not misses:
+        return group_ids
+
+    group_ids.update(select_transaction_groups(misses))
+    # Sort to mitigate deadlocks
+    if missing := sorted(
+        (key for key in misses if key not in group_ids),
+        key=lambda key: (*key[:3], key[3] or ""),
+    ):
+        group_ids.update(insert_transaction_groups(missing))
+        # Conflicts were created by a concurrent batch since the select
+        if conflicts := [key for key in missing if key not in group_ids]:
+            group_ids.update(select_transaction_groups(conflicts))
+    for key in misses:
+        transaction_group_cache.set(key, group_ids[key])
+    return group_ids
+
+
 def process_transaction_events(ingest_events: list[InterchangeTransactionEvent]):
     release_set = {
         (event.payload.release, event.project_id, event.organization_id)
@@ -763,6 +1037,7 @@ def process_transaction_events(ingest_events: list[InterchangeTransactionEvent])
     create_environments(environment_set, projects_with_data)
 
     transactions = []
+    group_keys: list[TransactionGroupKey] = []
 
     for ingest_event in ingest_events:
         event = ingest_event.payload
@@ -770,47 +1045,74 @@ def process_transaction_events(ingest_events: list[InterchangeTransactionEvent])
         request = event.request
         trace_id = contexts["trace"]["trace_id"]
         op = ""
+        trace_data = None
         if isinstance(contexts, dict):
             trace = contexts.get("trace", {})
             if isinstance(trace, dict):
                 op = str(trace.get("op", ""))
+                trace_data = {
+                    "span_id": trace.get("span_id"),
+                    "parent_span_id": trace.get("parent_span_id"),
+                    "status": trace.get("status"),
+                }
         method: str | None = None
         if request:
             method = request.method
 
-        # TODO tags
-
-        group, group_created = TransactionGroup.objects.get_or_create(
-            project_id=ingest_event.project_id,
-            transaction=event.transaction[:1024],  # Truncate
-            op=op,
-            method=method,
+        group_key = (
+            ingest_event.project_id,
+            event.transaction[:1024],  # Truncate
+            op,
+            method,
         )
-
+        group_keys.append(group_key)
         transactions.append(
             TransactionEvent(
-                group=group,
                 data={
                     "request": request.dict() if request else None,
                     "sdk": event.sdk.dict() if event.sdk else None,
                     "platform": event.platform,
+                    "trace": trace_data,
                 },
+                spans=pack_spans(event.spans, event.start_timestamp),
+                tags=generate_transaction_tags(event),
                 trace_id=trace_id,
                 event_id=event.event_id,
                 timestamp=event.timestamp,
                 start_timestamp=event.start_timestamp,
                 duration=(event.timestamp - event.start_timestamp).total_seconds()
                 * 1000,
+                sample_weight=ingest_event.sample_weight,
             )
         )
-    TransactionEvent.objects.bulk_create(transactions, ignore_conflicts=True)
-    data_stats: defaultdict[datetime, defaultdict[int, int]] = defaultdict(
-        lambda: defaultdict(int)
+    group_ids = resolve_transaction_groups(set(group_keys))
+    # Foreign keys are deferred, a cached group deleted by maintenance would only
+    # fail at the outermost commit. Lock groups until the events are committed,
+    # resolving those no longer in the database again.
+    with transaction.atomic():
+        existing = lock_transaction_groups(set(group_ids.values()))
+        while stale := {
+            key for key, group_id in group_ids.items() if group_id not in existing
+        }:
+            for key in stale:
+                transaction_group_cache.delete(key)
+            resolved = resolve_transaction_groups(stale)
+            group_ids.update(resolved)
+            existing |= lock_transaction_groups(set(resolved.values()))
+        for perf_transaction, group_key in zip(transactions, group_keys):
+            perf_transaction.group_id = group_ids[group_key]
+        TransactionEvent.objects.bulk_create(transactions, ignore_conflicts=True)
+    data_stats: defaultdict[datetime, defaultdict[int, float]] = defaultdict(
+        lambda: defaultdict(float)
     )
 
-    for perf_transaction in transactions:
-        hour_received = perf_transaction.start_timestamp.replace(
-            minute=0, second=0, microsecond=0
+    # Count by receive time like issue events. Client timestamps may be far from
+    # now, outside the short lived minute statistic partitions.
+    for ingest_event in ingest_events:
+        minute_received = ingest_event.received.replace(second=0, microsecond=0)
+        data_stats[minute_received][ingest_event.project_id] += (
+            ingest_event.sample_weight
         )
-        data_stats[hour_received][perf_transaction.group.project_id] += 1
     update_statistics(data_stats, False)
+    update_transaction_group_statistics(transactions)
+    update_transaction_tags(transactions)
@@ -0,0 +1,135 @@
+"""
+Per second event rate limiting
+
+Projects and DSN keys may set a rate limit of count events per window seconds,
+enforced as a token bucket: up to count events in a burst, refilling at
+count / window per second. With a redis cache, buckets are shared by all web
+workers and updated atomically by a lua script. Requests are only let through
+when every applicable bucket has a token.
+
+The retry time of each empty bucket is also remembered in local memory, so a
+client that keeps sending is rejected without a redis round trip until then. Without
+redis, buckets are kept per process.
+"""
+
+import math
+import time
+from dataclasses import dataclass
+
+from glitchtip.api.exceptions import ThrottleException
+
+from .async_cache import get_client, is_async_redis
+
+RATE_LIMIT_KEY = "rate_limit:{}"
+
+# KEYS are buckets. ARGV[1] is the current time in seconds, then the capacity
+# and refill rate per second of each bucket. Returns the index and seconds to
+# wait, as a string, of each empty bucket. Empty when a token was taken from
+# every bucket.
+TOKEN_BUCKET_LUA = """
+local now = tonumber(ARGV[1])
+local tokens = {}
+local empty = {}
+for i, key in ipairs(KEYS) do
+  local capacity = tonumber(ARGV[i * 2])
+  local rate = tonumber(ARGV[i * 2 + 1])
+  local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+  local available = tonumber(bucket[1]) or capacity
+  local elapsed = math.max(0, now - (tonumber(bucket[2]) or now))
+  available = math.min(capacity, available + elapsed * rate)
+  if available < 1 then
+    table.insert(empty, i - 1)
+    table.insert(empty, tostring((1 - available) / rate))
+  end
+  tokens[i] = available
+end
+for i, key in ipairs(KEYS) do
+  local capacity = tonumber(ARGV[i * 2])
+  local rate = tonumber(ARGV[i * 2 + 1])
+  if #empty == 0 then
+    tokens[i] = tokens[i] - 1
+  end
+  redis.call('HSET', key, 'tokens', tostring(tokens[i]), 'ts', ARGV[1])
+  redis.call('EXPIRE', key, math.ceil(capacity / rate) + 1)
+end
+return empty
+"""
+
+
+@dataclass
+class RateLimit:
+    key: str
+    count: int
+    window: int  # Seconds
+
+    @property
+    def rate(self) -> float:
+        return self.count / self.window
+
+
+class LocalTokenBuckets:
+    """Per process fallback with the same semantics as TOKEN_BUCKET_LUA"""
+
+    def __init__(self):
+        self.buckets: dict[str, tuple[float, float]] = {}
+
+    def take(self, limits: list[RateLimit], now: float) -> dict[str, float]:
+        tokens = []
+        empty = {}
+        for limit in limits:
+            available, last = self.buckets.get(limit.key, (limit.count, now))
+            available = min(limit.count, available + max(0.0, now - last) * limit.rate)
+            if available < 1:
+                empty[limit.key] = (1 - available) / limit.rate
+            tokens.append(available)
+        for limit, available in zip(limits, tokens):
+            self.buckets[limit.key] = (
+                available if empty else available - 1,
+                now,
+            )
+        return empty
+
+
+local_buckets = LocalTokenBuckets()
+# Bucket key to the time until which requests are known to be rejected
+blocked_until: dict[str, float] = {}
+
+
+async def take_token(limits: list[RateLimit]) -> dict[str, float]:
+    """
+    Take a token from each bucket, or return the keys of empty buckets with the
+    seconds to wait for a token
+    """
+    now = time.time()
+    if is_async_redis():
+        client = get_client()
+        args: list[float | int] = [now]
+        for limit in limits:
+            args += [limit.count, limit.rate]
+        result = await client.eval(
+            TOKEN_BUCKET_LUA,
+            len(limits),
+            *(RATE_LIMIT_KEY.format(limit.key) for limit in limits),
+            *args,
+        )
+        return {
+            limits[int(index)].key: float(wait)
+            for index, wait in zip(result[::2], result[1::2])
+        }
+    return local_buckets.take(limits, now)
+
+
+async def check_rate_limits(limits: list[RateLimit]):
+    """Raise ThrottleException with Retry-After when any rate limit is exceeded"""
+    if not limits:
+        return
+    now = time.time()
+    for limit in limits:
+        if (until := blocked_until.get(limit.key)) and until > now:
+            raise ThrottleException(retry_after=math.ceil(until - now))
+
+    if empty := await take_token(limits):
+        # Only empty buckets are blocked, other keys of a project still pass
+        for key, wait in empty.items():
+            blocked_until[key] = now + wait
+        raise ThrottleException(retry_after=math.ceil(max(empty.values())))
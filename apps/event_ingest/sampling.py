@@ -0,0 +1,68 @@
+"""
+Transaction sampling
+
+Transactions are sampled in the envelope view, before dedupe, celery and the
+database. Each kept transaction records a sample weight, the number of
+transactions it represents, so that counts and averages scale back up.
+
+With dynamic sampling, failed and slow transactions and the first few of each
+transaction name per minute are always kept with weight 1. Only the remaining,
+redundant fast transactions are sampled at the project rate with weight
+1 / rate. Each transaction's stratum is decided before sampling, so weighted
+totals remain unbiased.
+"""
+
+import random
+import time
+from collections import Counter
+
+from django.conf import settings
+
+from apps.projects.models import Project
+
+from .schema import TransactionEventSchema
+
+
+class MinuteCounter:
+    """Per process counts that reset every minute"""
+
+    def __init__(self):
+        self.minute: int | None = None
+        self.counts: Counter = Counter()
+
+    def increment(self, key) -> int:
+        minute = int(time.monotonic() // 60)
+        if minute != self.minute:
+            self.minute = minute
+            self.counts.clear()
+        self.counts[key] += 1
+        return self.counts[key]
+
+
+transaction_name_counter = MinuteCounter()
+
+
+def is_always_kept(project_id: int, event: TransactionEventSchema) -> bool:
+    duration = (event.timestamp - event.start_timestamp).total_seconds() * 1000
+    if duration >= settings.GLITCHTIP_SAMPLING_SLOW_TRANSACTION_MS:
+        return True
+    if isinstance(event.contexts, dict):
+        trace = event.contexts.get("trace")
+        if isinstance(trace, dict) and trace.get("status") not in (None, "ok"):
+            return True
+    return (
+        transaction_name_counter.increment((project_id, event.transaction))
+        <= settings.GLITCHTIP_SAMPLING_MIN_PER_TRANSACTION
+    )
+
+
+def get_sample_weight(project: Project, event: TransactionEventSchema) -> float | None:
+    """Sample weight of a kept transaction, or None when it should be dropped"""
+    rate = project.transaction_sample_rate
+    if rate >= 1:
+        return 1.0
+    if project.dynamic_transaction_sampling and is_always_kept(project.id, event):
+        return 1.0
+    if rate <= 0 or random.random() >= rate:
+        return None
+    return 1 / rate
@@ -329,6 +329,16 @@ class EventIngestSchema(IngestIssueEvent):
     event_id: uuid.UUID
 
 
+class TransactionSpan(LaxIngestSchema):
+    span_id: str
+    parent_span_id: str | None = None
+    op: str | None = None
+    description: str | None = None
+    status: str | None = None
+    start_timestamp: datetime
+    timestamp: datetime | None = None
+
+
 class TransactionEventSchema(LaxIngestSchema):
     type: Literal["transaction"] = "transaction"
     contexts: JsonValue
@@ -336,6 +346,7 @@ class TransactionEventSchema(LaxIngestSchema):
     start_timestamp: datetime
     timestamp: datetime
     transaction: str
+    spans: list[TransactionSpan] | None = None
 
     # # SentrySDKEventSerializer
     breadcrumbs: JsonValue | None = None
@@ -475,3 +486,4 @@ class InterchangeIssueEvent(InterchangeEvent):
 
 class InterchangeTransactionEvent(InterchangeEvent):
     payload: TransactionEventSchema
+    sample_weight: float = 1.0
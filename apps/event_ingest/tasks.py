@@ -6,7 +6,7 @@ from celery_batches import Batches
 from glitchtip.celery import app
 
 from .process_event import process_issue_events, process_transaction_events
-from .schema import InterchangeIssueEvent
+from .schema import InterchangeIssueEvent, InterchangeTransactionEvent
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +27,6 @@ def ingest_event(requests):
 def ingest_transaction(requests):
     logger.info(f"Process {len(requests)} transaction event requests")
     process_transaction_events(
-        [InterchangeIssueEvent(**request.args[0]) for request in requests]
+        [InterchangeTransactionEvent(**request.args[0]) for request in requests]
     )
-    [app.backend.mark_as_done(request.id, None, request) for request in requests]
\ No newline at end of file
+    [app.backend.mark_as_done(request.id, None, request) for request in requests]
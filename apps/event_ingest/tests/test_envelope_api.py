@@ -4,12 +4,15 @@ from unittest import mock
 from urllib.parse import urlparse
 
 from django.core.cache import cache
+from django.test import override_settings
 from django.test.client import FakePayload
 from django.urls import reverse
 
 from apps.issue_events.models import IssueEvent
 from apps.performance.models import TransactionEvent
+from apps.projects.models import TransactionEventProjectHourlyStatistic
 
+from ..sampling import transaction_name_counter
 from .utils import EventIngestTestCase
 
 
@@ -77,6 +80,44 @@ class EnvelopeAPITestCase(EventIngestTestCase):
         self.assertEqual(res.status_code, 200)
         self.assertTrue(TransactionEvent.objects.exists())
 
+    @mock.patch("apps.event_ingest.sampling.random.random")
+    def test_sample_transactions(self, mock_random):
+        self.project.transaction_sample_rate = 0.5
+        self.project.dynamic_transaction_sampling = False
+        self.project.save()
+        mock_random.side_effect = [0.9, 0.1]
+        for _ in range(2):
+            data = self.get_payload(
+                "events/test_data/transactions/django_simple.json", replace_id=True
+            )
+            res = self.client.post(
+                self.url, data, content_type="application/x-sentry-envelope"
+            )
+            self.assertEqual(res.status_code, 200)
+        self.assertEqual(TransactionEvent.objects.get().sample_weight, 2)
+        self.assertEqual(
+            TransactionEventProjectHourlyStatistic.objects.get(
+                project=self.project
+            ).count,
+            2,
+        )
+
+    @override_settings(GLITCHTIP_SAMPLING_MIN_PER_TRANSACTION=1)
+    @mock.patch("apps.event_ingest.sampling.time.monotonic", return_value=0)
+    def test_dynamic_sample_transactions(self, _mock_monotonic):
+        transaction_name_counter.minute = None
+        self.project.transaction_sample_rate = 0
+        self.project.save()
+        for _ in range(2):
+            data = self.get_payload(
+                "events/test_data/transactions/django_simple.json", replace_id=True
+            )
+            self.client.post(
+                self.url, data, content_type="application/x-sentry-envelope"
+            )
+        # The first transaction of its name is kept, the rest are sampled
+        self.assertEqual(TransactionEvent.objects.get().sample_weight, 1)
+
     def test_malformed_sdk_packages(self):
         event = self.django_event
         event[2]["sdk"]["packages"] = {
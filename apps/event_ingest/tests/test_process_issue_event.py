@@ -48,6 +48,8 @@ class IssueEventIngestTestCase(EventIngestTestCase):
                 count=2, project=self.project
             ).exists()
         )
+        self.organization.quota.refresh_from_db()
+        self.assertEqual(self.organization.quota.issue_event_count, 2)
 
     def test_two_issues(self):
         self.process_events(
@@ -0,0 +1,102 @@
+import json
+import uuid
+from datetime import timedelta
+
+from django.utils import timezone
+
+from apps.performance.models import (
+    TransactionEvent,
+    TransactionGroup,
+    TransactionGroupTag,
+)
+from apps.projects.models import TransactionEventProjectMinuteStatistic
+
+from ..process_event import process_transaction_events, transaction_group_cache
+from ..schema import InterchangeTransactionEvent, TransactionEventSchema
+from .utils import EventIngestTestCase
+
+
+class TransactionEventIngestTestCase(EventIngestTestCase):
+    def setUp(self):
+        super().setUp()
+        transaction_group_cache.clear()
+        with open("events/test_data/transactions/django_simple.json") as json_file:
+            self.data = json.load(json_file)[2]
+
+    def process_transactions(self, transactions: list[str]):
+        process_transaction_events(
+            [
+                InterchangeTransactionEvent(
+                    project_id=self.project.id,
+                    organization_id=self.organization.id,
+                    payload=TransactionEventSchema(
+                        **{
+                            **self.data,
+                            "event_id": uuid.uuid4(),
+                            "transaction": transaction,
+                        }
+                    ),
+                )
+                for transaction in transactions
+            ]
+        )
+
+    def test_transaction_groups(self):
+        existing = TransactionGroup.objects.create(
+            project=self.project, transaction="/a", op="http.server", method="GET"
+        )
+        self.process_transactions(["/a", "/b", "/a", "/c", "/b"])
+        self.assertEqual(TransactionEvent.objects.count(), 5)
+        groups = {group.transaction: group for group in TransactionGroup.objects.all()}
+        self.assertEqual(set(groups), {"/a", "/b", "/c"})
+        self.assertEqual(groups["/a"], existing)
+        self.assertEqual(groups["/b"].transactionevent_set.count(), 2)
+
+        # Known groups are resolved from the worker cache
+        with self.assertNumQueries(11):
+            self.process_transactions(["/a", "/b", "/c"] * 10)
+        self.assertEqual(TransactionEvent.objects.count(), 35)
+
+    def test_deleted_cached_group(self):
+        self.process_transactions(["/a"])
+        TransactionGroup.objects.all().delete()
+        # Deferred foreign keys are never checked within the test transaction
+        self.process_transactions(["/a"])
+        self.assertEqual(TransactionEvent.objects.count(), 1)
+        self.assertEqual(TransactionGroup.objects.count(), 1)
+
+    def test_spans(self):
+        self.process_transactions(["/a"])
+        event = TransactionEvent.objects.get()
+        self.assertEqual(event.data["trace"]["span_id"], "a51f11f130d703b2")
+        self.assertEqual(len(event.spans["span_id"]), 9)
+        self.assertEqual(event.spans["span_id"][0], "b822e9dedc69ad38")
+        self.assertEqual(event.spans["parent_span_id"][0], "a51f11f130d703b2")
+        self.assertEqual(event.spans["start"][0], 1.161)
+        self.assertEqual(event.spans["duration"][0], 8.724)
+        self.assertEqual(len(event.spans["description"][0]), 1024)
+
+    def test_tags(self):
+        self.data["environment"] = "prod"
+        self.data["release"] = "1.0"
+        self.process_transactions(["/a", "/a", "/b"])
+        event = TransactionEvent.objects.first()
+        self.assertEqual(event.tags["http.status_code"], "200")
+        self.assertEqual(event.tags["environment"], "prod")
+        self.assertEqual(event.tags["server_name"], "45e6cd65994c")
+        group_tag = TransactionGroupTag.objects.get(
+            group__transaction="/a", tag_key__key="environment"
+        )
+        self.assertEqual(group_tag.tag_value.value, "prod")
+        self.assertEqual(group_tag.count, 2)
+
+    def test_old_start_timestamp(self):
+        start = timezone.now() - timedelta(days=30)
+        self.data["start_timestamp"] = start.isoformat()
+        self.data["timestamp"] = (start + timedelta(seconds=1)).isoformat()
+        self.process_transactions(["/a"])
+        self.assertEqual(TransactionEvent.objects.get().start_timestamp, start)
+        # Counted when received, within the short lived minute partitions
+        stat = TransactionEventProjectMinuteStatistic.objects.get()
+        self.assertLess(timezone.now() - stat.date, timedelta(minutes=2))
+        self.assertEqual(stat.count, 1)
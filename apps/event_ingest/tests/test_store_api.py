@@ -1,6 +1,9 @@
+import uuid
+
 from django.core.cache import cache
 from django.test import override_settings
 from django.urls import reverse
+from model_bakery import baker
 
 from apps.issue_events.constants import IssueEventType
 from apps.issue_events.models import IssueEvent
@@ -43,6 +46,32 @@ class StoreAPITestCase(EventIngestTestCase):
         self.assertEqual(self.project.issues.count(), 1)
         self.assertEqual(IssueEvent.objects.count(), 1)
 
+    def test_rate_limit(self):
+        self.project.rate_limit_count = 3
+        self.project.rate_limit_window = 60
+        self.project.save()
+        self.projectkey.rate_limit_count = 1
+        self.projectkey.rate_limit_window = 60
+        self.projectkey.save()
+        res = self.client.post(self.url, self.event, content_type="application/json")
+        self.assertEqual(res.status_code, 200)
+        res = self.client.post(self.url, self.event, content_type="application/json")
+        self.assertEqual(res.status_code, 429)
+        self.assertEqual(res.headers["Retry-After"], "60")
+
+        # An empty key bucket does not block other keys, the project limit applies
+        # to all keys
+        other_key = baker.make("projects.ProjectKey", project=self.project)
+        url = reverse("api:event_store", args=[self.project.id])
+        for status in [200, 200, 429]:
+            self.event["event_id"] = uuid.uuid4().hex
+            res = self.client.post(
+                url + f"?sentry_key={other_key.public_key}",
+                self.event,
+                content_type="application/json",
+            )
+            self.assertEqual(res.status_code, status)
+
     def test_store_invalid_key(self):
         params = "?sentry_key=lol"
         url = reverse("api:event_store", args=[self.project.id]) + params
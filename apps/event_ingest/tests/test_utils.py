@@ -1,5 +1,19 @@
-from django.test import TestCase
+import uuid
+from datetime import timedelta
+from unittest import mock
 
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from freezegun import freeze_time
+
+from glitchtip.test_utils.fake_redis import FakeAsyncRedis
+
+from ..dedupe import (
+    DEDUPE_WINDOW,
+    get_bit_positions,
+    get_bloom_parameters,
+    is_new_event,
+)
 from ..utils import remove_bad_chars
 
 
@@ -11,3 +25,60 @@ class UtilsTestCase(TestCase):
         self.assertEqual(
             remove_bad_chars([{"\u0000a": {"\u0000b": "b"}}]), [{"a": {"b": "b"}}]
         )
+
+    def test_bloom_parameters(self):
+        size, hash_count = get_bloom_parameters(100_000, 1e-6)
+        self.assertEqual((size, hash_count), (2875518, 20))
+        event_id = uuid.uuid4()
+        positions = get_bit_positions(event_id, size, hash_count)
+        self.assertEqual(positions, get_bit_positions(event_id, size, hash_count))
+        self.assertEqual(len(set(positions)), hash_count)
+        self.assertTrue(all(0 <= position < size for position in positions))
+
+    async def test_is_new_event(self):
+        event_id = uuid.uuid4()
+        self.assertTrue(await is_new_event(event_id))
+        self.assertFalse(await is_new_event(event_id))
+
+
+@mock.patch("apps.event_ingest.dedupe.is_async_redis", return_value=True)
+class RedisDedupeTestCase(TestCase):
+    def setUp(self):
+        self.redis = FakeAsyncRedis()
+        self.pipelines = []
+        pipeline = self.redis.pipeline
+
+        def record_pipeline(transaction=True):
+            self.pipelines.append(pipeline(transaction))
+            return self.pipelines[-1]
+
+        self.redis.pipeline = record_pipeline
+        patcher = mock.patch(
+            "apps.event_ingest.dedupe.get_client", return_value=self.redis
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def assert_dedupes(self):
+        now = timezone.now()
+        event_id = uuid.uuid4()
+        with freeze_time(now):
+            self.assertTrue(await is_new_event(event_id))
+            self.assertFalse(await is_new_event(event_id))
+            self.assertTrue(await is_new_event(uuid.uuid4()))
+        # Found in a previous bucket
+        with freeze_time(now + timedelta(minutes=2)):
+            self.assertFalse(await is_new_event(event_id))
+        # Each check records the id again, forgotten after the window
+        with freeze_time(now + timedelta(minutes=4, seconds=DEDUPE_WINDOW)):
+            self.assertTrue(await is_new_event(event_id))
+
+    @override_settings(GLITCHTIP_EVENT_DEDUPE="set")
+    async def test_set(self, _mock_is_async_redis):
+        await self.assert_dedupes()
+
+    @override_settings(GLITCHTIP_EVENT_DEDUPE="bloom")
+    async def test_bloom(self, _mock_is_async_redis):
+        await self.assert_dedupes()
+        # One BITFIELD per bucket and an EXPIRE
+        self.assertEqual(self.pipelines[0].command_count, 7)
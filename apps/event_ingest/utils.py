@@ -1,8 +1,6 @@
 import hashlib
 from typing import TYPE_CHECKING, List, Optional, Union
 
-from django.core.cache import cache
-
 from .schema import EventMessage
 
 if TYPE_CHECKING:
@@ -60,19 +58,6 @@ def transform_parameterized_message(message: Union[str, EventMessage]) -> str:
     return message.formatted
 
 
-def cache_set_nx(key, value, timeout: Optional[int] = 300) -> bool:
-    """
-    django-redis style cache set with nx, but with fallback for non-redis
-    """
-    try:
-        return cache.set(key, value, timeout, nx=True)
-    except TypeError:
-        if cache.get(key):
-            return False
-        cache.set(key, value, timeout)
-        return True
-
-
 Replacable = str | dict | list
 KNOWN_BADS = ["\u0000", "\x00"]
 
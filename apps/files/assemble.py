@@ -1,4 +1,5 @@
-""" Partial port of sentry/tasks/assemble.py """
+"""Partial port of sentry/tasks/assemble.py"""
+
 import hashlib
 import json
 import shutil
@@ -9,6 +10,7 @@ from os import path
 from django.core.cache import cache
 
 from apps.organizations_ext.models import Organization
+from apps.organizations_ext.quotas import increment_quotas
 from apps.releases.models import Release, ReleaseFile
 from sentry.utils.zip import safe_extract_zip
 
@@ -106,6 +108,7 @@ def assemble_artifacts(organization, version, checksum, chunks):
     # Sentry would add dist to release here
 
     artifacts = manifest.get("files", {})
+    file_size = 0
     for rel_path, artifact in artifacts.items():
         artifact_url = artifact.get("url", rel_path)
         artifact_basename = artifact_url.rsplit("/", 1)[-1]
@@ -135,6 +138,9 @@ def assemble_artifacts(organization, version, checksum, chunks):
             release_file.file = file
             release_file.save(update_fields=["file"])
             old_file.delete()
+        file_size += file.blob.size or 0
+
+    increment_quotas("file_size", {organization.pk: file_size})
 
     set_assemble_status(
         AssembleTask.ARTIFACTS, organization.pk, checksum, ChunkFileState.OK
@@ -1,14 +1,20 @@
 import uuid
+from datetime import timedelta
+from datetime import timezone as dt_timezone
 from typing import Optional
 
-from django.db.models import OuterRef, Subquery
+from django.conf import settings
+from django.db.models import QuerySet, Subquery
+from django.db.models.functions import Coalesce, JSONObject
 from django.http import Http404, HttpResponse
+from django.utils import timezone
 from ninja.pagination import paginate
 
 from glitchtip.api.authentication import AuthHttpRequest
 from glitchtip.api.permissions import has_permission
 
-from ..models import IssueEvent, UserReport
+from ..locator import alocate_event_in
+from ..models import Issue, IssueEvent, UserReport
 from ..schema import IssueEventDetailSchema, IssueEventJsonSchema, IssueEventSchema
 from . import router
 
@@ -30,8 +36,83 @@ def get_queryset(
     return qs.select_related("issue")
 
 
-async def get_user_report(event_id: uuid.UUID) -> Optional[UserReport]:
-    return await UserReport.objects.filter(event_id=event_id).afirst()
+async def filter_event_id(qs: QuerySet, event_id: uuid.UUID) -> QuerySet:
+    """Filter by event id, restricted to the event's partition when it is known"""
+    qs = qs.filter(id=event_id)
+    if location := await alocate_event_in(qs, event_id):
+        qs = qs.filter(**location.filter_kwargs())
+    return qs
+
+
+USER_REPORT_FIELDS = [
+    "id",
+    "project_id",
+    "issue_id",
+    "event_id",
+    "name",
+    "email",
+    "comments",
+    "created",
+]
+
+
+def _neighbor_subquery(event: IssueEvent, is_next: bool, **received_range):
+    qs = IssueEvent.objects.filter(issue_id=event.issue_id, **received_range)
+    if is_next:
+        qs = qs.filter(received__gt=event.received).order_by("received")
+    else:
+        qs = qs.filter(received__lt=event.received).order_by("-received")
+    return Subquery(qs.values("id")[:1])
+
+
+async def set_event_neighbors(event: IssueEvent, include_next=True):
+    """
+    Set previous, next and user_report on an event in a single query
+
+    Neighbors are found with the (issue, -received) index. Each is first searched
+    for with literal received bounds of the event's own day, so postgres prunes
+    to a single daily partition, then falls back to the rest of the retention
+    window only when that day has no neighbor.
+    """
+    day_start = event.received.astimezone(dt_timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    day_end = day_start + timedelta(days=1)
+    oldest = timezone.now() - timedelta(days=settings.GLITCHTIP_MAX_EVENT_LIFE_DAYS)
+
+    annotations = {
+        "previous": Coalesce(
+            _neighbor_subquery(event, False, received__gte=day_start),
+            _neighbor_subquery(
+                event, False, received__gte=oldest, received__lt=day_start
+            ),
+        ),
+        "user_report": Subquery(
+            UserReport.objects.filter(event_id=event.id).values(
+                data=JSONObject(**{field: field for field in USER_REPORT_FIELDS})
+            )[:1]
+        ),
+    }
+    if include_next:
+        annotations["next"] = Coalesce(
+            _neighbor_subquery(event, True, received__lt=day_end),
+            _neighbor_subquery(event, True, received__gte=day_end),
+        )
+    result = (
+        await Issue.objects.filter(id=event.issue_id).values(**annotations).afirst()
+        or {}
+    )
+
+    event.previous = result.get("previous")
+    event.next = result.get("next")
+    event.user_report = None
+    if user_report := result.get("user_report"):
+        event.user_report = UserReport(
+            **{
+                field: UserReport._meta.get_field(field).to_python(value)
+                for field, value in user_report.items()
+            }
+        )
 
 
 @router.get("/issues/{int:issue_id}/events/", response=list[IssueEventSchema])
@@ -50,19 +131,11 @@ async def list_issue_event(
 )
 @has_permission(["event:read", "event:write", "event:admin"])
 async def get_latest_issue_event(request: AuthHttpRequest, issue_id: int):
-    qs = get_queryset(request, issue_id).order_by("-received")
-    qs = qs.annotate(
-        previous=Subquery(
-            qs.filter(received__lt=OuterRef("received"))
-            .order_by("-received")
-            .values("id")[:1]
-        ),
-    )
-    event = await qs.afirst()
+    event = await get_queryset(request, issue_id).order_by("-received").afirst()
     if not event:
         raise Http404()
-    event.next = None  # We know the next after "latest" must be None
-    event.user_report = await get_user_report(event.id)
+    # We know the next after "latest" must be None
+    await set_event_neighbors(event, include_next=False)
     return event
 
 
@@ -73,23 +146,11 @@ async def get_latest_issue_event(request: AuthHttpRequest, issue_id: int):
 )
 @has_permission(["event:read", "event:write", "event:admin"])
 async def get_issue_event(request: AuthHttpRequest, issue_id: int, event_id: uuid.UUID):
-    qs = get_queryset(request, issue_id)
-    qs = qs.annotate(
-        previous=Subquery(
-            qs.filter(received__lt=OuterRef("received"))
-            .order_by("-received")
-            .values("id")[:1]
-        ),
-        next=Subquery(
-            qs.filter(received__gt=OuterRef("received"))
-            .order_by("received")
-            .values("id")[:1]
-        ),
-    )
-    event = await qs.filter(id=event_id).afirst()
+    qs = await filter_event_id(get_queryset(request, issue_id), event_id)
+    event = await qs.afirst()
     if not event:
         raise Http404()
-    event.user_report = await get_user_report(event.id)
+    await set_event_neighbors(event)
     return event
 
 
@@ -126,22 +187,11 @@ async def get_project_issue_event(
     qs = get_queryset(
         request, organization_slug=organization_slug, project_slug=project_slug
     )
-    qs = qs.annotate(
-        previous=Subquery(
-            qs.filter(received__lt=OuterRef("received"))
-            .order_by("-received")
-            .values("id")[:1]
-        ),
-        next=Subquery(
-            qs.filter(received__gt=OuterRef("received"))
-            .order_by("received")
-            .values("id")[:1]
-        ),
-    )
-    event = await qs.filter(id=event_id).afirst()
+    qs = await filter_event_id(qs, event_id)
+    event = await qs.afirst()
     if not event:
         raise Http404()
-    event.user_report = await get_user_report(event.id)
+    await set_event_neighbors(event)
     return event
 
 
@@ -156,7 +206,8 @@ async def get_event_json(
     request: AuthHttpRequest, organization_slug: str, issue_id: int, event_id: uuid.UUID
 ):
     qs = get_queryset(request, organization_slug=organization_slug, issue_id=issue_id)
-    obj = await qs.filter(id=event_id).aget()
+    qs = await filter_event_id(qs, event_id)
+    obj = await qs.aget()
     if not obj:
         return Http404()
     return obj
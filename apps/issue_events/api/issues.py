@@ -17,10 +17,12 @@ from typing_extensions import Annotated
 
 from apps.organizations_ext.models import Organization
 from glitchtip.api.authentication import AuthHttpRequest
+from glitchtip.api.counting import CachedCount
 from glitchtip.api.permissions import has_permission
 from glitchtip.utils import async_call_celery_task
 
 from ..constants import EventStatus, LogLevel
+from ..locator import EventLocation, alocate_event_in
 from ..models import Issue
 from ..schema import IssueDetailSchema, IssueSchema, IssueTagSchema
 from ..tasks import delete_issue_task
@@ -169,6 +171,7 @@ def filter_issue_list(
     filters: Query[IssueFilters],
     sort: Optional[sort_options] = None,
     event_id: Optional[UUID] = None,
+    event_location: Optional[EventLocation] = None,
 ):
     qs_filters = filters.dict(exclude_none=True)
     query = qs_filters.pop("query", None)
@@ -179,7 +182,11 @@ def filter_issue_list(
         qs = qs.filter(**qs_filters)
 
     if event_id:
-        qs = qs.filter(issueevent__id=event_id)
+        # A single filter call, so that the location applies to the same join
+        location_filter = (
+            event_location.filter_kwargs("issueevent__") if event_location else {}
+        )
+        qs = qs.filter(issueevent__id=event_id, **location_filter)
     elif query:
         queries = shlex.split(query)
         # First look for structured queries
@@ -228,7 +235,7 @@ def filter_issue_list(
     by_alias=True,
 )
 @has_permission(["event:read", "event:write", "event:admin"])
-@paginate
+@paginate(count_strategy=CachedCount())
 async def list_issues(
     request: AuthHttpRequest,
     response: HttpResponse,
@@ -238,6 +245,7 @@ async def list_issues(
 ):
     qs = await get_queryset(request, organization_slug=organization_slug)
     event_id: Optional[UUID] = None
+    event_location: Optional[EventLocation] = None
     if filters.query:
         try:
             event_id = UUID(filters.query)
@@ -245,7 +253,9 @@ async def list_issues(
             response["X-Sentry-Direct-Hit"] = "1"
         except ValueError:
             pass
-    return filter_issue_list(qs, filters, sort, event_id)
+        else:
+            event_location = await alocate_event_in(qs, event_id, "issueevent__")
+    return filter_issue_list(qs, filters, sort, event_id, event_location)
 
 
 @router.delete(
@@ -290,7 +300,7 @@ async def update_issues(
     by_alias=True,
 )
 @has_permission(["event:read", "event:write", "event:admin"])
-@paginate
+@paginate(count_strategy=CachedCount())
 async def list_project_issues(
     request: AuthHttpRequest,
     response: HttpResponse,
@@ -303,6 +313,7 @@ async def list_project_issues(
         request, organization_slug=organization_slug, project_slug=project_slug
     )
     event_id: Optional[UUID] = None
+    event_location: Optional[EventLocation] = None
     if filters.query:
         try:
             event_id = UUID(filters.query)
@@ -310,7 +321,9 @@ async def list_project_issues(
             response["X-Sentry-Direct-Hit"] = "1"
         except ValueError:
             pass
-    return filter_issue_list(qs, filters, sort, event_id)
+        else:
+            event_location = await alocate_event_in(qs, event_id, "issueevent__")
+    return filter_issue_list(qs, filters, sort, event_id, event_location)
 
 
 @router.get(
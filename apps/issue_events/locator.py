@@ -0,0 +1,125 @@
+"""
+Event id locator
+
+IssueEvent is range partitioned on received, so a lookup by id alone must probe
+every daily partition. At ingest, each event's id is recorded in a per day redis
+hash of event id bytes to issue id. A direct hit lookup finds the event's day and
+issue with one pipelined round trip, then filters on received to touch a single
+partition. Whole day hashes expire after GLITCHTIP_EVENT_LOCATOR_DAYS, as most
+lookups are of recent events, keeping memory and the number of probed days small.
+
+Event ids are client supplied and not unique, an id may be received again by
+another project or after the dedupe window, and the latest write wins. Callers
+therefore only use a location when their own query finds the event there.
+
+The locator is only available with a redis cache. Lookups return None otherwise,
+or when the event is unknown or older, and callers fall back to an unpruned query.
+"""
+
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from typing import TYPE_CHECKING, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import QuerySet
+from django.utils import timezone
+from django_redis import get_redis_connection
+
+if TYPE_CHECKING:
+    from .models import IssueEvent
+
+EVENT_LOCATOR_KEY = "event_locator:{}"
+
+
+@dataclass
+class EventLocation:
+    issue_id: int
+    day: datetime
+
+    def filter_kwargs(self, prefix: str = "") -> dict:
+        """Queryset filter kwargs that restrict an IssueEvent lookup to its day"""
+        return {
+            f"{prefix}issue_id": self.issue_id,
+            f"{prefix}received__gte": self.day,
+            f"{prefix}received__lt": self.day + timedelta(days=1),
+        }
+
+
+def _get_day(received: datetime) -> datetime:
+    return received.astimezone(dt_timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+def _get_key(day: datetime) -> str:
+    return EVENT_LOCATOR_KEY.format(day.strftime("%Y%m%d"))
+
+
+def _get_locator_days() -> int:
+    if not settings.CACHE_IS_REDIS:
+        return 0
+    return min(
+        settings.GLITCHTIP_EVENT_LOCATOR_DAYS, settings.GLITCHTIP_MAX_EVENT_LIFE_DAYS
+    )
+
+
+def record_event_locations(issue_events: list["IssueEvent"]):
+    """Record the day and issue of newly ingested events"""
+    if not (locator_days := _get_locator_days()) or not issue_events:
+        return
+
+    days: dict[datetime, dict[bytes, int]] = {}
+    for issue_event in issue_events:
+        day = _get_day(issue_event.received)
+        days.setdefault(day, {})[issue_event.id.bytes] = issue_event.issue_id
+
+    retention = timedelta(days=locator_days + 1)
+    with get_redis_connection("default") as con:
+        pipe = con.pipeline(transaction=False)
+        for day, mapping in days.items():
+            key = _get_key(day)
+            pipe.hset(key, mapping=mapping)
+            pipe.expireat(key, day + retention)
+        pipe.execute()
+
+
+def locate_event(event_id: uuid.UUID) -> Optional[EventLocation]:
+    if not (locator_days := _get_locator_days()):
+        return None
+
+    today = _get_day(timezone.now())
+    days = [today - timedelta(days=i) for i in range(locator_days + 1)]
+    with get_redis_connection("default") as con:
+        pipe = con.pipeline(transaction=False)
+        for day in days:
+            pipe.hget(_get_key(day), event_id.bytes)
+        results = pipe.execute()
+
+    for day, issue_id in zip(days, results):
+        if issue_id is not None:
+            return EventLocation(issue_id=int(issue_id), day=day)
+    return None
+
+
+alocate_event = sync_to_async(locate_event)
+
+
+async def alocate_event_in(
+    qs: QuerySet, event_id: uuid.UUID, prefix: str = ""
+) -> Optional[EventLocation]:
+    """
+    Locate an event, only when qs has the event at that location. prefix is the
+    lookup path from qs's model to IssueEvent.
+    """
+    location = await alocate_event(event_id)
+    if (
+        location
+        and await qs.filter(
+            **{f"{prefix}id": event_id}, **location.filter_kwargs(prefix)
+        ).aexists()
+    ):
+        return location
+    return None
@@ -1,50 +1,299 @@
 import json
+import statistics
+import subprocess
+import tracemalloc
+import uuid
+from datetime import datetime
+from pathlib import Path
 from timeit import default_timer as timer
+from types import SimpleNamespace
+from unittest import mock
 
+import orjson
 from django.conf import settings
-from django.core.management.base import BaseCommand
-from django.test import RequestFactory
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_test_environment,
+    teardown_test_environment,
+)
 from django.urls import reverse
+from django.utils import timezone
 
+from apps.event_ingest.process_event import (
+    process_issue_events,
+    process_transaction_events,
+    transaction_group_cache,
+)
+from apps.event_ingest.schema import (
+    InterchangeIssueEvent,
+    InterchangeTransactionEvent,
+)
+from apps.event_ingest.tasks import FLUSH_EVERY
 from apps.organizations_ext.models import Organization
 from apps.projects.models import Project
-from events.test_data.event_generator import get_seeded_benchmark_events
+
+TEST_DATA = Path("events/test_data")
+
+
+def load_issue_events() -> list[dict]:
+    """Store API payloads from real SDKs"""
+    return [
+        json.loads(path.read_text())
+        for path in sorted((TEST_DATA / "incoming_events").glob("*.json"))
+        if path.name != "android_sdk_envelope.json"
+    ]
+
+
+def load_transactions() -> list[dict]:
+    """Transaction payloads, some saved as whole envelopes"""
+    transactions = []
+    for path in sorted((TEST_DATA / "transactions").glob("*.json")):
+        data = json.loads(path.read_text())
+        transactions.append(data[2] if isinstance(data, list) else data)
+    return transactions
+
+
+def to_epoch(value: float | str) -> float:
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).timestamp()
+    return value
+
+
+def make_issue_event(event: dict) -> dict:
+    return {
+        **event,
+        "event_id": uuid.uuid4().hex,
+        "timestamp": timezone.now().isoformat(),
+    }
+
+
+def make_transaction(event: dict) -> dict:
+    """Copy with a new event id, moved to the current time"""
+    offset = timezone.now().timestamp() - to_epoch(event["start_timestamp"])
+
+    def move(data: dict) -> dict:
+        return {
+            **data,
+            **{
+                key: to_epoch(data[key]) + offset
+                for key in ("start_timestamp", "timestamp")
+                if data.get(key)
+            },
+        }
+
+    return {
+        **move(event),
+        "event_id": uuid.uuid4().hex,
+        "spans": [move(span) for span in event.get("spans", [])],
+    }
+
+
+def make_envelope(event: dict) -> bytes:
+    return b"\n".join(
+        orjson.dumps(line)
+        for line in [{"event_id": event["event_id"]}, {"type": "transaction"}, event]
+    )
+
+
+def peak_memory(func) -> int:
+    """Peak bytes allocated while running func"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def get_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
 
 
 class Command(BaseCommand):
-    help = "Time (for performance) ingesting fake events, including celery processing."
+    help = (
+        "Benchmark event ingest against the configured database and cache with the "
+        "events/test_data corpora, writing JSON results. The API is measured with "
+        "celery calls captured, then the captured events are processed in batches "
+        "like the ingest workers. All data is rolled back, so deferred foreign keys "
+        "are never checked."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--events", type=int, default=1000, help="Number of each event type"
+        )
+        parser.add_argument("--batch-size", type=int, default=FLUSH_EVERY)
+        parser.add_argument("--output", help="Write results to this file")
+        parser.add_argument(
+            "--compare", help="Print changes from a previous results file"
+        )
 
     def handle(self, *args, **options):
-        settings.CELERY_TASK_ALWAYS_EAGER = True
-        slug = "benchark-test-jfhr3e3jlek8eewmksde"
-        name = "Benchark Test Do Not Use"
-        organization, _ = Organization.objects.get_or_create(
-            slug=slug, defaults={"name": name}
-        )
-        project, _ = Project.objects.get_or_create(
-            slug=slug, defaults={"name": name, "organization": organization}
-        )
-        project.issue_set.all().delete()
-        key = project.projectkey_set.first()
-        project_id = project.id
-        url = (
-            reverse("event_store", args=[project_id])
-            + "?glitchtip_key="
-            + key.public_key_hex
-        )
-
-        factory = RequestFactory()
-        quantity = 300
-        requests = [
-            factory.post(url, data=json.dumps(event), content_type="application/json")
-            for event in get_seeded_benchmark_events(quantity=quantity)
+        if options["events"] < options["batch_size"] * 3:
+            raise CommandError(
+                "Events must fill at least three batches, a warm up, a memory "
+                "measurement and a timed batch"
+            )
+        setup_test_environment()
+        try:
+            with transaction.atomic():
+                results = self.run_benchmarks(options["events"], options["batch_size"])
+                transaction.set_rollback(True)
+        finally:
+            teardown_test_environment()
+            # Groups cached by the worker were rolled back
+            transaction_group_cache.clear()
+
+        output = json.dumps(results, indent=2)
+        if options["output"]:
+            Path(options["output"]).write_text(output + "\n")
+        else:
+            self.stdout.write(output)
+        if options["compare"]:
+            previous = json.loads(Path(options["compare"]).read_text())
+            self.compare(previous, results)
+
+    def run_benchmarks(self, quantity: int, batch_size: int) -> dict:
+        organization = Organization.objects.create(name="Ingest Benchmark")
+        project = Project.objects.create(
+            name="Ingest Benchmark", organization=organization
+        )
+        key = project.projectkey_set.first().public_key.hex
+        query = f"?sentry_key={key}"
+        store_url = reverse("api:event_store", args=[project.id]) + query
+        envelope_url = reverse("api:event_envelope", args=[project.id]) + query
+
+        issue_corpus = load_issue_events()
+        transaction_corpus = load_transactions()
+        issue_bodies = [
+            orjson.dumps(make_issue_event(issue_corpus[i % len(issue_corpus)]))
+            for i in range(quantity)
+        ]
+        envelope_bodies = [
+            make_envelope(
+                make_transaction(transaction_corpus[i % len(transaction_corpus)])
+            )
+            for i in range(quantity)
+        ]
+
+        issue_events: list[dict] = []
+        transactions: list[dict] = []
+        results = {
+            "commit": get_commit(),
+            "date": timezone.now().isoformat(),
+            "events": quantity,
+            "batch_size": batch_size,
+            "cache": settings.CACHES["default"]["BACKEND"],
+        }
+        results["store_api"] = self.benchmark_api(
+            store_url, issue_bodies, "application/json", issue_events
+        )
+        results["envelope_api"] = self.benchmark_api(
+            envelope_url,
+            envelope_bodies,
+            "application/x-sentry-envelope",
+            transactions,
+        )
+        results["process_issue_events"] = self.benchmark_processing(
+            process_issue_events, InterchangeIssueEvent, issue_events, batch_size
+        )
+        results["process_transaction_events"] = self.benchmark_processing(
+            process_transaction_events,
+            InterchangeTransactionEvent,
+            transactions,
+            batch_size,
+        )
+        return results
+
+    def benchmark_api(
+        self, url: str, bodies: list[bytes], content_type: str, captured: list[dict]
+    ) -> dict:
+        """Parse, validate and authenticate requests, capturing task arguments"""
+
+        async def call_celery_task(task, *args):
+            captured.append(args[0])
+            return SimpleNamespace(task_id=None)
+
+        client = Client()
+
+        def post(body: bytes):
+            response = client.post(url, body, content_type=content_type)
+            if response.status_code != 200:
+                raise AssertionError(response.content)
+
+        with mock.patch(
+            "apps.event_ingest.api.async_call_celery_task", call_celery_task
+        ):
+            # The first request is a warm up, resolving urls and importing modules
+            post(bodies[0])
+            memory = peak_memory(lambda: post(bodies[1]))
+            with CaptureQueriesContext(connection) as queries:
+                start = timer()
+                for body in bodies[2:]:
+                    post(body)
+                seconds = timer() - start
+        requests = len(bodies) - 2
+        return {
+            "requests": requests,
+            "seconds": seconds,
+            "requests_per_second": requests / seconds,
+            "queries_per_request": len(queries) / requests,
+            "request_bytes": statistics.mean(len(body) for body in bodies),
+            "peak_memory_per_request": memory,
+        }
+
+    def benchmark_processing(
+        self, process, interchange_class, events: list[dict], batch_size: int
+    ) -> dict:
+        """Process captured events in worker sized batches"""
+        warm_up, measured, *batches = [
+            events[i : i + batch_size] for i in range(0, len(events), batch_size)
         ]
-        view = EventStoreAPIView.as_view()  # noqa: F821
-
-        start = timer()
-        for request in requests:
-            view(request, id=project_id)
-        end = timer()
-        print(end - start)
-        assert Event.objects.filter(issue__project=project).count() == quantity  # noqa: F821
-        project.issue_set.all().delete()
+        # The first batch creates issues and groups, warming caches
+        process([interchange_class(**event) for event in warm_up])
+        memory = peak_memory(
+            lambda: process([interchange_class(**event) for event in measured])
+        )
+        query_counts = []
+        seconds = 0.0
+        for batch in batches:
+            with CaptureQueriesContext(connection) as queries:
+                start = timer()
+                process([interchange_class(**event) for event in batch])
+                seconds += timer() - start
+            query_counts.append(len(queries))
+        processed = sum(len(batch) for batch in batches)
+        return {
+            "events": processed,
+            "batches": len(query_counts),
+            "seconds": seconds,
+            "events_per_second": processed / seconds if seconds else None,
+            "queries_per_batch": (
+                statistics.mean(query_counts) if query_counts else None
+            ),
+            "max_queries_per_batch": max(query_counts, default=None),
+            "peak_memory_per_event": memory / len(measured),
+        }
+
+    def compare(self, previous: dict, results: dict, path: str = ""):
+        for key, value in results.items():
+            old = previous.get(key)
+            if isinstance(value, dict) and isinstance(old, dict):
+                self.compare(old, value, f"{path}{key}.")
+            elif (
+                isinstance(value, (int, float))
+                and isinstance(old, (int, float))
+                and old
+            ):
+                change = (value - old) / old * 100
+                self.stderr.write(
+                    f"{path}{key}: {old:.6g} -> {value:.6g} ({change:+.1f}%)"
+                )
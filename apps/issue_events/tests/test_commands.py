@@ -1,4 +1,8 @@
+import json
 import random
+import tempfile
+from pathlib import Path
+from unittest import mock
 
 from django.core import management
 from django.test import TestCase
@@ -20,3 +24,48 @@ class CommandsTestCase(TestCase):
         )
         self.assertEqual(Issue.objects.all().count(), 2)
         self.assertEqual(IssueEvent.objects.all().count(), 4)
+
+    @mock.patch(
+        "apps.issue_events.management.commands.ingest_benchmark.teardown_test_environment"
+    )
+    @mock.patch(
+        "apps.issue_events.management.commands.ingest_benchmark.setup_test_environment"
+    )
+    def test_ingest_benchmark(self, *mocks):
+        """The test runner already set up the test environment"""
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / "results.json"
+            management.call_command(
+                "ingest_benchmark", events=30, batch_size=10, output=output
+            )
+            results = json.loads(output.read_text())
+        self.assertEqual(results["events"], 30)
+        self.assertEqual(
+            set(results["store_api"]),
+            {
+                "requests",
+                "seconds",
+                "requests_per_second",
+                "queries_per_request",
+                "request_bytes",
+                "peak_memory_per_request",
+            },
+        )
+        self.assertEqual(results["envelope_api"]["requests"], 28)
+        for key in ("process_issue_events", "process_transaction_events"):
+            self.assertEqual(
+                set(results[key]),
+                {
+                    "events",
+                    "batches",
+                    "seconds",
+                    "events_per_second",
+                    "queries_per_batch",
+                    "max_queries_per_batch",
+                    "peak_memory_per_event",
+                },
+            )
+            self.assertEqual(results[key]["events"], 10)
+            self.assertEqual(results[key]["batches"], 1)
+        # Benchmark data is rolled back
+        self.assertFalse(Issue.objects.exists())
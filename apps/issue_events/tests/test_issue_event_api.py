@@ -1,7 +1,9 @@
 import re
+from datetime import timedelta
 
 from django.test import TestCase
 from django.urls import reverse
+from django.utils import timezone
 from model_bakery import baker
 
 from glitchtip.test_utils.test_case import APIPermissionTestCase, GlitchTipTestCaseMixin
@@ -124,6 +126,39 @@ class IssueEventAPITestCase(GlitchTipTestCaseMixin, TestCase):
         self.assertEqual(event_details["nextEventID"], event3.pk.hex)
         self.assertEqual(event_details["previousEventID"], event1.pk.hex)
 
+    def test_neighbors_across_days(self):
+        issue = baker.make("issue_events.issue", project=self.project)
+        now = timezone.now()
+        older = baker.make(
+            "issue_events.IssueEvent", issue=issue, received=now - timedelta(days=3)
+        )
+        event = baker.make("issue_events.IssueEvent", issue=issue, received=now)
+        newer = baker.make(
+            "issue_events.IssueEvent", issue=issue, received=now + timedelta(days=2)
+        )
+        baker.make("issue_events.IssueEvent", received=now - timedelta(hours=1))
+        user_report = baker.make(
+            "issue_events.UserReport",
+            project=self.project,
+            issue=issue,
+            event_id=event.pk,
+        )
+
+        # Event, then neighbors and user report in one round trip
+        with self.assertNumQueries(2):
+            res = self.client.get(get_issue_event_url(issue.id, event.id))
+        event_details = res.json()
+        self.assertEqual(event_details["previousEventID"], older.pk.hex)
+        self.assertEqual(event_details["nextEventID"], newer.pk.hex)
+        self.assertEqual(event_details["userReport"]["id"], user_report.id)
+        self.assertEqual(event_details["userReport"]["eventID"], event.pk.hex)
+
+        res = self.client.get(get_latest_issue_event_url(issue.id))
+        event_details = res.json()
+        self.assertEqual(event_details["id"], newer.pk.hex)
+        self.assertEqual(event_details["previousEventID"], event.pk.hex)
+        self.assertIsNone(event_details["nextEventID"])
+
     def test_authentication(self):
         url = get_list_issue_event_url(1)
         self.client.logout()
@@ -1,5 +1,6 @@
 import datetime
 import logging
+import re
 from timeit import default_timer as timer
 
 from django.contrib.postgres.search import SearchVector
@@ -144,6 +145,32 @@ class IssueAPITestCase(GlitchTestCase):
         res = self.client.get(self.list_url + "?sort=-priority")
         self.assertEqual(res.json()[0]["id"], str(issue2.id))
 
+    def test_sort_pagination_ties(self):
+        """
+        Keyset cursors must not skip or repeat results when sort values tie
+        """
+        baker.make("issue_events.Issue", project=self.project, count=3, _quantity=4)
+        baker.make("issue_events.Issue", project=self.project, count=1, _quantity=3)
+        link_pattern = r'<([^>]+)>; rel="{}"; results="true"'
+
+        for sort in ["-count", "priority"]:
+            res = self.client.get(self.list_url + f"?sort={sort}")
+            expected = [int(issue["id"]) for issue in res.json()]
+            seen = []
+            url = self.list_url + f"?sort={sort}&limit=2"
+            while url:
+                res = self.client.get(url)
+                seen += [int(issue["id"]) for issue in res.json()]
+                next_link = re.search(link_pattern.format("next"), res.headers["Link"])
+                url = next_link.group(1) if next_link else None
+            self.assertEqual(seen, expected)
+
+        previous_link = re.search(
+            link_pattern.format("previous"), res.headers["Link"]
+        ).group(1)
+        res = self.client.get(previous_link)
+        self.assertEqual([int(issue["id"]) for issue in res.json()], expected[4:6])
+
     def test_search(self):
         issue = baker.make(
             "issue_events.Issue",
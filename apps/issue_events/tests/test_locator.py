@@ -0,0 +1,76 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from model_bakery import baker
+
+from glitchtip.test_utils.fake_redis import FakeRedis
+from glitchtip.test_utils.test_case import GlitchTipTestCaseMixin
+
+from ..locator import locate_event, record_event_locations
+from ..models import Issue, IssueEvent
+
+
+@override_settings(CACHE_IS_REDIS=True, GLITCHTIP_EVENT_LOCATOR_DAYS=7)
+class EventLocatorTestCase(GlitchTipTestCaseMixin, TestCase):
+    def setUp(self):
+        self.create_logged_in_user()
+        self.redis = FakeRedis()
+        patcher = mock.patch(
+            "apps.issue_events.locator.get_redis_connection", return_value=self.redis
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_locate_event(self):
+        event = baker.make("issue_events.IssueEvent", issue__project=self.project)
+        old_event = baker.make(
+            "issue_events.IssueEvent",
+            issue=event.issue,
+            received=timezone.now() - timedelta(days=20),
+        )
+        record_event_locations([event, old_event])
+
+        location = locate_event(event.id)
+        self.assertEqual(location.issue_id, event.issue_id)
+        self.assertEqual(
+            IssueEvent.objects.get(id=event.id, **location.filter_kwargs()), event
+        )
+        self.assertTrue(
+            Issue.objects.filter(
+                issueevent__id=event.id, **location.filter_kwargs("issueevent__")
+            ).exists()
+        )
+        # Ids older than the locator window are not kept
+        self.assertIsNone(locate_event(old_event.id))
+        self.assertEqual(len(self.redis.keys()), 1)
+
+        with override_settings(GLITCHTIP_EVENT_LOCATOR_DAYS=0):
+            self.assertIsNone(locate_event(event.id))
+
+    def test_duplicate_event_id(self):
+        event = baker.make(
+            "issue_events.IssueEvent",
+            issue__project=self.project,
+            received=timezone.now() - timedelta(days=1),
+        )
+        # The same id, later received by another organization's project
+        other_event = baker.make("issue_events.IssueEvent", id=event.id)
+        record_event_locations([event])
+        record_event_locations([other_event])
+        self.assertEqual(locate_event(event.id).issue_id, other_event.issue_id)
+
+        url = reverse(
+            "api:get_issue_event",
+            kwargs={"issue_id": event.issue_id, "event_id": event.id},
+        )
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+
+        res = self.client.get(
+            reverse("api:list_issues", args=[self.organization.slug]),
+            {"query": event.id.hex},
+        )
+        self.assertContains(res, event.id.hex)
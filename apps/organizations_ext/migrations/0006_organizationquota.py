@@ -0,0 +1,42 @@
+# Generated by Django 5.1.3 on 2026-10-19 12:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("organizations_ext", "0005_organization_event_throttle_rate"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OrganizationQuota",
+            fields=[
+                (
+                    "organization",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="quota",
+                        serialize=False,
+                        to="organizations_ext.organization",
+                    ),
+                ),
+                (
+                    "period_start",
+                    models.DateTimeField(
+                        help_text="Start of the billing period when last reconciled",
+                        null=True,
+                    ),
+                ),
+                ("issue_event_count", models.PositiveBigIntegerField(default=0)),
+                ("transaction_count", models.PositiveBigIntegerField(default=0)),
+                ("uptime_check_event_count", models.PositiveBigIntegerField(default=0)),
+                (
+                    "file_size",
+                    models.PositiveBigIntegerField(default=0, help_text="Bytes"),
+                ),
+            ],
+        ),
+    ]
@@ -71,23 +71,21 @@ class OrganizationManager(OrgManager):
             uptime_check_event_count=SubqueryCount(
                 "monitor__checks", filter=checks_subscription_filter
             ),
-            file_size=(
-                Coalesce(
-                    SubquerySum(
-                        "release__releasefile__file__blob__size",
-                        filter=subscription_filter,
-                    ),
-                    0,
-                )
-                + Coalesce(
-                    SubquerySum(
-                        "projects__debuginformationfile__file__blob__size",
-                        filter=subscription_filter,
-                    ),
-                    0,
-                )
+            file_bytes=Coalesce(
+                SubquerySum(
+                    "release__releasefile__file__blob__size",
+                    filter=subscription_filter,
+                ),
+                0,
             )
-            / 1000000,
+            + Coalesce(
+                SubquerySum(
+                    "projects__debuginformationfile__file__blob__size",
+                    filter=subscription_filter,
+                ),
+                0,
+            ),
+            file_size=F("file_bytes") / 1000000,
             total_event_count=F("issue_event_count")
             + F("transaction_count")
             + F("uptime_check_event_count")
@@ -95,6 +93,21 @@ class OrganizationManager(OrgManager):
         )
         return queryset.distinct("pk")
 
+    def with_quota_usage(self):
+        """
+        Annotate total_event_count from the real time OrganizationQuota counters,
+        which only costs a join
+        """
+        return self.annotate(
+            total_event_count=Coalesce(
+                F("quota__issue_event_count")
+                + F("quota__transaction_count")
+                + F("quota__uptime_check_event_count")
+                + F("quota__file_size") / 1000000,
+                0,
+            )
+        ).distinct("pk")
+
 
 class Organization(SharedBaseModel, OrganizationBase):
     slug = OrganizationSlugField(
@@ -261,3 +274,21 @@ class OrganizationOwner(OrganizationOwnerBase):
 
 class OrganizationInvitation(OrganizationInvitationBase):
     """Required to exist for django-organizations"""
+
+
+class OrganizationQuota(models.Model):
+    """
+    Billable usage of an organization in its current billing period, counted as
+    events, transactions, uptime checks and uploads are saved. See quotas.py
+    """
+
+    organization = models.OneToOneField(
+        Organization, on_delete=models.CASCADE, primary_key=True, related_name="quota"
+    )
+    period_start = models.DateTimeField(
+        null=True, help_text="Start of the billing period when last reconciled"
+    )
+    issue_event_count = models.PositiveBigIntegerField(default=0)
+    transaction_count = models.PositiveBigIntegerField(default=0)
+    uptime_check_event_count = models.PositiveBigIntegerField(default=0)
+    file_size = models.PositiveBigIntegerField(default=0, help_text="Bytes")
@@ -0,0 +1,135 @@
+"""
+Real time organization quota usage
+
+Billable usage of an organization is counted in its OrganizationQuota row as it
+happens. Event ingest and uptime checks add to the counters in the same
+statement that upserts their statistics, and uploads with one upsert each, so
+throttle decisions read a single row per organization rather than summing
+statistics across every project.
+
+Counters do not know about billing periods. The periodic reconcile task
+recomputes them from statistics for each organization's current period, which
+resets them when a new period starts and corrects any drift.
+"""
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F
+
+from .models import Organization, OrganizationQuota
+
+QUOTA_FIELDS = (
+    "issue_event_count",
+    "transaction_count",
+    "uptime_check_event_count",
+    "file_size",
+)
+
+
+def get_quota_upsert_sql(field: str, usage_sql: str) -> str:
+    """
+    SQL adding usage to a quota counter field, usable as a CTE of a statistics
+    upsert. usage_sql selects organization_id and count columns.
+    """
+    table = OrganizationQuota._meta.db_table
+    columns = ", ".join(QUOTA_FIELDS)
+    values = ", ".join("count" if f == field else "0" for f in QUOTA_FIELDS)
+    return (
+        f"INSERT INTO {table} (organization_id, {columns})\n"
+        f"SELECT organization_id, {values} FROM ({usage_sql}) AS usage\n"
+        "ORDER BY organization_id\n"  # Mitigate deadlocks
+        "ON CONFLICT (organization_id)\n"
+        f"DO UPDATE SET {field} = {table}.{field} + EXCLUDED.{field}"
+    )
+
+
+def increment_quotas(field: str, counts: dict[int, int]):
+    """Add counts, by organization id, to a quota counter field"""
+    if not settings.BILLING_ENABLED:
+        return
+    data = [(organization_id, count) for organization_id, count in counts.items()]
+    if not data:
+        return
+    with connection.cursor() as cursor:
+        args_str = ",".join(cursor.mogrify("(%s::bigint,%s::bigint)", x) for x in data)
+        cursor.execute(
+            get_quota_upsert_sql(
+                field,
+                f"SELECT * FROM (VALUES {args_str}) AS counts (organization_id, count)",
+            )
+        )
+
+
+def reconcile_quotas():
+    """
+    Set quota counters to the statistics of each current billing period
+
+    Summing statistics is slow, and ingest keeps incrementing counters meanwhile.
+    Counters are read in the same statement as the statistics, which ingest
+    writes together, and only their change since is kept on top of the totals.
+    """
+    if not settings.BILLING_ENABLED:
+        return
+    period_start = "djstripe_customers__subscriptions__current_period_start"
+    organizations = list(
+        Organization.objects.with_event_counts()
+        # The latest subscription decides the period
+        .order_by("pk", F(period_start).desc(nulls_last=True))
+        .values_list(
+            "pk",
+            period_start,
+            "issue_event_count",
+            "transaction_count",
+            "uptime_check_event_count",
+            "file_bytes",
+            *(f"quota__{field}" for field in QUOTA_FIELDS),
+        )
+    )
+    # Organizations without counters at the read have no seen values
+    counted = [row[: len(QUOTA_FIELDS) + 2] for row in organizations if row[-1] is None]
+    recounted = [row for row in organizations if row[-1] is not None]
+    table = OrganizationQuota._meta.db_table
+    columns = ", ".join(QUOTA_FIELDS)
+    with connection.cursor() as cursor:
+        for i in range(0, len(recounted), 1000):
+            args_str = ",".join(
+                cursor.mogrify(
+                    "(%s::int,%s::timestamptz"
+                    + ",%s::bigint" * len(QUOTA_FIELDS) * 2
+                    + ")",
+                    row,
+                )
+                for row in recounted[i : i + 1000]
+            )
+            seen_columns = ", ".join(f"seen_{field}" for field in QUOTA_FIELDS)
+            updates = ", ".join(
+                f"{field} = usage.{field} + {table}.{field} - usage.seen_{field}"
+                for field in QUOTA_FIELDS
+            )
+            cursor.execute(
+                f"UPDATE {table} SET period_start = usage.period_start, {updates}\n"
+                f"FROM (VALUES {args_str}) AS usage "
+                f"(organization_id, period_start, {columns}, {seen_columns})\n"
+                f"WHERE {table}.organization_id = usage.organization_id"
+            )
+        # Counters created since the read only hold newer increments
+        for i in range(0, len(counted), 1000):
+            args_str = ",".join(
+                cursor.mogrify(
+                    "(%s::int,%s::timestamptz"
+                    + ",%s::bigint" * len(QUOTA_FIELDS)
+                    + ")",
+                    row,
+                )
+                for row in counted[i : i + 1000]
+            )
+            updates = ", ".join(
+                f"{field} = {table}.{field} + EXCLUDED.{field}"
+                for field in QUOTA_FIELDS
+            )
+            cursor.execute(
+                f"INSERT INTO {table} (organization_id, period_start, {columns})\n"
+                f"VALUES {args_str}\n"
+                "ON CONFLICT (organization_id) DO UPDATE SET "
+                f"period_start = EXCLUDED.period_start, {updates}"
+            )
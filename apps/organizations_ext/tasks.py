@@ -4,13 +4,15 @@ from django.db.models import Q
 
 from .email import InvitationEmail, MetQuotaEmail
 from .models import Organization
+from .quotas import reconcile_quotas
 
 
 def get_free_tier_organizations_with_event_count():
     """
     Free tier means either no plan selected or only inactive plan
+    Event counts are the real time quota counters
     """
-    return Organization.objects.with_event_counts().filter(
+    return Organization.objects.with_quota_usage().filter(
         Q(djstripe_customers__isnull=True)
         | Q(
             djstripe_customers__subscriptions__plan__amount=0,
@@ -26,9 +28,16 @@ def get_free_tier_organizations_with_event_count():
     )
 
 
+@shared_task
+def reconcile_organization_quotas():
+    """Recount quota counters from statistics, then apply throttling"""
+    reconcile_quotas()
+    set_organization_throttle()
+
+
 @shared_task
 def set_organization_throttle():
-    """Determine if organization should be throttled"""
+    """Determine if organization should be throttled, from quota counters"""
     # Currently throttling only happens if billing is enabled and user has free plan.
     if settings.BILLING_ENABLED:
         events_max = settings.BILLING_FREE_TIER_EVENTS
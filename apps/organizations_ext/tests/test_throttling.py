@@ -1,11 +1,17 @@
+from datetime import timedelta
+from unittest import mock
+
 from django.core import mail
+from django.db.models.query import QuerySet
 from django.test import TestCase, override_settings
 from django.utils import timezone
 from freezegun import freeze_time
 from model_bakery import baker
 
+from ..quotas import increment_quotas, reconcile_quotas
 from ..tasks import (
     get_free_tier_organizations_with_event_count,
+    reconcile_organization_quotas,
     set_organization_throttle,
 )
 
@@ -40,7 +46,7 @@ class OrganizationThrottlingTestCase(TestCase):
                 project__organization=organization,
                 count=3,
             )
-            set_organization_throttle()
+            reconcile_organization_quotas()
             organization.refresh_from_db()
             self.assertTrue(organization.is_accepting_events)
 
@@ -54,7 +60,7 @@ class OrganizationThrottlingTestCase(TestCase):
                 project__organization=organization,
                 count=8,
             )
-            set_organization_throttle()
+            reconcile_organization_quotas()
             organization.refresh_from_db()
             self.assertFalse(organization.is_accepting_events)
             self.assertTrue(mail.outbox[0])
@@ -68,7 +74,7 @@ class OrganizationThrottlingTestCase(TestCase):
                 timezone.datetime(2000, 2, 28)
             )
             subscription.save()
-            set_organization_throttle()
+            reconcile_organization_quotas()
             organization.refresh_from_db()
             self.assertTrue(organization.is_accepting_events)
 
@@ -93,7 +99,7 @@ class OrganizationThrottlingTestCase(TestCase):
                 project__organization=organization,
                 count=1,
             )
-            set_organization_throttle()
+            reconcile_organization_quotas()
             organization.refresh_from_db()
             self.assertFalse(organization.is_accepting_events)
 
@@ -130,6 +136,7 @@ class OrganizationThrottlingTestCase(TestCase):
                 project=project,
                 count=2,
             )
+            reconcile_quotas()
             free_org = get_free_tier_organizations_with_event_count().first()
         self.assertEqual(free_org.total_event_count, 5)
 
@@ -160,9 +167,89 @@ class OrganizationThrottlingTestCase(TestCase):
                 project__organization=organization,
                 count=2,
             )
+        reconcile_quotas()
         with self.assertNumQueries(4):
             set_organization_throttle()
 
+    @override_settings(BILLING_FREE_TIER_EVENTS=10)
+    def test_quota_counters(self):
+        plan = baker.make("djstripe.Plan", active=True, amount=0)
+        organization = baker.make("organizations_ext.Organization")
+        user = baker.make("users.user")
+        organization.add_user(user)
+        customer = baker.make(
+            "djstripe.Customer", subscriber=organization, livemode=False
+        )
+        baker.make(
+            "djstripe.Subscription",
+            customer=customer,
+            livemode=False,
+            plan=plan,
+            status="active",
+            current_period_start=timezone.now(),
+        )
+        increment_quotas("issue_event_count", {organization.id: 6})
+        increment_quotas("uptime_check_event_count", {organization.id: 4})
+        increment_quotas("file_size", {organization.id: 999999})
+        set_organization_throttle()
+        organization.refresh_from_db()
+        self.assertTrue(organization.is_accepting_events)
+
+        increment_quotas("transaction_count", {organization.id: 1})
+        set_organization_throttle()
+        organization.refresh_from_db()
+        self.assertFalse(organization.is_accepting_events)
+        self.assertEqual(organization.quota.issue_event_count, 6)
+
+        # Reconciling recounts statistics, of which there are none
+        reconcile_organization_quotas()
+        organization.refresh_from_db()
+        self.assertTrue(organization.is_accepting_events)
+        self.assertEqual(organization.quota.issue_event_count, 0)
+
+    def test_reconcile_keeps_concurrent_increments(self):
+        plan = baker.make("djstripe.Plan", active=True, amount=0)
+        organization = baker.make("organizations_ext.Organization")
+        customer = baker.make(
+            "djstripe.Customer", subscriber=organization, livemode=False
+        )
+        now = timezone.now()
+        baker.make(
+            "djstripe.Subscription",
+            customer=customer,
+            livemode=False,
+            plan=plan,
+            status="active",
+            current_period_start=now - timedelta(days=1),
+            current_period_end=now + timedelta(days=1),
+        )
+        baker.make(
+            "projects.IssueEventProjectHourlyStatistic",
+            project__organization=organization,
+            date=now,
+            count=3,
+        )
+        values_list = QuerySet.values_list
+        increments = iter([2, 4])
+
+        def read_during_ingest(queryset, *fields):
+            rows = list(values_list(queryset, *fields))
+            # Ingest commits more events after the statistics were read
+            increment_quotas("issue_event_count", {organization.id: next(increments)})
+            return rows
+
+        with mock.patch.object(
+            QuerySet, "values_list", autospec=True, side_effect=read_during_ingest
+        ):
+            # No counter exists at the read, ingest creates it
+            reconcile_quotas()
+            organization.quota.refresh_from_db()
+            self.assertEqual(organization.quota.issue_event_count, 5)
+
+            reconcile_quotas()
+            organization.quota.refresh_from_db()
+            self.assertEqual(organization.quota.issue_event_count, 7)
+
     @override_settings(BILLING_FREE_TIER_EVENTS=1)
     def test_no_plan_throttle(self):
         """
@@ -173,7 +260,7 @@ class OrganizationThrottlingTestCase(TestCase):
         organization.add_user(user)
         project = baker.make("projects.Project", organization=organization)
         baker.make("issue_events.IssueEvent", issue__project=project, _quantity=2)
-        set_organization_throttle()
+        reconcile_organization_quotas()
         organization.refresh_from_db()
         self.assertFalse(organization.is_accepting_events)
 
@@ -190,14 +277,14 @@ class OrganizationThrottlingTestCase(TestCase):
             status="active",
             current_period_end=timezone.make_aware(timezone.datetime(2000, 1, 31)),
         )
-        set_organization_throttle()
+        reconcile_organization_quotas()
         organization.refresh_from_db()
         self.assertTrue(organization.is_accepting_events)
 
         # Cancel plan
         subscription.status = "canceled"
         subscription.save()
-        set_organization_throttle()
+        reconcile_organization_quotas()
         organization.refresh_from_db()
         self.assertFalse(organization.is_accepting_events)
 
@@ -210,7 +297,7 @@ class OrganizationThrottlingTestCase(TestCase):
             status="active",
             current_period_end=timezone.make_aware(timezone.datetime(2000, 1, 31)),
         )
-        set_organization_throttle()
+        reconcile_organization_quotas()
         organization.refresh_from_db()
         self.assertTrue(organization.is_accepting_events)
 
@@ -248,6 +335,6 @@ class OrganizationThrottlingTestCase(TestCase):
         )
 
         # Should not be throttled
-        set_organization_throttle()
+        reconcile_organization_quotas()
         organization.refresh_from_db()
         self.assertTrue(organization.is_accepting_events)
@@ -1,5 +1,4 @@
 from django.contrib import admin
-from django.db.models import Avg
 
 from .models import TransactionEvent, TransactionGroup
 
@@ -14,11 +13,7 @@ class TransactionGroupAdmin(admin.ModelAdmin):
         return obj.avg_duration
 
     def get_queryset(self, request):
-        return (
-            super()
-            .get_queryset(request)
-            .annotate(avg_duration=Avg("transactionevent__duration"))
-        )
+        return TransactionGroup.objects.with_duration_stats()
 
 
 # class SpanInline(admin.TabularInline):
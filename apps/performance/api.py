@@ -1,17 +1,23 @@
-from datetime import datetime
-from typing import Any, Literal
+import uuid
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from typing import Literal
 
-from django.db.models import Avg, Count
-from django.http import HttpResponse
+from django.conf import settings
+from django.db.models import Exists, F, OuterRef, QuerySet
+from django.http import Http404, HttpResponse
 from django.shortcuts import aget_object_or_404
+from django.utils import timezone
 from ninja import Query, Router, Schema
 from ninja.pagination import paginate
 
 from apps.shared.schema.fields import RelativeDateTime
 from glitchtip.api.authentication import AuthHttpRequest
+from glitchtip.api.counting import CachedCount
 
-from .models import TransactionEvent, TransactionGroup
-from .schema import TransactionEventSchema, TransactionGroupSchema
+from .models import TransactionEvent, TransactionGroup, TransactionGroupTag
+from .schema import TraceSchema, TransactionEventSchema, TransactionGroupSchema
+from .spans import unpack_spans
 
 router = Router()
 
@@ -19,19 +25,20 @@ router = Router()
 def get_transaction_group_queryset(
     organization_slug: str, start: datetime | None = None, end: datetime | None = None
 ):
-    qs = TransactionGroup.objects.filter(project__organization__slug=organization_slug)
-    filter_kwargs: dict[str, Any] = {}
-    if start:
-        filter_kwargs["transactionevent__start_timestamp__gte"] = start
-    if end:
-        filter_kwargs["transactionevent__start_timestamp__lte"] = end
-    if filter_kwargs:
-        qs = qs.filter(**filter_kwargs)
-
-    return qs.annotate(
-        avg_duration=Avg("transactionevent__duration"),
-        transaction_count=Count("transactionevent"),
+    """
+    Transaction groups annotated with duration statistics between start and end,
+    read from hourly rollups. Throughput is transactions per minute over the range,
+    which defaults to the transaction event retention period.
+    """
+    qs = TransactionGroup.objects.with_duration_stats(start, end).filter(
+        project__organization__slug=organization_slug
     )
+    range_end = end or timezone.now()
+    range_start = start or range_end - timedelta(
+        days=settings.GLITCHTIP_MAX_TRANSACTION_EVENT_LIFE_DAYS
+    )
+    minutes = max((range_end - range_start).total_seconds() / 60, 1.0)
+    return qs.annotate(throughput=F("transaction_count") / minutes)
 
 
 @router.get(
@@ -42,9 +49,94 @@ def get_transaction_group_queryset(
 async def list_transactions(
     request: AuthHttpRequest, response: HttpResponse, organization_slug: str
 ):
-    return TransactionEvent.objects.filter(
-        group__project__organization__slug=organization_slug
-    ).order_by("start_timestamp")
+    return (
+        TransactionEvent.objects.filter(
+            group__project__organization__slug=organization_slug
+        )
+        .defer("spans")
+        .order_by("start_timestamp")
+    )
+
+
+def to_milliseconds(delta: timedelta) -> float:
+    return round(delta.total_seconds() * 1000, 3)
+
+
+@router.get(
+    "organizations/{slug:organization_slug}/traces/{trace_id}/",
+    response=TraceSchema,
+    by_alias=True,
+)
+async def get_trace(
+    request: AuthHttpRequest, organization_slug: str, trace_id: uuid.UUID
+):
+    """
+    Waterfall of all transactions and spans of a trace, with times relative to
+    the start of the earliest transaction
+    """
+    qs = (
+        TransactionEvent.objects.filter(
+            trace_id=trace_id,
+            group__project__organization__slug=organization_slug,
+            group__project__organization__users=request.auth.user_id,
+        )
+        .select_related("group")
+        .order_by("start_timestamp")
+    )
+    events = [event async for event in qs]
+    if not events:
+        raise Http404()
+
+    trace_start = events[0].start_timestamp
+    trace_end = max(event.timestamp or event.start_timestamp for event in events)
+    transactions = []
+    for event in events:
+        offset = to_milliseconds(event.start_timestamp - trace_start)
+        spans = unpack_spans(event.spans)
+        for span in spans:
+            span["start"] = round(span["start"] + offset, 3)
+        trace_data = event.data.get("trace") or {}
+        transactions.append(
+            {
+                "event_id": event.event_id,
+                "transaction": event.group.transaction,
+                "op": event.group.op,
+                "project": event.group.project_id,
+                "span_id": trace_data.get("span_id"),
+                "parent_span_id": trace_data.get("parent_span_id"),
+                "start": offset,
+                "duration": event.duration,
+                "spans": spans,
+            }
+        )
+    return {
+        "trace_id": trace_id,
+        "start_timestamp": trace_start,
+        "duration": to_milliseconds(trace_end - trace_start),
+        "transactions": transactions,
+    }
+
+
+def filter_tag(
+    qs: QuerySet,
+    key: str,
+    values: list[str],
+    start: datetime | None = None,
+    end: datetime | None = None,
+):
+    """Filter groups with any of the tag values, by the daily tag aggregate"""
+    tags = TransactionGroupTag.objects.filter(
+        group=OuterRef("pk"), tag_key__key=key, tag_value__value__in=values
+    )
+    # Tags are aggregated per day
+    if start:
+        day = start.astimezone(dt_timezone.utc).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        tags = tags.filter(date__gte=day)
+    if end:
+        tags = tags.filter(date__lte=end)
+    return qs.filter(Exists(tags))
 
 
 class TransactionGroupFilters(Schema):
@@ -59,6 +151,7 @@ class TransactionGroupFilters(Schema):
         "-transaction_count",
     ] = "-avg_duration"
     environment: list[str] = []
+    release: list[str] = []
     query: str | None = None
 
 
@@ -67,7 +160,7 @@ class TransactionGroupFilters(Schema):
     response=list[TransactionGroupSchema],
     by_alias=True,
 )
-@paginate
+@paginate(count_strategy=CachedCount())
 async def list_transaction_groups(
     request: AuthHttpRequest,
     response: HttpResponse,
@@ -77,8 +170,9 @@ async def list_transaction_groups(
     queryset = get_transaction_group_queryset(
         organization_slug, start=filters.start, end=filters.end
     )
-    if filters.environment:
-        queryset = queryset.filter(tags__environment__has_any_keys=filters.environment)
+    for key in ("environment", "release"):
+        if values := getattr(filters, key):
+            queryset = filter_tag(queryset, key, values, filters.start, filters.end)
     return queryset.order_by(filters.sort)
 
 
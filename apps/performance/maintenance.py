@@ -1,8 +1,18 @@
-from .models import TransactionGroup
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import TransactionGroup, TransactionGroupHourlyStatistic
 
 
 def cleanup_old_transaction_events():
     """Delete older events and associated data"""
+    TransactionGroupHourlyStatistic.objects.filter(
+        date__lt=timezone.now()
+        - timedelta(days=settings.GLITCHTIP_MAX_TRANSACTION_EVENT_LIFE_DAYS)
+    ).delete()
+
     # Delete ~1k empty transaction groups at a time until less than 1k remain then delete the rest. Avoids memory overload.
     queryset = TransactionGroup.objects.filter(transactionevent=None).order_by("id")
 
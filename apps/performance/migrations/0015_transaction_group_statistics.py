@@ -0,0 +1,71 @@
+# Generated by Django 5.1.3 on 2026-10-19 11:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("performance", "0014_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TransactionGroupHourlyStatistic",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateTimeField()),
+                ("count", models.PositiveIntegerField()),
+                (
+                    "duration_sum",
+                    models.PositiveBigIntegerField(help_text="Milliseconds"),
+                ),
+                (
+                    "duration_sketch",
+                    models.JSONField(
+                        help_text="Duration quantile sketch, see apps.performance.sketch"
+                    ),
+                ),
+                (
+                    "group",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="performance.transactiongroup",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("group", "date")},
+            },
+        ),
+        # Sketch keys as in apps.performance.sketch.get_sketch_key, ln(1.01 / 0.99)
+        migrations.RunSQL(
+            """
+        INSERT INTO performance_transactiongrouphourlystatistic
+          (group_id, date, count, duration_sum, duration_sketch)
+        SELECT group_id, date, sum(count), sum(duration_sum),
+          jsonb_object_agg(sketch_key, count)
+        FROM (
+          SELECT
+            group_id,
+            date_trunc('hour', start_timestamp, 'UTC') AS date,
+            CASE WHEN duration <= 1 THEN 0
+              ELSE ceil(ln(duration) / 0.020000666706669435) END::bigint AS sketch_key,
+            count(*) AS count,
+            sum(duration) AS duration_sum
+          FROM performance_transactionevent
+          GROUP BY 1, 2, 3
+        ) buckets
+        GROUP BY group_id, date;
+        """,
+            migrations.RunSQL.noop,
+        ),
+    ]
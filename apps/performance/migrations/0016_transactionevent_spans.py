@@ -0,0 +1,21 @@
+# Generated by Django 5.1.3 on 2026-10-19 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("performance", "0015_transaction_group_statistics"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transactionevent",
+            name="spans",
+            field=models.JSONField(
+                blank=True,
+                help_text="Column packed, see apps.performance.spans",
+                null=True,
+            ),
+        ),
+    ]
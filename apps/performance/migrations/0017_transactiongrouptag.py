@@ -0,0 +1,77 @@
+# Generated by Django 5.1.3 on 2026-10-19 11:32
+
+import django.db.models.deletion
+import psqlextra.backend.migrations.operations.create_partitioned_model
+import psqlextra.manager.manager
+import psqlextra.models.partitioned
+import psqlextra.types
+from django.db import migrations, models
+
+from glitchtip.model_utils import TestDefaultPartition
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("issue_events", "0001_initial"),
+        ("performance", "0016_transactionevent_spans"),
+    ]
+
+    operations = [
+        psqlextra.backend.migrations.operations.create_partitioned_model.PostgresCreatePartitionedModel(
+            name="TransactionGroupTag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateTimeField()),
+                ("count", models.PositiveIntegerField(default=1)),
+                (
+                    "group",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="performance.transactiongroup",
+                    ),
+                ),
+                (
+                    "tag_key",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="issue_events.tagkey",
+                    ),
+                ),
+                (
+                    "tag_value",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="issue_events.tagvalue",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("group", "date", "tag_key", "tag_value"),
+                        name="transaction_group_tag_key_value_unique",
+                    )
+                ],
+            },
+            partitioning_options={
+                "method": psqlextra.types.PostgresPartitioningMethod["RANGE"],
+                "key": ["date"],
+            },
+            bases=(psqlextra.models.partitioned.PostgresPartitionedModel,),
+            managers=[
+                ("objects", psqlextra.manager.manager.PostgresManager()),
+            ],
+        ),
+        TestDefaultPartition(
+            model_name="TransactionGroupTag",
+            name="default",
+        ),
+    ]
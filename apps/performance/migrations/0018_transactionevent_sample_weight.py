@@ -0,0 +1,20 @@
+# Generated by Django 5.1.3 on 2026-10-19 11:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("performance", "0017_transactiongrouptag"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transactionevent",
+            name="sample_weight",
+            field=models.FloatField(
+                default=1.0,
+                help_text="Number of transactions this sampled event represents",
+            ),
+        ),
+    ]
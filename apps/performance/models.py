@@ -1,12 +1,130 @@
 import uuid
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
 
 from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import F, FloatField, JSONField
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import NullIf
 
-from glitchtip.base_models import CreatedModel
+from glitchtip.base_models import AggregationModel, CreatedModel
 from psqlextra.models import PostgresPartitionedModel
 from psqlextra.types import PostgresPartitioningMethod
 
+from .sketch import LOG_GAMMA, MERGE_SKETCHES_SQL
+
+# Sketch key of TransactionEvent durations, see apps.performance.sketch
+SKETCH_KEY_SQL = (
+    "(CASE WHEN e.duration <= 1 THEN 0 "
+    f"ELSE ceil(ln(e.duration) / {LOG_GAMMA}) END)::bigint::text"
+)
+
+
+def _truncate_hour(value: datetime) -> datetime:
+    return value.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+class TransactionGroupManager(models.Manager):
+    def with_duration_stats(
+        self, start: datetime | None = None, end: datetime | None = None
+    ):
+        """
+        Adds duration annotations for transactions between start and end:
+        transaction_count - Number of transactions, fractional when sampled
+        avg_duration - Mean duration in milliseconds
+        duration_sketch - Quantile sketch, see apps.performance.sketch
+        Whole hours are read from TransactionGroupHourlyStatistic. Only the partial
+        hours at either end of the range are read from TransactionEvent, weighted
+        by sample_weight.
+        """
+        stat_where = ["s.group_id = performance_transactiongroup.id"]
+        stat_params: list = []
+        event_ranges: list[tuple[str, list]] = []
+        hours_start = _truncate_hour(start) if start else None
+        if hours_start and hours_start != start:
+            hours_start += timedelta(hours=1)
+        hours_end = _truncate_hour(end) if end else None
+
+        if start and end and hours_start >= hours_end:
+            stat_where.append("false")
+            event_ranges.append(
+                ("e.start_timestamp >= %s AND e.start_timestamp <= %s", [start, end])
+            )
+        else:
+            if start:
+                stat_where.append("s.date >= %s")
+                stat_params.append(hours_start)
+                if start != hours_start:
+                    event_ranges.append(
+                        (
+                            "e.start_timestamp >= %s AND e.start_timestamp < %s",
+                            [start, hours_start],
+                        )
+                    )
+            if end:
+                stat_where.append("s.date < %s")
+                stat_params.append(hours_end)
+                event_ranges.append(
+                    (
+                        "e.start_timestamp >= %s AND e.start_timestamp <= %s",
+                        [hours_end, end],
+                    )
+                )
+
+        stat_where_sql = " AND ".join(stat_where)
+        stat_from = (
+            f"FROM performance_transactiongrouphourlystatistic s WHERE {stat_where_sql}"
+        )
+        event_from = (
+            "FROM performance_transactionevent e "
+            "WHERE e.group_id = performance_transactiongroup.id AND ("
+            + " OR ".join(f"({where})" for where, _ in event_ranges)
+            + ")"
+        )
+        event_params = [param for _, params in event_ranges for param in params]
+
+        def total(stat_sql: str, event_sql: str, output_field) -> RawSQL:
+            sql = f"(SELECT coalesce(sum({stat_sql}), 0) {stat_from})"
+            params = list(stat_params)
+            if event_ranges:
+                sql += f" + (SELECT coalesce({event_sql}, 0) {event_from})"
+                params += event_params
+            return RawSQL(sql, params, output_field=output_field)
+
+        sketch_rows = (
+            "SELECT key, value FROM performance_transactiongrouphourlystatistic s, "
+            f"jsonb_each_text(s.duration_sketch) WHERE {stat_where_sql}"
+        )
+        sketch_params = list(stat_params)
+        if event_ranges:
+            sketch_rows += (
+                f" UNION ALL SELECT {SKETCH_KEY_SQL}, "
+                f"sum(e.sample_weight)::text {event_from} "
+                "GROUP BY 1"
+            )
+            sketch_params += event_params
+        duration_sketch = RawSQL(
+            "(" + MERGE_SKETCHES_SQL.format(rows=f"({sketch_rows}) sketch_rows") + ")",
+            sketch_params,
+            output_field=JSONField(),
+        )
+
+        qs = self.annotate(
+            transaction_count=total(
+                "s.count", "sum(e.sample_weight)::float", FloatField()
+            ),
+            duration_sum=total(
+                "s.duration_sum", "sum(e.duration * e.sample_weight)", FloatField()
+            ),
+        ).annotate(
+            avg_duration=F("duration_sum") / NullIf(F("transaction_count"), 0.0),
+            duration_sketch=duration_sketch,
+        )
+        if start or end:
+            qs = qs.filter(transaction_count__gt=0)
+        return qs
+
 
 class TransactionGroup(CreatedModel):
     transaction = models.CharField(max_length=1024)
@@ -16,6 +134,8 @@ class TransactionGroup(CreatedModel):
     tags = models.JSONField(default=dict)
     search_vector = SearchVectorField(null=True, editable=False)
 
+    objects = TransactionGroupManager()
+
     class Meta:
         unique_together = (("transaction", "project", "op", "method"),)
 
@@ -23,6 +143,47 @@ class TransactionGroup(CreatedModel):
         return self.transaction
 
 
+class TransactionGroupHourlyStatistic(models.Model):
+    """
+    Per hour duration rollup of a transaction group, maintained during ingest.
+    Old rows are removed during maintenance.
+    """
+
+    group = models.ForeignKey(TransactionGroup, on_delete=models.CASCADE)
+    date = models.DateTimeField()
+    count = models.PositiveIntegerField()
+    duration_sum = models.PositiveBigIntegerField(help_text="Milliseconds")
+    duration_sketch = models.JSONField(
+        help_text="Duration quantile sketch, see apps.performance.sketch"
+    )
+
+    class Meta:
+        unique_together = (("group", "date"),)
+
+
+class TransactionGroupTag(AggregationModel):
+    """
+    Aggregate of transaction event tags for a transaction group, per day.
+    Powers indexed tag filters such as environment and release.
+    """
+
+    group = models.ForeignKey(TransactionGroup, on_delete=models.CASCADE)
+    tag_key = models.ForeignKey("issue_events.TagKey", on_delete=models.CASCADE)
+    tag_value = models.ForeignKey("issue_events.TagValue", on_delete=models.CASCADE)
+    count = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["group", "date", "tag_key", "tag_value"],
+                name="transaction_group_tag_key_value_unique",
+            )
+        ]
+
+    class PartitioningMeta(AggregationModel.PartitioningMeta):
+        pass
+
+
 class TransactionEvent(PostgresPartitionedModel, models.Model):
     event_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     group = models.ForeignKey(TransactionGroup, on_delete=models.CASCADE)
@@ -41,6 +202,12 @@ class TransactionEvent(PostgresPartitionedModel, models.Model):
     # This could be HStore, but jsonb is just as good and removes need for
     # 'django.contrib.postgres' which makes several unnecessary SQL calls
     tags = models.JSONField(default=dict)
+    spans = models.JSONField(
+        null=True, blank=True, help_text="Column packed, see apps.performance.spans"
+    )
+    sample_weight = models.FloatField(
+        default=1.0, help_text="Number of transactions this sampled event represents"
+    )
 
     class Meta:
         ordering = ["-start_timestamp"]
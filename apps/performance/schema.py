@@ -1,3 +1,5 @@
+import uuid
+from datetime import datetime
 from typing import Annotated
 
 from ninja import Field, ModelSchema
@@ -6,6 +8,7 @@ from pydantic.functional_validators import BeforeValidator
 from glitchtip.schema import CamelSchema
 
 from .models import TransactionEvent, TransactionGroup
+from .sketch import get_quantile
 
 
 def coerce_int(v) -> int:
@@ -32,7 +35,11 @@ class TransactionEventSchema(CamelSchema, ModelSchema):
 
 class TransactionGroupSchema(CamelSchema, ModelSchema):
     avg_duration: FlexInt | None
-    transaction_count: int
+    duration_p50: FlexInt | None
+    duration_p95: FlexInt | None
+    duration_p99: FlexInt | None
+    transaction_count: float
+    throughput: float = Field(description="Transactions per minute")
     project: int = Field(validation_alias="project_id")
 
     class Meta:
@@ -43,3 +50,44 @@ class TransactionGroupSchema(CamelSchema, ModelSchema):
             "op",
             "method",
         ]
+
+    @staticmethod
+    def resolve_duration_p50(obj):
+        return get_quantile(obj.duration_sketch, 0.5)
+
+    @staticmethod
+    def resolve_duration_p95(obj):
+        return get_quantile(obj.duration_sketch, 0.95)
+
+    @staticmethod
+    def resolve_duration_p99(obj):
+        return get_quantile(obj.duration_sketch, 0.99)
+
+
+class TraceSpanSchema(CamelSchema):
+    span_id: str
+    parent_span_id: str | None
+    op: str | None
+    description: str | None
+    status: str | None
+    start: float = Field(description="Milliseconds from the trace start")
+    duration: float | None = Field(description="Milliseconds")
+
+
+class TraceTransactionSchema(CamelSchema):
+    event_id: uuid.UUID
+    transaction: str
+    op: str
+    project: int
+    span_id: str | None
+    parent_span_id: str | None
+    start: float = Field(description="Milliseconds from the trace start")
+    duration: int = Field(description="Milliseconds")
+    spans: list[TraceSpanSchema]
+
+
+class TraceSchema(CamelSchema):
+    trace_id: uuid.UUID
+    start_timestamp: datetime
+    duration: float = Field(description="Milliseconds")
+    transactions: list[TraceTransactionSchema]
@@ -0,0 +1,71 @@
+"""
+Mergeable duration quantile sketch
+
+A simplified DDSketch. Durations are counted in logarithmic buckets, so that any
+quantile can be estimated within RELATIVE_ACCURACY of the true value. Sketches
+are stored sparsely as jsonb objects of bucket key to count. Merging is a sum of
+counts per key, which postgres does on upsert and on read across any number of
+hourly rows.
+
+Counts are sums of sample weights, which need not be whole numbers. They are
+stored as integers with stochastic rounding, so that totals across many rows
+are not biased the way rounding to the nearest integer would bias them. Counts
+summed from events at read time are left fractional.
+"""
+
+import math
+import random
+
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LOG_GAMMA = math.log(GAMMA)
+
+# Sum the counts per key of sketch (key, value) rows into one sketch
+MERGE_SKETCHES_SQL = (
+    "SELECT jsonb_object_agg(key, count) FROM ("
+    "SELECT key, sum(value::numeric) AS count FROM {rows} GROUP BY key"
+    ") merged"
+)
+
+
+def stochastic_round(value: float) -> int:
+    """Round up with a probability equal to the fractional part"""
+    whole = math.floor(value)
+    if whole == value:
+        return whole
+    return whole + (random.random() < value - whole)
+
+
+def get_sketch_key(duration: float) -> int:
+    """Bucket key of a duration in milliseconds, durations of 1ms or less share 0"""
+    if duration <= 1:
+        return 0
+    return math.ceil(math.log(duration) / LOG_GAMMA)
+
+
+def build_sketch(
+    durations: list[float], weights: list[float] | None = None
+) -> dict[str, int]:
+    """Count durations per bucket key, optionally weighted by sample weights"""
+    sketch: dict[str, float] = {}
+    for i, duration in enumerate(durations):
+        key = str(get_sketch_key(duration))
+        sketch[key] = sketch.get(key, 0) + (weights[i] if weights else 1)
+    return {key: stochastic_round(count) for key, count in sketch.items()}
+
+
+def get_quantile(sketch: dict[str, int] | None, quantile: float) -> float | None:
+    """Estimate the duration at a quantile (0 to 1) of a sketch"""
+    if not sketch:
+        return None
+    buckets = sorted((int(key), count) for key, count in sketch.items())
+    rank = quantile * (sum(count for _, count in buckets) - 1)
+    seen = 0
+    for key, count in buckets:
+        seen += count
+        if seen > rank:
+            break
+    if key == 0:
+        return 1.0
+    # Midpoint of the bucket, relative to its bounds
+    return 2 * GAMMA**key / (GAMMA + 1)
@@ -0,0 +1,55 @@
+"""
+Column packed transaction spans
+
+A transaction may have hundreds of spans. Rather than a row or object per span,
+spans are stored on their TransactionEvent as one jsonb object of parallel
+arrays, one per column, so keys are not repeated per span. Times are in
+milliseconds, span start relative to the transaction start.
+"""
+
+from datetime import datetime
+from typing import Any
+
+SPAN_COLUMNS = (
+    "span_id",
+    "parent_span_id",
+    "op",
+    "description",
+    "status",
+    "start",
+    "duration",
+)
+MAX_DESCRIPTION_LENGTH = 1024
+
+
+def pack_spans(spans: list[Any], start_timestamp: datetime) -> dict[str, list] | None:
+    """Pack ingested spans, ordered by start time, into column arrays"""
+    if not spans:
+        return None
+    packed: dict[str, list] = {column: [] for column in SPAN_COLUMNS}
+    for span in sorted(spans, key=lambda span: span.start_timestamp):
+        packed["span_id"].append(span.span_id)
+        packed["parent_span_id"].append(span.parent_span_id)
+        packed["op"].append(span.op)
+        packed["description"].append(
+            span.description[:MAX_DESCRIPTION_LENGTH] if span.description else None
+        )
+        packed["status"].append(span.status)
+        packed["start"].append(
+            round((span.start_timestamp - start_timestamp).total_seconds() * 1000, 3)
+        )
+        packed["duration"].append(
+            round((span.timestamp - span.start_timestamp).total_seconds() * 1000, 3)
+            if span.timestamp
+            else None
+        )
+    return packed
+
+
+def unpack_spans(packed: dict[str, list] | None) -> list[dict[str, Any]]:
+    if not packed:
+        return []
+    return [
+        dict(zip(SPAN_COLUMNS, row))
+        for row in zip(*(packed[column] for column in SPAN_COLUMNS))
+    ]
@@ -1,10 +1,13 @@
 import datetime
+import uuid
 
 from django.urls import reverse
 from django.utils import timezone
 from freezegun import freeze_time
 from model_bakery import baker
 
+from apps.event_ingest.process_event import update_transaction_group_statistics
+from apps.performance.models import TransactionEvent
 from glitchtip.test_utils.test_case import GlitchTestCase
 
 
@@ -24,6 +27,59 @@ class TransactionAPITestCase(GlitchTestCase):
         res = self.client.get(self.list_url)
         self.assertContains(res, transaction.event_id)
 
+    def test_trace(self):
+        trace_id = uuid.uuid4()
+        now = timezone.now()
+        baker.make(
+            "performance.TransactionEvent",
+            group__project=self.project,
+            trace_id=trace_id,
+            start_timestamp=now,
+            timestamp=now + datetime.timedelta(milliseconds=100),
+            duration=100,
+            data={"trace": {"span_id": "a", "parent_span_id": None}},
+            spans={
+                "span_id": ["b"],
+                "parent_span_id": ["a"],
+                "op": ["http.client"],
+                "description": ["GET /api/"],
+                "status": ["ok"],
+                "start": [10.5],
+                "duration": [50.0],
+            },
+        )
+        baker.make(
+            "performance.TransactionEvent",
+            group__project=self.project,
+            trace_id=trace_id,
+            start_timestamp=now + datetime.timedelta(milliseconds=20),
+            timestamp=now + datetime.timedelta(milliseconds=50),
+            duration=30,
+            data={"trace": {"span_id": "c", "parent_span_id": "b"}},
+        )
+        baker.make("performance.TransactionEvent", group__project=self.project)
+        url = reverse("api:get_trace", args=[self.organization.slug, trace_id])
+
+        res = self.client.get(url)
+        data = res.json()
+        self.assertEqual(data["duration"], 100)
+        root, child = data["transactions"]
+        self.assertEqual(root["spans"][0]["parentSpanID"], "a")
+        self.assertEqual(root["spans"][0]["start"], 10.5)
+        self.assertEqual(child["parentSpanID"], "b")
+        self.assertEqual(child["start"], 20)
+        self.assertEqual(child["spans"], [])
+
+        res = self.client.get(
+            reverse("api:get_trace", args=[self.organization.slug, uuid.uuid4()])
+        )
+        self.assertEqual(res.status_code, 404)
+
+        # Only members of the organization may view its traces
+        self.client.force_login(baker.make("users.user"))
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, 404)
+
 
 class TransactionGroupAPITestCase(GlitchTestCase):
     @classmethod
@@ -36,6 +92,10 @@ class TransactionGroupAPITestCase(GlitchTestCase):
     def setUp(self):
         self.client.force_login(self.user)
 
+    def update_statistics(self):
+        """Rollups are maintained by ingest, which baker bypasses"""
+        update_transaction_group_statistics(list(TransactionEvent.objects.all()))
+
     def test_list(self):
         group = baker.make("performance.TransactionGroup", project=self.project)
         res = self.client.get(self.list_url)
@@ -69,6 +129,7 @@ class TransactionGroupAPITestCase(GlitchTestCase):
             timestamp=yesterday + datetime.timedelta(seconds=1),
             duration=1000,
         )
+        self.update_statistics()
 
         with freeze_time(now):
             res = self.client.get(self.list_url, {"start": last_minute})
@@ -123,10 +184,13 @@ class TransactionGroupAPITestCase(GlitchTestCase):
         )
         environment = environment_project.environment
         environment.projects.add(self.project)
-        group1 = baker.make(
-            "performance.TransactionGroup",
-            project=self.project,
-            tags={"environment": [environment.name]},
+        group1 = baker.make("performance.TransactionGroup", project=self.project)
+        baker.make(
+            "performance.TransactionGroupTag",
+            group=group1,
+            date=timezone.now(),
+            tag_key__key="environment",
+            tag_value__value=environment.name,
         )
         group2 = baker.make("performance.TransactionGroup", project=self.project)
         res = self.client.get(self.list_url, {"environment": environment.name})
@@ -152,6 +216,7 @@ class TransactionGroupAPITestCase(GlitchTestCase):
             timestamp=now + datetime.timedelta(seconds=1),
             duration=1000,
         )
+        self.update_statistics()
         res = self.client.get(self.list_url)
         self.assertEqual(res.json()[0]["avgDuration"], 3000)
 
@@ -164,3 +229,63 @@ class TransactionGroupAPITestCase(GlitchTestCase):
             + "Z"
         )
         self.assertEqual(res.json()[0]["avgDuration"], 1000)
+
+    def test_percentiles(self):
+        group = baker.make("performance.TransactionGroup", project=self.project)
+        now = datetime.datetime(2024, 1, 1, 12, 30, tzinfo=datetime.timezone.utc)
+        baker.make(
+            "performance.TransactionEvent",
+            group=group,
+            start_timestamp=now - datetime.timedelta(hours=2),
+            timestamp=now - datetime.timedelta(hours=2),
+            duration=iter(range(1, 101)),
+            _quantity=100,
+        )
+        self.update_statistics()
+        # Events in the partial first hour of a range are read directly
+        baker.make(
+            "performance.TransactionEvent",
+            group=group,
+            start_timestamp=now - datetime.timedelta(minutes=165),
+            timestamp=now - datetime.timedelta(minutes=165),
+            duration=10000,
+            _quantity=100,
+        )
+
+        with freeze_time(now):
+            res = self.client.get(self.list_url, {"start": "now-3h"})
+        data = res.json()[0]
+        self.assertEqual(data["transactionCount"], 200)
+        self.assertAlmostEqual(data["throughput"], 200 / 180)
+        self.assertAlmostEqual(data["durationP50"], 100, delta=1)
+        self.assertAlmostEqual(data["durationP95"], 10000, delta=100)
+
+        with freeze_time(now):
+            res = self.client.get(self.list_url, {"end": "now-1h"})
+        data = res.json()[0]
+        self.assertEqual(data["transactionCount"], 100)
+        self.assertAlmostEqual(data["durationP50"], 50, delta=1)
+        self.assertAlmostEqual(data["durationP99"], 99, delta=1)
+
+    def test_weighted_partial_hours(self):
+        group = baker.make("performance.TransactionGroup", project=self.project)
+        now = datetime.datetime(2024, 1, 1, 12, 30, tzinfo=datetime.timezone.utc)
+        baker.make(
+            "performance.TransactionEvent",
+            group=group,
+            start_timestamp=now - datetime.timedelta(minutes=50),
+            timestamp=now - datetime.timedelta(minutes=50),
+            duration=100,
+            sample_weight=1.25,
+            _quantity=2,
+        )
+        # Partial hours are summed from events unrounded, so results are stable
+        for _ in range(3):
+            with freeze_time(now):
+                res = self.client.get(
+                    self.list_url, {"start": "now-1h", "sort": "-transaction_count"}
+                )
+            data = res.json()[0]
+            self.assertEqual(data["transactionCount"], 2.5)
+            self.assertEqual(data["avgDuration"], 100)
+            self.assertAlmostEqual(data["durationP50"], 100, delta=1)
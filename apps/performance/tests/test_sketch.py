@@ -0,0 +1,21 @@
+import random
+
+from django.test import SimpleTestCase
+
+from ..sketch import build_sketch, stochastic_round
+
+
+class SketchTestCase(SimpleTestCase):
+    def test_stochastic_round(self):
+        random.seed(0)
+        self.assertEqual(stochastic_round(3), 3)
+        # Rounding each 1.25 to the nearest integer would count 10000
+        total = sum(stochastic_round(1.25) for _ in range(10000))
+        self.assertAlmostEqual(total, 12500, delta=250)
+
+    def test_weighted_sketch(self):
+        random.seed(0)
+        total = sum(
+            sum(build_sketch([100, 5000], [1.4, 1.4]).values()) for _ in range(1000)
+        )
+        self.assertAlmostEqual(total, 2800, delta=100)
@@ -119,7 +119,8 @@ async def update_project(
         ),
         slug=project_slug,
     )
-    for attr, value in payload.dict().items():
+    # Omitted fields keep their values rather than resetting to schema defaults
+    for attr, value in payload.dict(exclude_unset=True).items():
         setattr(project, attr, value)
     await project.asave()
     return project
@@ -284,11 +285,20 @@ async def update_project_key(
     key_id: UUID,
     payload: ProjectKeyIn,
 ):
-    return await aget_object_or_404(
+    key = await aget_object_or_404(
         get_project_keys_queryset(
             request.auth.user_id, organization_slug, project_slug, key_id=key_id
         )
     )
+    if payload.name is not None:
+        key.name = payload.name
+    # An omitted rate limit is kept, null removes it
+    if "rate_limit" in payload.model_fields_set:
+        rate_limit = payload.rate_limit
+        key.rate_limit_count = rate_limit.count if rate_limit else None
+        key.rate_limit_window = rate_limit.window if rate_limit else None
+    await key.asave(update_fields=["name", "rate_limit_count", "rate_limit_window"])
+    return key
 
 
 @router.post(
@@ -303,7 +313,7 @@ async def create_project_key(
     project_slug: str,
     payload: ProjectKeyIn,
 ):
-    """Create new key for project. Rate limiting not implemented."""
+    """Create new key for project"""
     project = await aget_object_or_404(
         get_projects_queryset(request.auth.user_id, organization_slug),
         slug=project_slug,
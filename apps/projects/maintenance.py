@@ -0,0 +1,19 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils.timezone import now
+
+from .models import (
+    IssueEventProjectDailyStatistic,
+    TransactionEventProjectDailyStatistic,
+)
+
+
+def cleanup_old_daily_statistics():
+    """
+    Daily statistics are not partitioned, delete rows older than the hourly
+    statistics retention instead
+    """
+    cutoff = now() - timedelta(days=settings.GLITCHTIP_MAX_EVENT_LIFE_DAYS * 4)
+    IssueEventProjectDailyStatistic.objects.filter(date__lt=cutoff).delete()
+    TransactionEventProjectDailyStatistic.objects.filter(date__lt=cutoff).delete()
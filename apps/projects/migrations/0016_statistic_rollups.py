@@ -0,0 +1,165 @@
+# Generated by Django 5.1.3 on 2026-10-19 10:30
+
+import django.db.models.deletion
+import psqlextra.backend.migrations.operations.create_partitioned_model
+import psqlextra.manager.manager
+import psqlextra.models.partitioned
+import psqlextra.types
+from django.db import migrations, models
+from glitchtip.model_utils import TestDefaultPartition
+
+BACKFILL_DAILY_SQL = """
+INSERT INTO projects_{prefix}projectdailystatistic (date, project_id, count)
+SELECT date_trunc('day', date AT TIME ZONE 'UTC') AT TIME ZONE 'UTC', project_id, sum(count)
+FROM projects_{prefix}projecthourlystatistic
+GROUP BY 1, 2
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("projects", "0015_rename_label_projectkey_name_projectkey_is_active"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IssueEventProjectDailyStatistic",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateTimeField()),
+                ("count", models.PositiveIntegerField()),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="projects.project",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+                "unique_together": {("project", "date")},
+            },
+        ),
+        psqlextra.backend.migrations.operations.create_partitioned_model.PostgresCreatePartitionedModel(
+            name="IssueEventProjectMinuteStatistic",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateTimeField()),
+                ("count", models.PositiveIntegerField()),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="projects.project",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+                "unique_together": {("project", "date")},
+            },
+            partitioning_options={
+                "method": psqlextra.types.PostgresPartitioningMethod["RANGE"],
+                "key": ["date"],
+            },
+            bases=(psqlextra.models.partitioned.PostgresPartitionedModel,),
+            managers=[
+                ("objects", psqlextra.manager.manager.PostgresManager()),
+            ],
+        ),
+        TestDefaultPartition(
+            model_name="IssueEventProjectMinuteStatistic",
+            name="default",
+        ),
+        migrations.CreateModel(
+            name="TransactionEventProjectDailyStatistic",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateTimeField()),
+                ("count", models.PositiveIntegerField()),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="projects.project",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+                "unique_together": {("project", "date")},
+            },
+        ),
+        psqlextra.backend.migrations.operations.create_partitioned_model.PostgresCreatePartitionedModel(
+            name="TransactionEventProjectMinuteStatistic",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateTimeField()),
+                ("count", models.PositiveIntegerField()),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="projects.project",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+                "unique_together": {("project", "date")},
+            },
+            partitioning_options={
+                "method": psqlextra.types.PostgresPartitioningMethod["RANGE"],
+                "key": ["date"],
+            },
+            bases=(psqlextra.models.partitioned.PostgresPartitionedModel,),
+            managers=[
+                ("objects", psqlextra.manager.manager.PostgresManager()),
+            ],
+        ),
+        TestDefaultPartition(
+            model_name="TransactionEventProjectMinuteStatistic",
+            name="default",
+        ),
+        migrations.RunSQL(
+            BACKFILL_DAILY_SQL.format(prefix="issueevent"),
+            migrations.RunSQL.noop,
+        ),
+        migrations.RunSQL(
+            BACKFILL_DAILY_SQL.format(prefix="transactionevent"),
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.3 on 2026-10-19 11:37
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("projects", "0016_statistic_rollups"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="dynamic_transaction_sampling",
+            field=models.BooleanField(
+                default=True,
+                help_text="When sampling, keep slow transactions and rare transaction names",
+            ),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="transaction_sample_rate",
+            field=models.FloatField(
+                default=1.0,
+                help_text="Share of transaction events to keep, from 0 to 1",
+                validators=[
+                    django.core.validators.MinValueValidator(0),
+                    django.core.validators.MaxValueValidator(1),
+                ],
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.3 on 2026-10-19 11:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("projects", "0017_transaction_sampling"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="rate_limit_count",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                help_text="Events accepted per rate limit window, in addition to key limits",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="rate_limit_window",
+            field=models.PositiveSmallIntegerField(
+                blank=True, help_text="Rate limit window in seconds", null=True
+            ),
+        ),
+    ]
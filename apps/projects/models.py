@@ -3,7 +3,7 @@ from urllib.parse import urlparse
 from uuid import uuid4
 
 from django.conf import settings
-from django.core.validators import MaxValueValidator
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.db.models import Count, Q, QuerySet
 from django.db.models.functions import Cast
@@ -39,6 +39,23 @@ class Project(CreatedModel, SoftDeleteModel):
         validators=[MaxValueValidator(100)],
         help_text="Probability (in percent) on how many events are throttled. Used for throttling at project level",
     )
+    transaction_sample_rate = models.FloatField(
+        default=1.0,
+        validators=[MinValueValidator(0), MaxValueValidator(1)],
+        help_text="Share of transaction events to keep, from 0 to 1",
+    )
+    dynamic_transaction_sampling = models.BooleanField(
+        default=True,
+        help_text="When sampling, keep slow transactions and rare transaction names",
+    )
+    rate_limit_count = models.PositiveSmallIntegerField(
+        blank=True,
+        null=True,
+        help_text="Events accepted per rate limit window, in addition to key limits",
+    )
+    rate_limit_window = models.PositiveSmallIntegerField(
+        blank=True, null=True, help_text="Rate limit window in seconds"
+    )
 
     class Meta:
         unique_together = (("organization", "slug"),)
@@ -227,6 +244,43 @@ class IssueEventProjectHourlyStatistic(ProjectStatisticBase):
         pass
 
 
+class TransactionEventProjectMinuteStatistic(ProjectStatisticBase):
+    """Per minute rollup, short lived, for fine grained stats intervals"""
+
+    class PartitioningMeta(AggregationModel.PartitioningMeta):
+        pass
+
+
+class IssueEventProjectMinuteStatistic(ProjectStatisticBase):
+    """Per minute rollup, short lived, for fine grained stats intervals"""
+
+    class PartitioningMeta(AggregationModel.PartitioningMeta):
+        pass
+
+
+class ProjectDailyStatisticBase(models.Model):
+    """
+    Per day rollup for long time ranges. Small enough to not need partitioning,
+    old rows are removed during maintenance.
+    """
+
+    project = models.ForeignKey("projects.Project", on_delete=models.CASCADE)
+    date = models.DateTimeField()
+    count = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = (("project", "date"),)
+        abstract = True
+
+
+class TransactionEventProjectDailyStatistic(ProjectDailyStatisticBase):
+    pass
+
+
+class IssueEventProjectDailyStatistic(ProjectDailyStatisticBase):
+    pass
+
+
 class ProjectAlertStatus(models.IntegerChoices):
     OFF = 0, "off"
     ON = 1, "on"
@@ -23,6 +23,10 @@ class NameSlugProjectSchema(CamelSchema, ModelSchema):
 class ProjectIn(NameSlugProjectSchema):
     platform: Optional[str] = None  # This shouldn't be needed, but is.
     event_throttle_rate: int = 0  # This shouldn't be needed, but is.
+    transaction_sample_rate: float = Field(default=1.0, ge=0, le=1)
+    dynamic_transaction_sampling: bool = True
+    rate_limit_count: Optional[int] = Field(default=None, ge=1, le=32767)
+    rate_limit_window: Optional[int] = Field(default=None, ge=1, le=32767)
 
     class Meta(NameSlugProjectSchema.Meta):
         model = Project
@@ -31,6 +35,10 @@ class ProjectIn(NameSlugProjectSchema):
             "slug",
             "platform",
             "event_throttle_rate",  # Not in Sentry OSS
+            "transaction_sample_rate",  # Not in Sentry OSS
+            "dynamic_transaction_sampling",  # Not in Sentry OSS
+            "rate_limit_count",  # Not in Sentry OSS
+            "rate_limit_window",  # Not in Sentry OSS
             # "default_rules",
         ]
 
@@ -65,6 +73,10 @@ class ProjectSchema(NameSlugProjectSchema, ModelSchema):
             "created",
             "platform",
             "event_throttle_rate",  # Not in Sentry OSS
+            "transaction_sample_rate",  # Not in Sentry OSS
+            "dynamic_transaction_sampling",  # Not in Sentry OSS
+            "rate_limit_count",  # Not in Sentry OSS
+            "rate_limit_window",  # Not in Sentry OSS
         ]
 
     @staticmethod
@@ -76,8 +88,8 @@ class ProjectSchema(NameSlugProjectSchema, ModelSchema):
 
 
 class KeyRateLimit(CamelSchema):
-    window: int
-    count: int
+    window: int = Field(ge=1, le=32767)
+    count: int = Field(ge=1, le=32767)
 
 
 class ProjectKeyIn(CamelSchema, ModelSchema):
@@ -92,6 +92,23 @@ class ProjectsAPITestCase(TestCase):
         self.assertEqual(self.project.event_throttle_rate, 50)
         self.assertEqual(self.project.platform, "python")
 
+    def test_projects_api_partial_update(self):
+        self.project.transaction_sample_rate = 0.1
+        self.project.dynamic_transaction_sampling = False
+        self.project.rate_limit_count = 10
+        self.project.rate_limit_window = 60
+        self.project.save()
+        res = self.client.put(
+            self.update_url, {"name": "New Name"}, content_type="application/json"
+        )
+        self.assertEqual(res.status_code, 200)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.name, "New Name")
+        self.assertEqual(self.project.transaction_sample_rate, 0.1)
+        self.assertFalse(self.project.dynamic_transaction_sampling)
+        self.assertEqual(self.project.rate_limit_count, 10)
+        self.assertEqual(self.project.rate_limit_window, 60)
+
     def test_projects_pagination(self):
         """
         Test link header pagination
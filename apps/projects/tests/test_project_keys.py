@@ -22,3 +22,27 @@ class ProjectKeyAPITestCase(TestCase):
         project_key = ProjectKey.objects.get()
         res = self.client.get(self.url)
         self.assertContains(res, project_key.public_key_hex)
+
+    def test_update_key(self):
+        project_key = ProjectKey.objects.get()
+        url = reverse(
+            "api:update_project_key",
+            args=[self.organization.slug, self.project.slug, project_key.public_key],
+        )
+        res = self.client.put(
+            url,
+            {"name": "Web", "rateLimit": {"count": 10, "window": 60}},
+            content_type="application/json",
+        )
+        self.assertEqual(res.status_code, 200)
+        project_key.refresh_from_db()
+        self.assertEqual(project_key.rate_limit_count, 10)
+
+        # Omitting the rate limit keeps it, null removes it
+        self.client.put(url, {"name": "Web 2"}, content_type="application/json")
+        project_key.refresh_from_db()
+        self.assertEqual(project_key.name, "Web 2")
+        self.assertEqual(project_key.rate_limit_window, 60)
+        self.client.put(url, {"rateLimit": None}, content_type="application/json")
+        project_key.refresh_from_db()
+        self.assertIsNone(project_key.rate_limit_count)
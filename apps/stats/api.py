@@ -1,4 +1,6 @@
-from datetime import timedelta
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from typing import Optional
 
 from asgiref.sync import sync_to_async
 from django.db import connection
@@ -13,40 +15,75 @@ from .schema import StatsV2Schema
 
 router = Router()
 
-EVENT_TIME_SERIES_SQL = """
-SELECT gs.ts, sum(event_stat.count)
-FROM generate_series(%s, %s, %s::interval) gs (ts)
-LEFT JOIN projects_issueeventprojecthourlystatistic event_stat
-ON event_stat.date >= gs.ts AND event_stat.date < gs.ts +  interval '1 hour'
-WHERE event_stat.project_id = ANY(%s) or event_stat is null
-GROUP BY gs.ts ORDER BY gs.ts;
-"""
-TRANSACTION_TIME_SERIES_SQL = """
-SELECT gs.ts, sum(transaction_stat.count)
-FROM generate_series(%s, %s, %s::interval) gs (ts)
-LEFT JOIN projects_transactioneventprojecthourlystatistic transaction_stat
-ON transaction_stat.date >= gs.ts AND transaction_stat.date < gs.ts +  interval '1 hour'
-WHERE transaction_stat.project_id = ANY(%s) or transaction_stat is null
-GROUP BY gs.ts ORDER BY gs.ts;
+# Rollup tables by granularity, coarsest first
+ROLLUPS = {
+    "error": [
+        (timedelta(days=1), "projects_issueeventprojectdailystatistic"),
+        (timedelta(hours=1), "projects_issueeventprojecthourlystatistic"),
+        (timedelta(minutes=1), "projects_issueeventprojectminutestatistic"),
+    ],
+    "transaction": [
+        (timedelta(days=1), "projects_transactioneventprojectdailystatistic"),
+        (timedelta(hours=1), "projects_transactioneventprojecthourlystatistic"),
+        (timedelta(minutes=1), "projects_transactioneventprojectminutestatistic"),
+    ],
+}
+INTERVALS = {
+    "1d": timedelta(days=1),
+    "1h": timedelta(hours=1),
+    "1m": timedelta(minutes=1),
+}
+TIME_SERIES_SQL = """
+SELECT date, sum(count)
+FROM {table}
+WHERE project_id = ANY(%s) AND date >= %s AND date < %s
+GROUP BY date;
 """
 
 
+def get_rollup(category: str, interval: timedelta) -> tuple[timedelta, str]:
+    """Pick the coarsest rollup table whose buckets fit evenly in the interval"""
+    for granularity, table in ROLLUPS[category]:
+        if interval % granularity == timedelta(0):
+            return granularity, table
+    raise ValueError(f"No rollup for interval {interval}")
+
+
+def truncate(value: datetime, granularity: timedelta) -> datetime:
+    """Truncate to a multiple of granularity since the epoch, in UTC"""
+    value = value.astimezone(dt_timezone.utc)
+    epoch = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+    return value - (value - epoch) % granularity
+
+
 @sync_to_async
-def get_timeseries(category, start, end, interval, project_ids):
-    if category == "error":
-        with connection.cursor() as cursor:
-            cursor.execute(
-                EVENT_TIME_SERIES_SQL,
-                [start, end, interval, project_ids],
-            )
-            return cursor.fetchall()
-    else:
-        with connection.cursor() as cursor:
-            cursor.execute(
-                TRANSACTION_TIME_SERIES_SQL,
-                [start, end, interval, project_ids],
-            )
-            return cursor.fetchall()
+def get_timeseries(
+    category: str,
+    start: datetime,
+    end: datetime,
+    interval: timedelta,
+    project_ids: list[int],
+) -> list[tuple[datetime, Optional[int]]]:
+    """
+    Sum event counts into interval buckets from start until end, inclusive of
+    the bucket containing end. Buckets without events have a count of None.
+    """
+    granularity, table = get_rollup(category, interval)
+    start = truncate(start, interval)
+    end = truncate(end, interval) + interval
+    with connection.cursor() as cursor:
+        cursor.execute(TIME_SERIES_SQL.format(table=table), [project_ids, start, end])
+        rows = cursor.fetchall()
+
+    buckets: dict[datetime, Optional[int]] = {}
+    bucket = start
+    while bucket < end:
+        buckets[bucket] = None
+        bucket += interval
+    for date, count in rows:
+        bucket = date - (date - start) % interval
+        buckets[bucket] = (buckets[bucket] or 0) + count
+    return list(buckets.items())
 
 
 @router.get("organizations/{slug:organization_slug}/stats_v2/")
@@ -62,11 +99,10 @@ async def stats_v2(
     Used to return time series statistics.
     Submit query params start, end, and interval (defaults to 1h)
     Limits results to 1000 intervals. For example if using hours, max days would be 41
+    Counts are read from the coarsest rollup table that fits the interval.
     """
-    start = filters.start.replace(microsecond=0, second=0, minute=0)
-    end = (filters.end + timedelta(hours=1)).replace(microsecond=0, second=0, minute=0)
     field = filters.field
-    interval = filters.interval
+    interval = INTERVALS[filters.interval or "1h"]
     category = filters.category
     # Get projects that are authorized, filtered by organization, and selected by user
     # Intentionally separate SQL call to simplify raw SQL
@@ -80,7 +116,9 @@ async def stats_v2(
     if not project_ids:
         raise Http404()
 
-    series = await get_timeseries(category, start, end, interval, project_ids)
+    series = await get_timeseries(
+        category, filters.start, filters.end, interval, project_ids
+    )
 
     return {
         "intervals": [row[0] for row in series],
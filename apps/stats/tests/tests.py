@@ -1,7 +1,11 @@
+from collections import defaultdict
+from datetime import timedelta
+
 from django.urls import reverse
 from django.utils import timezone
 from model_bakery import baker
 
+from apps.event_ingest.process_event import update_statistics
 from glitchtip.test_utils.test_case import GlitchTipTestCase
 
 
@@ -19,3 +23,39 @@ class StatsV2APITestCase(GlitchTipTestCase):
             {"category": "error", "start": start, "end": end, "field": "sum(quantity)"},
         )
         self.assertEqual(res.status_code, 200)
+
+    def test_rollup_intervals(self):
+        now = timezone.now().replace(hour=12, minute=30, second=0, microsecond=0)
+        data_stats = defaultdict(lambda: defaultdict(int))
+        data_stats[now][self.project.id] = 2
+        data_stats[now + timedelta(minutes=1)][self.project.id] = 3
+        data_stats[now - timedelta(days=1)][self.project.id] = 4
+        update_statistics(data_stats)
+
+        def get_series(interval, start, end):
+            res = self.client.get(
+                self.url,
+                {
+                    "category": "error",
+                    "start": start,
+                    "end": end,
+                    "field": "sum(quantity)",
+                    "interval": interval,
+                },
+            )
+            self.assertEqual(res.status_code, 200)
+            data = res.json()
+            return data["intervals"], data["groups"][0]["series"]["sum(quantity)"]
+
+        intervals, series = get_series(
+            "1m", now - timedelta(minutes=1), now + timedelta(minutes=1)
+        )
+        self.assertEqual(len(intervals), 3)
+        self.assertEqual(series, [None, 2, 3])
+
+        intervals, series = get_series("1h", now - timedelta(hours=1), now)
+        self.assertEqual(series, [None, 5])
+
+        intervals, series = get_series("1d", now - timedelta(days=2), now)
+        self.assertEqual(len(intervals), 3)
+        self.assertEqual(series, [None, 4, 5])
@@ -41,13 +41,6 @@ class MonitorAdmin(admin.ModelAdmin):
     search_fields = ["name", "organization__name"]
     inlines = [MonitorCheckInlineAdmin]
 
-    def get_queryset(self, request):
-        qs = self.model.objects.with_check_annotations()
-        ordering = self.get_ordering(request)
-        if ordering:
-            qs = qs.order_by(*ordering)
-        return qs
-
     def is_up(self, obj):
         return obj.latest_is_up
 
@@ -1,6 +1,8 @@
-from datetime import timedelta
+from datetime import datetime, timedelta
+from typing import Literal
 from uuid import UUID
 
+from asgiref.sync import sync_to_async
 from django.db.models import F, Prefetch, Window
 from django.db.models.functions import RowNumber
 from django.http import Http404, HttpRequest, HttpResponse
@@ -14,16 +16,24 @@ from apps.projects.models import Project
 from glitchtip.api.authentication import AuthHttpRequest
 from glitchtip.utils import async_call_celery_task
 
-from .models import Monitor, MonitorCheck, StatusPage
+from .models import (
+    Monitor,
+    MonitorCheck,
+    MonitorCheckDailyStatistic,
+    MonitorCheckHourlyStatistic,
+    StatusPage,
+)
 from .schema import (
     MonitorCheckResponseTimeSchema,
     MonitorCheckSchema,
+    MonitorCheckStatisticSchema,
     MonitorDetailSchema,
     MonitorIn,
     MonitorSchema,
     StatusPageIn,
     StatusPageSchema,
 )
+from .statistics import update_check_statistics
 from .tasks import send_monitor_notification
 
 router = Router()
@@ -31,9 +41,12 @@ router = Router()
 
 def get_monitor_queryset(user_id: int, organization_slug: str):
     return (
-        Monitor.objects.with_check_annotations()
-        .filter(organization__users=user_id, organization__slug=organization_slug)
-        # Fetch latest 60 checks for each monitor
+        Monitor.objects.filter(
+            organization__users=user_id, organization__slug=organization_slug
+        )
+        # Fetch latest 60 checks for each monitor. These stay raw checks, as each
+        # one's start time and down reason are shown, which the hourly rollups
+        # don't keep. Aggregate uptime and response times come from the rollups.
         .prefetch_related(
             Prefetch(
                 "checks",
@@ -68,15 +81,26 @@ async def heartbeat_check(
     when the service is up.
     """
     monitor = await aget_object_or_404(
-        Monitor.objects.with_check_annotations(),
+        Monitor,
         organization__slug=organization_slug,
         endpoint_id=endpoint_id,
     )
+    now = timezone.now()
+    is_change = monitor.latest_is_up is not True
     monitor_check = await MonitorCheck.objects.acreate(
         monitor=monitor,
         is_up=True,
         reason=None,
-        is_change=monitor.latest_is_up is not True,
+        is_change=is_change,
+        start_check=now,
+    )
+    await Monitor.objects.filter(id=monitor.id).aupdate(
+        latest_is_up=True,
+        last_change=now if is_change else monitor.last_change,
+        last_check_at=now,
+    )
+    await sync_to_async(update_check_statistics)(
+        [{"id": monitor.id, "is_up": True}], now
     )
     if monitor.latest_is_up is False:
         await async_call_celery_task(
@@ -194,6 +218,42 @@ async def list_monitor_checks(
     return checks
 
 
+STATISTIC_INTERVALS = {
+    "1h": (MonitorCheckHourlyStatistic, timedelta(days=1)),
+    "1d": (MonitorCheckDailyStatistic, timedelta(days=30)),
+}
+
+
+@router.get(
+    "organizations/{slug:organization_slug}/monitors/{int:monitor_id}/stats/",
+    response=list[MonitorCheckStatisticSchema],
+    by_alias=True,
+)
+async def list_monitor_stats(
+    request: AuthHttpRequest,
+    organization_slug: str,
+    monitor_id: int,
+    interval: Literal["1h", "1d"] = "1h",
+    start: datetime | None = None,
+):
+    """
+    Up and down counts and response time percentiles per hour or day, from
+    start until now. Defaults to the last day of hours or 30 days.
+    """
+    model, default_range = STATISTIC_INTERVALS[interval]
+    if start is None:
+        start = timezone.now() - default_range
+    return [
+        stat
+        async for stat in model.objects.filter(
+            monitor_id=monitor_id,
+            monitor__organization__slug=organization_slug,
+            monitor__organization__users=request.auth.user_id,
+            date__gte=start,
+        ).order_by("date")
+    ]
+
+
 @router.get(
     "/organizations/{slug:organization_slug}/status-pages/",
     response=list[StatusPageSchema],
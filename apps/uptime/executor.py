@@ -0,0 +1,108 @@
+"""
+Long lived uptime check executor
+
+Celery's perform_checks starts a new event loop and aiohttp session for every batch,
+discarding keep-alive connections, TLS sessions and DNS lookups each time. When
+UPTIME_EXECUTOR is enabled, dispatch_checks instead queues batches in a redis
+sorted set scored by run time. The executor process pops due batches and runs
+them on one event loop with a shared session, so connections are reused across
+batches while a semaphore bounds the number of checks in flight.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+
+import aiohttp
+import orjson
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+from django_redis import get_redis_connection
+
+from .tasks import (
+    UPTIME_BATCH_EXPIRE,
+    UPTIME_BATCHES_KEY,
+    prepare_checks,
+    save_check_results,
+)
+from .utils import fetch_all, get_session_headers
+
+logger = logging.getLogger(__name__)
+
+DNS_CACHE_TTL = 300  # Seconds
+POLL_INTERVAL = 0.1  # Seconds
+
+
+def pop_due_batches(now: datetime) -> list[tuple[list[int], datetime]]:
+    """Atomically remove and return batches that should run by now"""
+    with get_redis_connection() as con:
+        pipe = con.pipeline()
+        pipe.zrangebyscore(UPTIME_BATCHES_KEY, "-inf", now.timestamp())
+        pipe.zremrangebyscore(UPTIME_BATCHES_KEY, "-inf", now.timestamp())
+        members, _ = pipe.execute()
+    batches = []
+    for member in members:
+        batch = orjson.loads(member)
+        batches.append(
+            (batch["monitor_ids"], datetime.fromisoformat(batch["run_time"]))
+        )
+    return batches
+
+
+class UptimeExecutor:
+    def __init__(
+        self,
+        concurrency: int | None = None,
+        limit_per_host: int | None = None,
+    ):
+        self.concurrency = concurrency or settings.UPTIME_EXECUTOR_CONCURRENCY
+        self.limit_per_host = limit_per_host or settings.UPTIME_EXECUTOR_LIMIT_PER_HOST
+        self.tasks: set[asyncio.Task] = set()
+
+    def get_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrency,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=DNS_CACHE_TTL,
+        )
+        return aiohttp.ClientSession(connector=connector, headers=get_session_headers())
+
+    async def perform_checks(
+        self,
+        session: aiohttp.ClientSession,
+        semaphore: asyncio.Semaphore,
+        monitor_ids: list[int],
+        now: datetime,
+    ):
+        results, requests = await sync_to_async(prepare_checks)(monitor_ids, now)
+        if requests:
+            results += await fetch_all(requests, session, semaphore)
+        await sync_to_async(save_check_results)(results, now)
+
+    def start_batch(self, session, semaphore, monitor_ids, run_time):
+        task = asyncio.create_task(
+            self.perform_checks(session, semaphore, monitor_ids, run_time)
+        )
+        self.tasks.add(task)
+        task.add_done_callback(self.on_batch_done)
+
+    def on_batch_done(self, task: asyncio.Task):
+        self.tasks.discard(task)
+        if not task.cancelled() and (exc := task.exception()):
+            logger.error("Uptime check batch failed", exc_info=exc)
+
+    async def run(self):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async with self.get_session() as session:
+            while True:
+                # Long lived process, drop database connections past CONN_MAX_AGE
+                await sync_to_async(close_old_connections)()
+                now = timezone.now()
+                for monitor_ids, run_time in await sync_to_async(pop_due_batches)(now):
+                    # Match celery's expiry of stale perform_checks tasks
+                    if run_time + UPTIME_BATCH_EXPIRE < now:
+                        continue
+                    self.start_batch(session, semaphore, monitor_ids, run_time)
+                await asyncio.sleep(POLL_INTERVAL)
@@ -0,0 +1,16 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils.timezone import now
+
+from .models import MonitorCheckDailyStatistic, MonitorCheckHourlyStatistic
+
+
+def cleanup_old_check_statistics():
+    """
+    Check statistics are not partitioned. Hourly rows are kept as long as checks,
+    daily rows for longer to show uptime history.
+    """
+    retention = timedelta(days=settings.GLITCHTIP_MAX_UPTIME_CHECK_LIFE_DAYS)
+    MonitorCheckHourlyStatistic.objects.filter(date__lt=now() - retention).delete()
+    MonitorCheckDailyStatistic.objects.filter(date__lt=now() - retention * 4).delete()
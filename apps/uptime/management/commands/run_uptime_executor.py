@@ -0,0 +1,35 @@
+import asyncio
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.uptime.executor import UptimeExecutor
+
+
+class Command(BaseCommand):
+    help = "Run uptime checks dispatched to the long lived executor (UPTIME_EXECUTOR)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            help="Maximum checks in flight, default UPTIME_EXECUTOR_CONCURRENCY",
+        )
+        parser.add_argument(
+            "--limit-per-host",
+            type=int,
+            help="Maximum connections per host, default UPTIME_EXECUTOR_LIMIT_PER_HOST",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.CACHE_IS_REDIS:
+            raise CommandError("The uptime executor requires a redis cache")
+        if not settings.UPTIME_EXECUTOR:
+            self.stderr.write(
+                "UPTIME_EXECUTOR is not enabled, checks will still be sent to celery"
+            )
+        executor = UptimeExecutor(options["concurrency"], options["limit_per_host"])
+        try:
+            asyncio.run(executor.run())
+        except KeyboardInterrupt:
+            pass
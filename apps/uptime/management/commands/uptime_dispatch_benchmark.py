@@ -0,0 +1,42 @@
+from random import choice, seed
+from timeit import default_timer as timer
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.uptime.models import Monitor
+from apps.uptime.tasks import bucket_monitors
+
+INTERVALS = [1, 5, 10, 30, 60, 60, 60, 300, 600, 3600]
+TIMEOUTS = [None, 5, 10, 20, 30, 60]
+
+
+class Command(BaseCommand):
+    help = "Time (for performance) bucketing monitors into uptime dispatch ticks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--monitor-quantity", type=int, default=100_000)
+        parser.add_argument("--runs", type=int, default=10)
+
+    def handle(self, *args, **options):
+        seed(0)
+        # Unsaved monitors, bucketing only needs interval and timeout
+        monitors = [
+            Monitor(interval=choice(INTERVALS), timeout=choice(TIMEOUTS))
+            for _ in range(options["monitor_quantity"])
+        ]
+        check_interval = settings.UPTIME_CHECK_INTERVAL
+        runs = options["runs"]
+
+        timings = []
+        for run in range(runs):
+            tick = run * check_interval
+            start = timer()
+            bucket_monitors(monitors, tick, check_interval)
+            timings.append(timer() - start)
+
+        self.stdout.write(
+            f"{len(monitors)} monitors, {runs} runs: "
+            f"mean {sum(timings) / runs:.4f}s, max {max(timings):.4f}s "
+            f"(check interval {check_interval}s)"
+        )
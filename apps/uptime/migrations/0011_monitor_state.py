@@ -0,0 +1,55 @@
+# Generated by Django 5.1.3 on 2026-10-19 10:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("uptime", "0010_auto_20240712_1900"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="monitor",
+            name="last_change",
+            field=models.DateTimeField(
+                editable=False,
+                help_text="Most recent check where is_up state changed",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="monitor",
+            name="last_check_at",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="monitor",
+            name="latest_is_up",
+            field=models.BooleanField(
+                editable=False, help_text="Most recent check is_up result", null=True
+            ),
+        ),
+        migrations.RunSQL(
+            """
+            UPDATE uptime_monitor m
+            SET latest_is_up = latest.is_up, last_check_at = latest.start_check
+            FROM (
+                SELECT DISTINCT ON (monitor_id) monitor_id, is_up, start_check
+                FROM uptime_monitorcheck
+                ORDER BY monitor_id, start_check DESC
+            ) latest
+            WHERE latest.monitor_id = m.id;
+            UPDATE uptime_monitor m
+            SET last_change = change.start_check
+            FROM (
+                SELECT monitor_id, max(start_check) AS start_check
+                FROM uptime_monitorcheck
+                WHERE is_change
+                GROUP BY monitor_id
+            ) change
+            WHERE change.monitor_id = m.id;
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.1.3 on 2026-10-19 11:10
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("uptime", "0011_monitor_state"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MonitorCheckDailyStatistic",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateTimeField()),
+                ("up_count", models.PositiveIntegerField()),
+                ("down_count", models.PositiveIntegerField()),
+                (
+                    "response_times",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.PositiveIntegerField(),
+                        help_text="Histogram of response times over RESPONSE_TIME_BOUNDS",
+                        size=None,
+                    ),
+                ),
+                (
+                    "monitor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="uptime.monitor"
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+                "unique_together": {("monitor", "date")},
+            },
+        ),
+        migrations.CreateModel(
+            name="MonitorCheckHourlyStatistic",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateTimeField()),
+                ("up_count", models.PositiveIntegerField()),
+                ("down_count", models.PositiveIntegerField()),
+                (
+                    "response_times",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.PositiveIntegerField(),
+                        help_text="Histogram of response times over RESPONSE_TIME_BOUNDS",
+                        size=None,
+                    ),
+                ),
+                (
+                    "monitor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="uptime.monitor"
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+                "unique_together": {("monitor", "date")},
+            },
+        ),
+    ]
@@ -1,10 +1,10 @@
 import uuid
 
 from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator, URLValidator
 from django.db import models
-from django.db.models import OuterRef, Subquery
 from django.urls import reverse
 from django.utils.timezone import now
 from django_extensions.db.fields import AutoSlugField
@@ -14,30 +14,7 @@ from psqlextra.models import PostgresPartitionedModel
 from psqlextra.types import PostgresPartitioningMethod
 
 from .constants import HTTP_MONITOR_TYPES, MonitorCheckReason, MonitorType
-
-
-class MonitorManager(models.Manager):
-    def with_check_annotations(self):
-        """
-        Adds MonitorCheck annotations:
-        latest_is_up - Most recent check is_up result
-        last_change - Most recent check where is_up state changed
-        Example: Monitor state: { latest_is_up } since { last_change }
-        """
-        return self.annotate(
-            latest_is_up=Subquery(
-                MonitorCheck.objects.filter(
-                    monitor_id=OuterRef("id"),
-                )
-                .order_by("-start_check")
-                .values("is_up")[:1]
-            ),
-            last_change=Subquery(
-                MonitorCheck.objects.filter(monitor_id=OuterRef("id"), is_change=True)
-                .order_by("-start_check")
-                .values("start_check")[:1]
-            ),
-        )
+from .statistics import get_percentile
 
 
 class OptionalSchemeURLValidator(URLValidator):
@@ -90,8 +67,19 @@ class Monitor(models.Model):
         validators=[MaxValueValidator(60), MinValueValidator(1)],
         help_text="Blank implies default value of 20",
     )
+    # Current state, written alongside each batch of checks so that dispatch and
+    # list views don't need to scan check partitions
+    latest_is_up = models.BooleanField(
+        null=True, editable=False, help_text="Most recent check is_up result"
+    )
+    last_change = models.DateTimeField(
+        null=True,
+        editable=False,
+        help_text="Most recent check where is_up state changed",
+    )
+    last_check_at = models.DateTimeField(null=True, editable=False)
 
-    objects = MonitorManager()
+    STATE_FIELDS = ("latest_is_up", "last_change", "last_check_at")
 
     class Meta:
         indexes = [models.Index(fields=["-created"])]
@@ -102,6 +90,13 @@ class Monitor(models.Model):
     def save(self, *args, **kwargs):
         if self.monitor_type == MonitorType.HEARTBEAT and not self.endpoint_id:
             self.endpoint_id = uuid.uuid4()
+        if not self._state.adding and not kwargs.get("update_fields"):
+            # Don't overwrite state from checks performed since this was loaded
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.STATE_FIELDS
+            ]
         super().save(*args, **kwargs)
         # pylint: disable=import-outside-toplevel
         from apps.uptime.tasks import perform_checks
@@ -165,6 +160,42 @@ class MonitorCheck(PostgresPartitionedModel, models.Model):
         return "Down"
 
 
+class MonitorCheckStatisticBase(models.Model):
+    """
+    Rollup of a monitor's checks, see apps.uptime.statistics. Small enough to not
+    need partitioning, old rows are removed during maintenance.
+    """
+
+    monitor = models.ForeignKey(Monitor, on_delete=models.CASCADE)
+    date = models.DateTimeField()
+    up_count = models.PositiveIntegerField()
+    down_count = models.PositiveIntegerField()
+    response_times = ArrayField(
+        models.PositiveIntegerField(),
+        help_text="Histogram of response times over RESPONSE_TIME_BOUNDS",
+    )
+
+    class Meta:
+        unique_together = (("monitor", "date"),)
+        abstract = True
+
+    @property
+    def response_time_p50(self):
+        return get_percentile(self.response_times, 0.5)
+
+    @property
+    def response_time_p95(self):
+        return get_percentile(self.response_times, 0.95)
+
+
+class MonitorCheckHourlyStatistic(MonitorCheckStatisticBase):
+    pass
+
+
+class MonitorCheckDailyStatistic(MonitorCheckStatisticBase):
+    pass
+
+
 class StatusPage(CreatedModel):
     """
     A status page is a collection of monitors that are available to view
@@ -13,7 +13,7 @@ from pydantic import model_validator
 from glitchtip.schema import CamelSchema
 
 from .constants import HTTP_MONITOR_TYPES, MonitorType
-from .models import Monitor, MonitorCheck, StatusPage
+from .models import Monitor, MonitorCheck, MonitorCheckHourlyStatistic, StatusPage
 
 
 class MonitorCheckSchema(CamelSchema, ModelSchema):
@@ -29,6 +29,17 @@ class MonitorCheckResponseTimeSchema(MonitorCheckSchema, ModelSchema):
         fields = MonitorCheckSchema.Meta.fields + ["response_time"]
 
 
+class MonitorCheckStatisticSchema(CamelSchema, ModelSchema):
+    """Hourly or daily check rollup. Used in monitor detail charts"""
+
+    response_time_p50: int | None
+    response_time_p95: int | None
+
+    class Meta:
+        model = MonitorCheckHourlyStatistic
+        fields = ["date", "up_count", "down_count"]
+
+
 class MonitorIn(CamelSchema, ModelSchema):
     expected_body: str
     expected_status: int | None
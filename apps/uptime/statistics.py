@@ -0,0 +1,108 @@
+"""
+Hourly and daily rollups of monitor checks
+
+Rollups are upserted in the same transaction as each batch of checks, so status
+pages and charts read one row per monitor per bucket. Response times are kept as
+a histogram over RESPONSE_TIME_BOUNDS, which unlike a percentile can be summed
+when merging checks into a bucket.
+"""
+
+from bisect import bisect_right
+from datetime import datetime
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection
+
+from apps.organizations_ext.quotas import get_quota_upsert_sql
+
+# Histogram bucket bounds in milliseconds, each 25% larger than the last.
+# Bucket i counts response times from bound i - 1 up to bound i.
+RESPONSE_TIME_BOUNDS = [round(10 * 1.25**i) for i in range(41)]
+RESPONSE_TIME_BUCKETS = len(RESPONSE_TIME_BOUNDS) + 1
+
+HOURLY_TABLE = "uptime_monitorcheckhourlystatistic"
+DAILY_TABLE = "uptime_monitorcheckdailystatistic"
+UPSERT_SQL = """
+INSERT INTO {table} (date, monitor_id, up_count, down_count, response_times)
+SELECT %s, monitor_id, up_count, down_count, response_times FROM stats
+ON CONFLICT (monitor_id, date) DO UPDATE SET
+  up_count = {table}.up_count + EXCLUDED.up_count,
+  down_count = {table}.down_count + EXCLUDED.down_count,
+  response_times = ARRAY(
+    SELECT a + b
+    FROM unnest({table}.response_times, EXCLUDED.response_times)
+      WITH ORDINALITY AS histogram (a, b, i)
+    ORDER BY i
+  )
+"""
+
+
+def get_response_time_histogram(response_time: float | None) -> list[int]:
+    histogram = [0] * RESPONSE_TIME_BUCKETS
+    if response_time is not None:
+        histogram[bisect_right(RESPONSE_TIME_BOUNDS, response_time)] = 1
+    return histogram
+
+
+def get_percentile(histogram: list[int], percentile: float) -> int | None:
+    """
+    Estimate a response time percentile as the upper bound of the bucket that
+    contains it, at most 25% high. Times past the last bound report that bound.
+    """
+    total = sum(histogram)
+    if not total:
+        return None
+    target = total * percentile
+    seen = 0
+    for i, count in enumerate(histogram):
+        seen += count
+        if count and seen >= target:
+            break
+    return RESPONSE_TIME_BOUNDS[min(i, len(RESPONSE_TIME_BOUNDS) - 1)]
+
+
+def update_check_statistics(results: list[dict], start_check: datetime):
+    """
+    Add check results, all started at start_check, to the hourly and daily rollups
+    and to organization quota counters
+    """
+    if not results:
+        return
+    # Sort to mitigate deadlocks
+    data = sorted(
+        (
+            result["id"],
+            int(result["is_up"]),
+            int(not result["is_up"]),
+            get_response_time_histogram(result.get("response_time")),
+        )
+        for result in results
+    )
+    start_check = start_check.astimezone(dt_timezone.utc)
+    hour = start_check.replace(minute=0, second=0, microsecond=0)
+    day = hour.replace(hour=0)
+    with connection.cursor() as cursor:
+        args_str = ",".join(
+            cursor.mogrify("(%s,%s,%s,%s::integer[])", row) for row in data
+        )
+        hourly_sql = cursor.mogrify(UPSERT_SQL.format(table=HOURLY_TABLE), [hour])
+        daily_sql = cursor.mogrify(UPSERT_SQL.format(table=DAILY_TABLE), [day])
+        quota_sql = ""
+        if settings.BILLING_ENABLED:
+            usage_sql = (
+                "SELECT organization_id, count(*) AS count FROM stats\n"
+                "JOIN uptime_monitor ON uptime_monitor.id = stats.monitor_id\n"
+                "GROUP BY 1"
+            )
+            quota_sql = (
+                "quota AS "
+                f"({get_quota_upsert_sql('uptime_check_event_count', usage_sql)}),\n"
+            )
+        cursor.execute(
+            "WITH stats (monitor_id, up_count, down_count, response_times) AS "
+            f"(VALUES {args_str}),\n"
+            f"{quota_sql}"
+            f"hourly AS ({hourly_sql})\n"
+            f"{daily_sql};"
+        )
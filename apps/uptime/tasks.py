@@ -1,10 +1,12 @@
 import asyncio
-from datetime import timedelta
+from datetime import datetime, timedelta
 from typing import List
 
+import orjson
 from celery import shared_task
 from django.conf import settings
 from django.core.cache import cache
+from django.db import transaction
 from django.db.models import F, Q
 from django.utils import timezone
 from django_redis import get_redis_connection
@@ -14,11 +16,14 @@ from apps.alerts.models import AlertRecipient
 
 from .email import MonitorEmail
 from .models import Monitor, MonitorCheck, MonitorType
-from .utils import fetch_all
-from .webhooks import send_uptime_as_webhook
+from .statistics import update_check_statistics
+from .utils import check_heartbeats, fetch_all
+from .webhooks import send_uptime_as_webhooks
 
 UPTIME_COUNTER_KEY = "uptime_counter"
 UPTIME_TICK_EXPIRE = 2147483647
+UPTIME_BATCHES_KEY = "uptime_batches"
+UPTIME_BATCH_EXPIRE = timedelta(minutes=1)
 UPTIME_CHECK_INTERVAL = settings.UPTIME_CHECK_INTERVAL
 
 
@@ -39,25 +44,28 @@ def bucket_monitors(monitors, tick: int, check_interval=UPTIME_CHECK_INTERVAL):
     {1, {False: [monitor]}}
     {2, {True: [monitor]}}
     """
-    result = {}
-    for i in range(tick, tick + check_interval):
-        fast_tick_monitors = [
-            monitor
-            for monitor in monitors
-            if i % monitor.interval == 0 and monitor.int_timeout < 30
-        ]
-        slow_tick_monitors = [
-            monitor
-            for monitor in monitors
-            if i % monitor.interval == 0 and monitor.int_timeout >= 30
-        ]
-        if fast_tick_monitors or slow_tick_monitors:
-            result[i] = {}
-            if fast_tick_monitors:
-                result[i][True] = fast_tick_monitors
-            if slow_tick_monitors:
-                result[i][False] = slow_tick_monitors
-    return result
+    # Group monitors once by interval and timeout class, then step through each
+    # group's due ticks arithmetically instead of scanning every monitor per tick
+    groups: dict[tuple[int, bool], list] = {}
+    for monitor in monitors:
+        key = (monitor.interval, monitor.int_timeout < 30)
+        groups.setdefault(key, []).append(monitor)
+
+    buckets: dict[int, dict[bool, list]] = {}
+    end = tick + check_interval
+    for (interval, is_fast), group in groups.items():
+        for i in range(tick + -tick % interval, end, interval):
+            buckets.setdefault(i, {}).setdefault(is_fast, []).extend(group)
+
+    # Ticks in order, fast monitors first
+    return {
+        i: {
+            is_fast: buckets[i][is_fast]
+            for is_fast in (True, False)
+            if is_fast in buckets[i]
+        }
+        for i in sorted(buckets)
+    }
 
 
 @shared_task()
@@ -97,52 +105,99 @@ def dispatch_checks():
         .exclude(Q(url="") & ~Q(monitor_type=MonitorType.HEARTBEAT))
         .only("id", "interval", "timeout")
     )
+    batches = []
     for i, (tick, bucket) in enumerate(bucket_monitors(monitors, tick).items()):
         for is_fast, monitors_to_dispatch in bucket.items():
             run_time = now + timedelta(seconds=i)
-            perform_checks.apply_async(
-                args=([m.pk for m in monitors_to_dispatch], run_time),
-                eta=run_time,
-                expires=run_time + timedelta(minutes=1),
-            )
-
-
-@shared_task
-def perform_checks(monitor_ids: List[int], now=None):
+            monitor_ids = [m.pk for m in monitors_to_dispatch]
+            if settings.UPTIME_EXECUTOR and settings.CACHE_IS_REDIS:
+                batches.append((monitor_ids, run_time))
+            else:
+                perform_checks.apply_async(
+                    args=(monitor_ids, run_time),
+                    eta=run_time,
+                    expires=run_time + UPTIME_BATCH_EXPIRE,
+                )
+    if batches:
+        queue_check_batches(batches, now)
+
+
+def queue_check_batches(batches: list[tuple[list[int], datetime]], now: datetime):
     """
-    Performant check monitors and save results
-
-    1. Fetch all monitor data for ids
-    2. Async perform all checks
-    3. Save in bulk results
+    Queue batches for the uptime executor, scored by when they should run.
+    Expired batches, left when no executor is running, are removed.
     """
-    if now is None:
-        now = timezone.now()
-    # Convert queryset to raw list[dict] for asyncio operations
-    monitors = list(
-        Monitor.objects.with_check_annotations().filter(pk__in=monitor_ids).values()
-    )
-    results = asyncio.run(fetch_all(monitors))
+    with get_redis_connection() as con:
+        pipe = con.pipeline()
+        pipe.zremrangebyscore(
+            UPTIME_BATCHES_KEY, "-inf", (now - UPTIME_BATCH_EXPIRE).timestamp()
+        )
+        pipe.zadd(
+            UPTIME_BATCHES_KEY,
+            {
+                orjson.dumps(
+                    {"monitor_ids": monitor_ids, "run_time": run_time.isoformat()}
+                ): run_time.timestamp()
+                for monitor_ids, run_time in batches
+            },
+        )
+        pipe.execute()
+
+
+def prepare_checks(monitor_ids: List[int], now) -> tuple[list[dict], list[dict]]:
+    """
+    Fetch monitor data for ids as raw dicts for asyncio operations.
+    Returns heartbeat results, checked in one query, and monitors needing a request.
+    """
+    monitors = Monitor.objects.filter(pk__in=monitor_ids).values()
+    heartbeats = []
+    requests = []
+    for monitor in monitors:
+        if monitor["monitor_type"] == MonitorType.HEARTBEAT:
+            heartbeats.append(monitor)
+        else:
+            requests.append(monitor)
+    return check_heartbeats(heartbeats, now), requests
+
+
+def save_check_results(results: list[dict], now):
+    """Save checks and monitor state in bulk, then notify of up/down changes"""
     # Filter out "up" heartbeats
     results = [
         result
         for result in results
         if result["monitor_type"] != MonitorType.HEARTBEAT or result["is_up"] is False
     ]
-    monitor_checks = MonitorCheck.objects.bulk_create(
-        [
-            MonitorCheck(
-                monitor_id=result["id"],
-                is_up=result["is_up"],
-                is_change=result["latest_is_up"] != result["is_up"],
-                start_check=now,
-                reason=result.get("reason", None),
-                response_time=result.get("response_time", None),
-                data=result.get("data", None),
-            )
-            for result in results
-        ]
-    )
+    for result in results:
+        result["is_change"] = result["latest_is_up"] != result["is_up"]
+    with transaction.atomic():
+        monitor_checks = MonitorCheck.objects.bulk_create(
+            [
+                MonitorCheck(
+                    monitor_id=result["id"],
+                    is_up=result["is_up"],
+                    is_change=result["is_change"],
+                    start_check=now,
+                    reason=result.get("reason", None),
+                    response_time=result.get("response_time", None),
+                    data=result.get("data", None),
+                )
+                for result in results
+            ]
+        )
+        Monitor.objects.bulk_update(
+            [
+                Monitor(
+                    id=result["id"],
+                    latest_is_up=result["is_up"],
+                    last_change=now if result["is_change"] else result["last_change"],
+                    last_check_at=now,
+                )
+                for result in results
+            ],
+            Monitor.STATE_FIELDS,
+        )
+        update_check_statistics(results, now)
     for i, result in enumerate(results):
         if result["latest_is_up"] is True and result["is_up"] is False:
             send_monitor_notification.delay(
@@ -154,11 +209,29 @@ def perform_checks(monitor_ids: List[int], now=None):
             )
 
 
+@shared_task
+def perform_checks(monitor_ids: List[int], now=None):
+    """
+    Performant check monitors and save results
+
+    1. Fetch all monitor data for ids
+    2. Check heartbeats in one query, async perform all other checks
+    3. Save in bulk results
+    """
+    if now is None:
+        now = timezone.now()
+    results, requests = prepare_checks(monitor_ids, now)
+    if requests:
+        results += asyncio.run(fetch_all(requests))
+    save_check_results(results, now)
+
+
 @shared_task
 def send_monitor_notification(monitor_check_id: int, went_down: bool, last_change: str):
     recipients = AlertRecipient.objects.filter(
         alert__project__monitor__checks=monitor_check_id, alert__uptime=True
     )
+    webhook_recipients = []
     for recipient in recipients:
         if recipient.recipient_type == RecipientType.EMAIL:
             MonitorEmail(
@@ -167,4 +240,7 @@ def send_monitor_notification(monitor_check_id: int, went_down: bool, last_chang
                 last_change=last_change if last_change else None,
             ).send_users_email()
         elif recipient.is_webhook:
-            send_uptime_as_webhook(recipient, monitor_check_id, went_down, last_change)
+            webhook_recipients.append(recipient)
+    send_uptime_as_webhooks(
+        webhook_recipients, monitor_check_id, went_down, last_change
+    )
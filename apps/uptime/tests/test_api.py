@@ -7,6 +7,7 @@ from freezegun import freeze_time
 from model_bakery import baker
 
 from apps.uptime.models import Monitor, MonitorCheck
+from apps.uptime.statistics import update_check_statistics
 from glitchtip.test_utils.test_case import GlitchTestCase
 
 
@@ -25,7 +26,11 @@ class UptimeAPITestCase(GlitchTestCase):
     @mock.patch("apps.uptime.tasks.perform_checks.run")
     def test_list(self, mocked):
         monitor = baker.make(
-            "uptime.Monitor", organization=self.organization, url="http://example.com"
+            "uptime.Monitor",
+            organization=self.organization,
+            url="http://example.com",
+            latest_is_up=True,
+            last_change="2021-09-19T15:40:31Z",
         )
         baker.make(
             "uptime.MonitorCheck",
@@ -198,6 +203,7 @@ class UptimeAPITestCase(GlitchTestCase):
             is_change=True,
             start_check=now,
         )
+        Monitor.objects.filter(pk=monitor.pk).update(latest_is_up=True, last_change=now)
 
         url = reverse("api:get_monitor", args=[self.organization.slug, monitor.pk])
         res = self.client.get(url)
@@ -207,6 +213,53 @@ class UptimeAPITestCase(GlitchTestCase):
         self.assertEqual(data["environment"], environment.pk)
         self.assertIn("responseTime", data["checks"][0])
 
+    @mock.patch("apps.uptime.tasks.perform_checks.run")
+    def test_monitor_stats_list(self, _):
+        monitor = baker.make(
+            "uptime.Monitor", organization=self.organization, url="http://example.com"
+        )
+        now = timezone.now()
+        update_check_statistics(
+            [{"id": monitor.pk, "is_up": True, "response_time": 100}], now
+        )
+        update_check_statistics(
+            [{"id": monitor.pk, "is_up": False}], now - timezone.timedelta(days=2)
+        )
+        other_monitor = baker.make("uptime.Monitor", url="http://example.com")
+        update_check_statistics(
+            [{"id": other_monitor.pk, "is_up": True, "response_time": 100}], now
+        )
+
+        url = reverse(
+            "api:list_monitor_stats", args=[self.organization.slug, monitor.pk]
+        )
+        res = self.client.get(url)
+        self.assertEqual(
+            res.json(),
+            [
+                {
+                    "date": now.replace(minute=0, second=0, microsecond=0)
+                    .isoformat()
+                    .replace("+00:00", "Z"),
+                    "upCount": 1,
+                    "downCount": 0,
+                    "responseTimeP50": 116,
+                    "responseTimeP95": 116,
+                }
+            ],
+        )
+
+        res = self.client.get(url, {"interval": "1d"})
+        self.assertEqual(
+            [(stat["upCount"], stat["downCount"]) for stat in res.json()],
+            [(0, 1), (1, 0)],
+        )
+
+        url = reverse(
+            "api:list_monitor_stats", args=[self.organization.slug, other_monitor.pk]
+        )
+        self.assertEqual(self.client.get(url).json(), [])
+
     @mock.patch("apps.uptime.tasks.perform_checks.run")
     def test_monitor_checks_list(self, _):
         monitor = baker.make(
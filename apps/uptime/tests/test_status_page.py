@@ -1,4 +1,7 @@
+from datetime import timedelta
+
 from django.urls import reverse
+from django.utils import timezone
 from model_bakery import baker
 
 from glitchtip.test_utils.test_case import GlitchTestCase
@@ -29,6 +32,33 @@ class StatusPageTestCase(GlitchTestCase):
         res = self.client.get(url)
         self.assertContains(res, status_page.name)
 
+    def test_status_page_uptime(self):
+        status_page = baker.make(
+            "uptime.StatusPage", organization=self.organization, is_public=True
+        )
+        monitor = baker.make(
+            "uptime.Monitor",
+            organization=self.organization,
+            monitor_type="Heartbeat",
+        )
+        status_page.monitors.add(monitor)
+        baker.make(
+            "uptime.MonitorCheckDailyStatistic",
+            monitor=monitor,
+            date=timezone.now(),
+            up_count=999,
+            down_count=1,
+        )
+        baker.make(
+            "uptime.MonitorCheckDailyStatistic",
+            monitor=monitor,
+            date=timezone.now() - timedelta(days=31),
+            up_count=0,
+            down_count=100,
+        )
+        res = self.client.get(status_page.get_absolute_url())
+        self.assertContains(res, "99.90% uptime")
+
     def test_status_page_api(self):
         status_page = baker.make("uptime.StatusPage", organization=self.organization)
         other_status_page = baker.make("uptime.StatusPage")
@@ -1,7 +1,10 @@
 import asyncio
+from datetime import datetime
+from datetime import timezone as dt_timezone
 from unittest import mock
 
 from aioresponses import aioresponses
+from asgiref.sync import async_to_sync
 from django.core import mail
 from django.core.cache import cache
 from django.urls import reverse
@@ -14,9 +17,16 @@ from apps.projects.models import ProjectAlertStatus
 from glitchtip.test_utils.test_case import GlitchTipTestCase
 
 from ..constants import MonitorType
-from ..models import Monitor, MonitorCheck
+from ..executor import UptimeExecutor
+from ..models import (
+    Monitor,
+    MonitorCheck,
+    MonitorCheckDailyStatistic,
+    MonitorCheckHourlyStatistic,
+)
+from ..statistics import get_percentile, update_check_statistics
 from ..tasks import UPTIME_COUNTER_KEY, bucket_monitors, dispatch_checks
-from ..utils import fetch_all
+from ..utils import check_heartbeats, fetch_all
 from ..webhooks import send_uptime_as_webhook
 
 
@@ -62,9 +72,21 @@ class UptimeTestCase(GlitchTipTestCase):
 
         cache.set(UPTIME_COUNTER_KEY, 59)
         with freeze_time("2020-01-02"):
-            with self.assertNumQueries(3):
+            with self.assertNumQueries(7):
                 dispatch_checks()
         self.assertEqual(mon.checks.count(), 2)
+        mon.refresh_from_db()
+        self.assertTrue(mon.latest_is_up)
+        self.assertEqual(mon.last_check_at, mon.checks.first().start_check)
+        self.assertEqual(mon.last_change, mon.checks.last().start_check)
+        self.assertEqual(
+            list(
+                mon.monitorcheckdailystatistic_set.order_by("date").values_list(
+                    "up_count", flat=True
+                )
+            ),
+            [1, 1],
+        )
 
     @aioresponses()
     def test_expected_response(self, mocked):
@@ -94,7 +116,43 @@ class UptimeTestCase(GlitchTipTestCase):
         self.assertEqual(check.data["payload"], "Status: Failure")
 
     @aioresponses()
-    @mock.patch("requests.post")
+    @mock.patch("apps.uptime.utils.CHUNK_SIZE", 3)
+    def test_expected_response_chunks(self, mocked):
+        test_url = "https://example.com"
+        monitor = {
+            "monitor_type": MonitorType.GET,
+            "url": test_url,
+            "timeout": None,
+            "expected_status": 200,
+            "expected_body": "Grüße OK",
+            "latest_is_up": None,
+        }
+
+        # Matches span chunks and split multibyte characters
+        mocked.get(test_url, status=200, body="Status: Grüße OK, more")
+        result = asyncio.run(fetch_all([monitor.copy()]))[0]
+        self.assertTrue(result["is_up"])
+        self.assertNotIn("data", result)
+
+        mocked.get(test_url, status=200, body="Status: Grüße, not OK")
+        result = asyncio.run(fetch_all([monitor.copy()]))[0]
+        self.assertFalse(result["is_up"])
+        self.assertEqual(result["data"]["payload"], "Status: Grüße, not OK")
+
+        # Snapshots are only kept when the miss is a change
+        mocked.get(test_url, status=200, body="Status: Grüße, not OK")
+        result = asyncio.run(fetch_all([{**monitor, "latest_is_up": False}]))[0]
+        self.assertFalse(result["is_up"])
+        self.assertNotIn("data", result)
+
+        # Only the end of a long body is kept
+        with mock.patch("apps.uptime.utils.PAYLOAD_SAVE_LIMIT", 6):
+            mocked.get(test_url, status=200, body="Status: Grüße, not OK")
+            result = asyncio.run(fetch_all([monitor.copy()]))[0]
+        self.assertEqual(result["data"]["payload"], "not OK")
+
+    @aioresponses()
+    @mock.patch("apps.alerts.webhooks.apost_webhook")
     def test_monitor_notifications(self, mocked, mock_post):
         self.create_user_and_project()
         test_url = "https://example.com"
@@ -143,7 +201,7 @@ class UptimeTestCase(GlitchTipTestCase):
         self.assertIn("is back up", mail.outbox[1].body)
 
     @aioresponses()
-    @mock.patch("requests.post")
+    @mock.patch("apps.alerts.webhooks.apost_webhook")
     def test_discord_webhook(self, mocked, mocked_post):
         self.create_user_and_project()
         test_url = "https://example.com"
@@ -197,7 +255,7 @@ class UptimeTestCase(GlitchTipTestCase):
 
         mocked.get(test_url, status=500)
         cache.set(UPTIME_COUNTER_KEY, 59)
-        with self.assertNumQueries(10):
+        with self.assertNumQueries(14):
             with freeze_time("2020-01-02"):
                 dispatch_checks()
             self.assertNotIn(user2.email, mail.outbox[0].to)
@@ -238,7 +296,7 @@ class UptimeTestCase(GlitchTipTestCase):
 
         mocked.get(test_url, status=500)
         cache.set(UPTIME_COUNTER_KEY, 59)
-        with self.assertNumQueries(10):
+        with self.assertNumQueries(14):
             with freeze_time("2020-01-02"):
                 dispatch_checks()
             self.assertNotIn(user2.email, mail.outbox[0].to)
@@ -297,6 +355,93 @@ class UptimeTestCase(GlitchTipTestCase):
         dispatch_checks()
         self.assertEqual(len(mail.outbox), 0)
 
+    @aioresponses()
+    def test_executor_perform_checks(self, mocked):
+        test_url = "https://example.com"
+        mocked.get(test_url, status=200)
+        monitor = baker.make(Monitor, url=test_url, monitor_type=MonitorType.GET)
+        self.assertTrue(monitor.checks.get().is_up)
+
+        mocked.get(test_url, status=500)
+        executor = UptimeExecutor(concurrency=2)
+        now = timezone.now()
+
+        async def run():
+            async with executor.get_session() as session:
+                await executor.perform_checks(
+                    session, asyncio.Semaphore(2), [monitor.pk], now
+                )
+
+        async_to_sync(run)()
+        monitor.refresh_from_db()
+        self.assertFalse(monitor.latest_is_up)
+        self.assertEqual(monitor.last_change, now)
+        self.assertEqual(monitor.checks.count(), 2)
+
+    @mock.patch("apps.uptime.tasks.perform_checks.run")
+    def test_check_statistics(self, _):
+        monitor = baker.make(Monitor, url="https://example.com")
+        first_check = datetime(2020, 1, 1, 10, 15, tzinfo=dt_timezone.utc)
+        update_check_statistics(
+            [{"id": monitor.pk, "is_up": True, "response_time": 40.5}], first_check
+        )
+        update_check_statistics(
+            [{"id": monitor.pk, "is_up": False, "response_time": None}],
+            first_check + timezone.timedelta(minutes=1),
+        )
+        for _ in range(3):
+            update_check_statistics(
+                [{"id": monitor.pk, "is_up": True, "response_time": 900}],
+                first_check + timezone.timedelta(hours=1),
+            )
+
+        hourly = MonitorCheckHourlyStatistic.objects.filter(monitor=monitor).order_by(
+            "date"
+        )
+        self.assertEqual(
+            list(hourly.values_list("date__hour", "up_count", "down_count")),
+            [(10, 1, 1), (11, 3, 0)],
+        )
+        daily = MonitorCheckDailyStatistic.objects.get(monitor=monitor)
+        self.assertEqual(daily.date, first_check.replace(hour=0, minute=0))
+        self.assertEqual((daily.up_count, daily.down_count), (4, 1))
+        self.assertEqual(sum(daily.response_times), 4)
+        # Upper bounds of the 40ms and 900ms buckets
+        self.assertEqual(daily.response_time_p50, 1084)
+        self.assertEqual(get_percentile(daily.response_times, 0.25), 48)
+        monitor.organization.quota.refresh_from_db()
+        self.assertEqual(monitor.organization.quota.uptime_check_event_count, 5)
+        self.assertIsNone(get_percentile([0] * 3, 0.5))
+
+    @mock.patch("apps.uptime.tasks.perform_checks.run")
+    def test_check_heartbeats(self, _):
+        now = timezone.now()
+        recent, late, down = baker.make(
+            Monitor, monitor_type=MonitorType.HEARTBEAT, interval=60, _quantity=3
+        )
+        baker.make(
+            MonitorCheck,
+            monitor=recent,
+            is_up=True,
+            start_check=now - timezone.timedelta(seconds=30),
+        )
+        baker.make(
+            MonitorCheck,
+            monitor=late,
+            is_up=True,
+            start_check=now - timezone.timedelta(minutes=5),
+        )
+        # Down checks recorded by dispatch are not heartbeats
+        baker.make(MonitorCheck, monitor=down, is_up=False, start_check=now)
+
+        monitors = list(Monitor.objects.order_by("pk").values())
+        with self.assertNumQueries(1):
+            results = check_heartbeats(monitors, now)
+        self.assertEqual(
+            {result["id"]: result["is_up"] for result in results},
+            {recent.pk: True, late.pk: False, down.pk: False},
+        )
+
     @mock.patch("apps.uptime.tasks.perform_checks.run")
     def test_bucket_monitors(self, _):
         interval_timeouts = [
@@ -315,7 +460,21 @@ class UptimeTestCase(GlitchTipTestCase):
                 timeout=timeout,
             )
         monitors = Monitor.objects.all()
-        bucket_monitors(monitors, 1)
+        result = bucket_monitors(monitors, 1)
+
+        self.assertEqual(list(result.keys()), list(range(1, 11)))
+        for tick, bucket in result.items():
+            for is_fast, tick_monitors in bucket.items():
+                expected = {
+                    monitor.pk
+                    for monitor in monitors
+                    if tick % monitor.interval == 0
+                    and (monitor.int_timeout < 30) == is_fast
+                }
+                self.assertEqual({monitor.pk for monitor in tick_monitors}, expected)
+        self.assertEqual(list(result[6].keys()), [True, False])
+        self.assertEqual(len(result[10][True]), 2)
+        self.assertNotIn(False, result[1])
 
     @mock.patch("apps.uptime.utils.asyncio.open_connection")
     def test_port_monitor(self, mocked):
@@ -1,58 +1,106 @@
 import asyncio
+import codecs
 import time
-from datetime import timedelta
+from contextlib import nullcontext
+from datetime import datetime, timedelta
 from ssl import SSLError
 
 import aiohttp
 from aiohttp import ClientTimeout
 from aiohttp.client_exceptions import ClientConnectorError
 from django.conf import settings
-from django.utils import timezone
+from django.db.models import Max
 
 from .constants import MonitorCheckReason, MonitorType
 from .models import MonitorCheck
 
 DEFAULT_TIMEOUT = 20  # Seconds
 PAYLOAD_LIMIT = 2_000_000  # 2mb
-PAYLOAD_SAVE_LIMIT = 500_000  # pseudo 500kb
+PAYLOAD_SAVE_LIMIT = 10_000  # Characters of the end of a missed body saved
+CHUNK_SIZE = 65_536  # Bytes read per chunk when matching expected body
+
+
+def get_decoder(response):
+    try:
+        return codecs.getincrementaldecoder(response.get_encoding())(errors="ignore")
+    except (RuntimeError, LookupError):
+        return codecs.getincrementaldecoder("utf-8")(errors="ignore")
+
+
+async def match_body(response, expected_body: str) -> tuple[bool, str]:
+    """
+    Scan up to PAYLOAD_LIMIT bytes of the response for expected_body, decoding
+    chunk by chunk and stopping as soon as it's found. Only a bounded tail of the
+    text is carried over, to match across chunk boundaries and to return the last
+    PAYLOAD_SAVE_LIMIT characters as a snapshot on a miss.
+    """
+    decoder = get_decoder(response)
+    keep = max(len(expected_body) - 1, PAYLOAD_SAVE_LIMIT)
+    tail = ""
+    remaining = PAYLOAD_LIMIT
+    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+        chunk = chunk[:remaining]
+        remaining -= len(chunk)
+        text = tail + decoder.decode(chunk)
+        if expected_body in text:
+            return True, ""
+        tail = text[-keep:]
+        if not remaining:
+            break
+    return False, tail[-PAYLOAD_SAVE_LIMIT:]
 
 
 async def process_response(monitor, response):
     if response.status == monitor["expected_status"]:
         if monitor["expected_body"]:
-            # Limit size to 2MB
-            body = await response.content.read(PAYLOAD_LIMIT)
-            try:
-                encoding = response.get_encoding()
-                payload = body.decode(encoding, errors="ignore")
-            except RuntimeError:
-                payload = body.decode(errors="ignore")
-            if monitor["expected_body"] in payload:
+            is_match, payload = await match_body(response, monitor["expected_body"])
+            if is_match:
                 monitor["is_up"] = True
             else:
                 monitor["reason"] = MonitorCheckReason.BODY
+                # Only save on changes
                 if monitor["latest_is_up"] != monitor["is_up"]:
-                    # Save only first 500k chars, to roughly reduce disk usage
-                    # Note that a unicode char is not always one byte
-                    # Only save on changes
-                    monitor["data"] = {"payload": payload[:PAYLOAD_SAVE_LIMIT]}
+                    monitor["data"] = {"payload": payload}
         else:
             monitor["is_up"] = True
     else:
         monitor["reason"] = MonitorCheckReason.STATUS
 
 
+def get_session_headers():
+    return {"User-Agent": "GlitchTip/" + settings.GLITCHTIP_VERSION}
+
+
+def check_heartbeats(monitors, now: datetime):
+    """
+    Heartbeat monitors are up when a heartbeat came in within their interval.
+    Resolve all of them with one grouped query for each monitor's latest up check.
+    """
+    if not monitors:
+        return monitors
+    longest_interval = timedelta(seconds=max(m["interval"] for m in monitors))
+    last_heartbeats = dict(
+        MonitorCheck.objects.filter(
+            monitor_id__in=[monitor["id"] for monitor in monitors],
+            is_up=True,
+            start_check__gte=now - longest_interval,
+        )
+        .order_by()
+        .values("monitor_id")
+        .annotate(last_heartbeat=Max("start_check"))
+        .values_list("monitor_id", "last_heartbeat")
+    )
+    for monitor in monitors:
+        last_heartbeat = last_heartbeats.get(monitor["id"])
+        monitor["is_up"] = bool(
+            last_heartbeat
+            and last_heartbeat >= now - timedelta(seconds=monitor["interval"])
+        )
+    return monitors
+
+
 async def fetch(session, monitor):
     monitor["is_up"] = False
-    if monitor["monitor_type"] == MonitorType.HEARTBEAT:
-        interval = timedelta(seconds=monitor["interval"])
-        if await MonitorCheck.objects.filter(
-            monitor_id=monitor["id"],
-            start_check__gte=timezone.now() - interval,
-        ).aexists():
-            monitor["is_up"] = True
-        return monitor
-
     url = monitor["url"]
     timeout = monitor["timeout"] or DEFAULT_TIMEOUT
     try:
@@ -86,11 +134,19 @@ async def fetch(session, monitor):
     return monitor
 
 
-async def fetch_all(monitors):
-    async with aiohttp.ClientSession(
-        headers={"User-Agent": "GlitchTip/" + settings.GLITCHTIP_VERSION}
-    ) as session:
-        results = await asyncio.gather(
-            *[fetch(session, monitor) for monitor in monitors], return_exceptions=True
-        )
-        return results
+async def fetch_all(monitors, session=None, semaphore=None):
+    """
+    Check monitors concurrently. Long lived callers may pass their own session
+    and a semaphore to bound the number of checks in flight.
+    """
+    if session is None:
+        async with aiohttp.ClientSession(headers=get_session_headers()) as session:
+            return await fetch_all(monitors, session, semaphore)
+
+    async def bounded_fetch(monitor):
+        async with semaphore or nullcontext():
+            return await fetch(session, monitor)
+
+    return await asyncio.gather(
+        *[bounded_fetch(monitor) for monitor in monitors], return_exceptions=True
+    )
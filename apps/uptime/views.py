@@ -1,4 +1,8 @@
-from django.db.models import Q
+from datetime import timedelta
+
+from django.db.models import FloatField, Q, Sum
+from django.db.models.functions import Cast, NullIf
+from django.utils import timezone
 from django.views.generic import DetailView
 
 from .models import Monitor, StatusPage
@@ -22,7 +26,13 @@ class StatusPageDetailView(DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["monitors"] = Monitor.objects.with_check_annotations().filter(
-            statuspage=self.object
+        # Uptime over the last 30 days, from daily check rollups
+        in_range = Q(
+            monitorcheckdailystatistic__date__gte=timezone.now() - timedelta(days=30)
+        )
+        up_count = Sum("monitorcheckdailystatistic__up_count", filter=in_range)
+        down_count = Sum("monitorcheckdailystatistic__down_count", filter=in_range)
+        context["monitors"] = Monitor.objects.filter(statuspage=self.object).annotate(
+            uptime=Cast(up_count, FloatField()) * 100 / NullIf(up_count + down_count, 0)
         )
         return context
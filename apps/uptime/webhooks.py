@@ -7,24 +7,30 @@ from apps.alerts.webhooks import (
     GoogleChatCard,
     MSTeamsSection,
     WebhookAttachment,
-    send_discord_webhook,
-    send_googlechat_webhook,
-    send_webhook,
+    WebhookRequest,
+    get_discord_webhook_payload,
+    get_googlechat_webhook_payload,
+    get_webhook_payload,
+    post_webhooks,
 )
 
 from .models import MonitorCheck
 
 
-def send_uptime_as_webhook(
-    recipient: AlertRecipient,
+def send_uptime_as_webhooks(
+    recipients: list[AlertRecipient],
     monitor_check_id: int,
     went_down: bool,
     last_change: datetime,
 ):
     """
-    Notification about uptime event via webhook.
+    Notification about uptime event via webhooks, sent concurrently.
     """
-    monitor_check = MonitorCheck.objects.get(pk=monitor_check_id)
+    if not recipients:
+        return []
+    monitor_check = MonitorCheck.objects.select_related("monitor").get(
+        pk=monitor_check_id
+    )
     monitor = monitor_check.monitor
 
     message = (
@@ -35,26 +41,44 @@ def send_uptime_as_webhook(
     subject = "GlitchTip Uptime Alert"
     title = monitor.name
 
-    if recipient.recipient_type == RecipientType.GENERAL_WEBHOOK:
-        attachment = WebhookAttachment(
-            title, monitor.get_detail_url(), message
-        )
-        section = MSTeamsSection(str(monitor.name), message)
-        return send_webhook(recipient.url, subject, [attachment], [section])
-    elif recipient.recipient_type == RecipientType.GOOGLE_CHAT:
-        card = GoogleChatCard().construct_uptime_card(
-            title=subject,
-            subtitle=title,
-            text=message,
-            url=monitor.get_detail_url(),
-        )
-        return send_googlechat_webhook(recipient.url, [card])
-    elif recipient.recipient_type == RecipientType.DISCORD:
-        embed = DiscordEmbed(
-            title=title,
-            description=message,
-            color=None,
-            fields=[],
-            url=monitor.get_detail_url(),
-        )
-        return send_discord_webhook(recipient.url, subject, [embed])
+    requests: list[WebhookRequest] = []
+    for recipient in recipients:
+        if recipient.recipient_type == RecipientType.GENERAL_WEBHOOK:
+            attachment = WebhookAttachment(title, monitor.get_detail_url(), message)
+            section = MSTeamsSection(str(monitor.name), message)
+            payload = get_webhook_payload(subject, [attachment], [section])
+        elif recipient.recipient_type == RecipientType.GOOGLE_CHAT:
+            card = GoogleChatCard().construct_uptime_card(
+                title=subject,
+                subtitle=title,
+                text=message,
+                url=monitor.get_detail_url(),
+            )
+            payload = get_googlechat_webhook_payload([card])
+        elif recipient.recipient_type == RecipientType.DISCORD:
+            embed = DiscordEmbed(
+                title=title,
+                description=message,
+                color=None,
+                fields=[],
+                url=monitor.get_detail_url(),
+            )
+            payload = get_discord_webhook_payload(subject, [embed])
+        else:
+            continue
+        requests.append(WebhookRequest(recipient.url, payload))
+    return post_webhooks(requests)
+
+
+def send_uptime_as_webhook(
+    recipient: AlertRecipient,
+    monitor_check_id: int,
+    went_down: bool,
+    last_change: datetime,
+):
+    """
+    Notification about uptime event via webhook.
+    """
+    return send_uptime_as_webhooks(
+        [recipient], monitor_check_id, went_down, last_change
+    )
@@ -46,25 +46,25 @@ class UserManager(BaseUserManager):
         queryset = self.filter(
             organizations_ext_organizationuser__teams__projects__projectalert__notification=notification
         )
-        return self._exclude_recipients(queryset, notification.project_alert.project)
+        return self._exclude_recipients(queryset, notification.project_alert.project_id)
 
     def uptime_monitor_recipients(self, monitor):
         """Distinct users associated with a project uptime monitor who should receive alerts"""
         queryset = self.filter(
             organizations_ext_organizationuser__teams__projects__monitor=monitor
         )
-        return self._exclude_recipients(queryset, monitor.project)
+        return self._exclude_recipients(queryset, monitor.project_id)
 
-    def _exclude_recipients(self, queryset, project):
+    def _exclude_recipients(self, queryset, project_id: int):
         """Exclude from queryset users who have a preference not to receive notifications"""
         from apps.projects.models import UserProjectAlert
 
         explicit_off = UserProjectAlert.objects.filter(
-            user=OuterRef("pk"), project=project, status=ProjectAlertStatus.OFF
+            user=OuterRef("pk"), project_id=project_id, status=ProjectAlertStatus.OFF
         )
 
         has_project_alert = UserProjectAlert.objects.filter(
-            user=OuterRef("pk"), project=project
+            user=OuterRef("pk"), project_id=project_id
         )
 
         return queryset.exclude(
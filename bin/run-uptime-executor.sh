@@ -0,0 +1,4 @@
+#!/usr/bin/env bash
+set -e
+
+exec ./manage.py run_uptime_executor --skip-checks
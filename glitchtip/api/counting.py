@@ -0,0 +1,75 @@
+"""
+Count strategies calculate the X-Hits total for paginated list endpoints.
+
+Counting a large, joined queryset can cost as much as fetching the page itself.
+Endpoints may pick a cheaper strategy via @paginate(count_strategy=...).
+"""
+
+import hashlib
+from typing import TYPE_CHECKING
+
+import orjson
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+
+if TYPE_CHECKING:
+    from django.db.models import QuerySet
+
+
+class CountStrategy:
+    async def acount(self, queryset: "QuerySet", max_hits: int) -> int:
+        raise NotImplementedError
+
+
+class ExactCount(CountStrategy):
+    """Count every row, ignoring max_hits"""
+
+    async def acount(self, queryset: "QuerySet", max_hits: int) -> int:
+        return await queryset.order_by().acount()
+
+
+class CappedCount(CountStrategy):
+    """Count rows, but stop at max_hits"""
+
+    async def acount(self, queryset: "QuerySet", max_hits: int) -> int:
+        return await queryset.order_by()[:max_hits].acount()
+
+
+class EstimatedCount(CountStrategy):
+    """
+    Use the postgres planner's row estimate from EXPLAIN. This never executes the
+    query, but may be inaccurate when table statistics are stale or filters are
+    correlated.
+    """
+
+    async def acount(self, queryset: "QuerySet", max_hits: int) -> int:
+        explain = await sync_to_async(queryset.order_by().explain)(format="json")
+        plan = orjson.loads(explain)[0]["Plan"]
+        return min(int(plan["Plan Rows"]), max_hits)
+
+
+class CachedCount(CountStrategy):
+    """
+    Cache the result of another strategy by query fingerprint for a short time.
+    The fingerprint is the compiled SQL and parameters, so any change to filters
+    or permissions results in a different cache key.
+    """
+
+    def __init__(self, strategy: CountStrategy | None = None, timeout: int = 60):
+        self.strategy = strategy or CappedCount()
+        self.timeout = timeout
+
+    def get_cache_key(self, queryset: "QuerySet", max_hits: int) -> str:
+        sql, params = queryset.order_by().query.sql_with_params()
+        fingerprint = hashlib.sha1(
+            f"{sql}{params!r}{max_hits}".encode(), usedforsecurity=False
+        ).hexdigest()
+        return f"pagination_count:{fingerprint}"
+
+    async def acount(self, queryset: "QuerySet", max_hits: int) -> int:
+        key = self.get_cache_key(queryset, max_hits)
+        count = await cache.aget(key)
+        if count is None:
+            count = await self.strategy.acount(queryset, max_hits)
+            await cache.aset(key, count, self.timeout)
+        return count
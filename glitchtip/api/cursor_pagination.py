@@ -1,23 +1,40 @@
-from base64 import b64decode, b64encode
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from dataclasses import dataclass
 from typing import Any, List, Optional
 from urllib import parse
 
-from django.db.models import QuerySet
+import orjson
+from django.core.exceptions import FieldDoesNotExist, FieldError, ValidationError
+from django.db.models import F, Func, Q, QuerySet, Value
+from django.db.models import Field as ModelField
+from django.db.models.lookups import GreaterThan, LessThan
 from django.http import HttpRequest
 from django.utils.translation import gettext as _
 from ninja import Field, Schema
+from ninja.errors import HttpError
 from ninja.pagination import PaginationBase
 from pydantic import field_validator
 
-# Code in this file is taken directly from https://github.com/vitalik/django-ninja/pull/836
-# and should be swapped out once that MR is merged.
+# Originally based on https://github.com/vitalik/django-ninja/pull/836
+# Reworked to use compound (sort value, primary key) keyset cursors so that every
+# page costs the same regardless of depth and ties in the sort value never cause
+# skipped or repeated results.
+
 
 @dataclass
 class Cursor:
-    offset: int = 0
     reverse: bool = False
-    position: Optional[str] = None
+    position: Optional[list] = None
+
+
+class RowValue(Func):
+    """
+    SQL row constructor such as (last_seen, id). Comparing two row values lets
+    postgres satisfy a keyset cursor with a single index range scan.
+    """
+
+    template = "(%(expressions)s)"
+    output_field = ModelField()
 
 
 def _clamp(val: int, min_: int, max_: int) -> int:
@@ -46,6 +63,83 @@ def _replace_query_param(url: str, key: str, val: str) -> str:
     return parse.urlunsplit((scheme, netloc, path, query, fragment))
 
 
+def _get_keyset_ordering(queryset: QuerySet) -> tuple[str, ...]:
+    """
+    Return the queryset ordering with the primary key appended as a tie breaker,
+    in the same direction as the primary sort, so that the ordering is total.
+    """
+    order = tuple(queryset.query.order_by)
+    pk_name = queryset.model._meta.pk.name
+    if any(name.lstrip("-") in ("pk", pk_name) for name in order):
+        return order
+    prefix = "-" if order[0].startswith("-") else ""
+    return order + (prefix + pk_name,)
+
+
+def _get_order_field(
+    queryset: QuerySet, name: str
+) -> tuple[Optional[ModelField], bool]:
+    """
+    Get the output field for an ordering name and whether it may be null.
+    Unknown expressions are treated as nullable.
+    """
+    if name in queryset.query.annotations:
+        try:
+            return queryset.query.annotations[name].output_field, True
+        except FieldError:
+            return None, True
+    if name == "pk":
+        return queryset.model._meta.pk, False
+    try:
+        field = queryset.model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None, True
+    return field, field.null
+
+
+def _keyset_filter(queryset: QuerySet, order: tuple, position: list):
+    """
+    Build a filter matching rows strictly after position in the given order.
+
+    When every column is non-null and sorted in the same direction this is a row
+    value comparison such as (last_seen, id) < (%s, %s). Otherwise it is expanded
+    into the equivalent boolean form, respecting postgres' default of sorting
+    nulls last in ascending order and first in descending order.
+    """
+    columns = []
+    for name, value in zip(order, position):
+        field, nullable = _get_order_field(queryset, name.lstrip("-"))
+        if field is not None and value is not None:
+            value = field.to_python(value)
+        columns.append((name.lstrip("-"), name.startswith("-"), value, field, nullable))
+
+    descending = {column[1] for column in columns}
+    if len(descending) == 1 and not any(
+        column[2] is None or column[4] for column in columns
+    ):
+        lookup = LessThan if descending.pop() else GreaterThan
+        return lookup(
+            RowValue(*[F(column[0]) for column in columns]),
+            RowValue(*[Value(column[2], output_field=column[3]) for column in columns]),
+        )
+
+    condition = Q()
+    equal = Q()
+    for name, is_descending, value, field, nullable in columns:
+        if value is None:
+            after = Q(**{f"{name}__isnull": False}) if is_descending else None
+            same = Q(**{f"{name}__isnull": True})
+        else:
+            after = Q(**{f"{name}__{'lt' if is_descending else 'gt'}": value})
+            if nullable and not is_descending:
+                after |= Q(**{f"{name}__isnull": True})
+            same = Q(**{name: value})
+        if after is not None:
+            condition |= equal & after
+        equal &= same
+    return condition
+
+
 class CursorPagination(PaginationBase):
     class Input(Schema):
         limit: Optional[int] = Field(
@@ -62,20 +156,16 @@ class CursorPagination(PaginationBase):
                 return Cursor()
 
             try:
-                querystring = b64decode(encoded_cursor).decode()
-                tokens = parse.parse_qs(querystring, keep_blank_values=True)
-
-                offset = int(tokens.get("o", ["0"])[0])
-                offset = _clamp(offset, 0, CursorPagination._offset_cutoff)
-
-                reverse = tokens.get("r", ["0"])[0]
-                reverse = bool(int(reverse))
-
-                position = tokens.get("p", [None])[0]
+                padding = "=" * (-len(encoded_cursor) % 4)
+                tokens = orjson.loads(urlsafe_b64decode(encoded_cursor + padding))
+                if not isinstance(tokens, list) or not tokens:
+                    raise ValueError
+                reverse = bool(tokens[0])
+                position = tokens[1:] or None
             except (TypeError, ValueError) as e:
                 raise ValueError(_("Invalid cursor.")) from e
 
-            return Cursor(offset=offset, reverse=reverse, position=position)
+            return Cursor(reverse=reverse, position=position)
 
     class Output(Schema):
         results: List[Any] = Field(description=_("The page of objects."))
@@ -92,7 +182,6 @@ class CursorPagination(PaginationBase):
     items_attribute = "results"
     default_ordering = ("-created",)
     max_page_size = 100
-    _offset_cutoff = 100  # limit to protect against possibly malicious queries
 
     def paginate_queryset(
         self, queryset: QuerySet, pagination: Input, request: HttpRequest, **params
@@ -101,220 +190,94 @@ class CursorPagination(PaginationBase):
 
         if not queryset.query.order_by:
             queryset = queryset.order_by(*self.default_ordering)
-
-        order = queryset.query.order_by
         total_count = queryset.count()
 
-        base_url = request.build_absolute_uri()
         cursor = pagination.cursor
+        queryset, order = self._get_keyset_queryset(queryset, cursor)
+        results = list(queryset[: limit + 1])
+        page, next, previous = self._get_page(
+            results, cursor, order, limit, request.build_absolute_uri()
+        )
 
-        if cursor.reverse:
-            queryset = queryset.order_by(*_reverse_order(order))
-
-        if cursor.position is not None:
-            is_reversed = order[0].startswith("-")
-            order_attr = order[0].lstrip("-")
+        return {
+            "results": page,
+            "count": total_count,
+            "next": next,
+            "previous": previous,
+        }
 
-            if cursor.reverse != is_reversed:
-                queryset = queryset.filter(**{f"{order_attr}__lt": cursor.position})
-            else:
-                queryset = queryset.filter(**{f"{order_attr}__gt": cursor.position})
+    def _get_keyset_queryset(
+        self, queryset: QuerySet, cursor: Cursor
+    ) -> tuple[QuerySet, tuple]:
+        """
+        Order the queryset by (sort value, pk) in the direction of the cursor and
+        filter it to rows following the cursor position.
+        """
+        order = _get_keyset_ordering(queryset)
+        scan_order = _reverse_order(order) if cursor.reverse else order
+        queryset = queryset.order_by(*scan_order)
 
-        # If we have an offset cursor then offset the entire page by that amount.
-        # We also always fetch an extra item in order to determine if there is a
-        # page following on from this one.
-        results = list(queryset[cursor.offset : cursor.offset + limit + 1])
+        if cursor.position is not None:
+            if len(cursor.position) != len(order):
+                raise HttpError(400, _("Invalid cursor."))
+            try:
+                keyset_filter = _keyset_filter(queryset, scan_order, cursor.position)
+            except ValidationError as e:
+                raise HttpError(400, _("Invalid cursor.")) from e
+            queryset = queryset.filter(keyset_filter)
+        return queryset, order
+
+    def _get_page(
+        self, results: list, cursor: Cursor, order: tuple, limit: int, base_url: str
+    ) -> tuple[list, Optional[str], Optional[str]]:
+        """
+        Split the page from the extra lookahead item and build the next and
+        previous links. Each link's position is the key of the page's boundary item.
+        """
         page = list(results[:limit])
-
-        # Determine the position of the final item following the page.
-        if len(results) > len(page):
-            has_following_position = True
-            following_position = self._get_position_from_instance(results[-1], order)
-        else:
-            has_following_position = False
-            following_position = None
+        has_following = len(results) > len(page)
 
         if cursor.reverse:
-            # If we have a reverse queryset, then the query ordering was in reverse
-            # so we need to reverse the items again before returning them to the user.
+            # The query ordering was reversed, so put the page back in order
             page = list(reversed(page))
+            has_next = cursor.position is not None
+            has_previous = has_following
+        else:
+            has_next = has_following
+            has_previous = cursor.position is not None
 
-            has_next = (cursor.position is not None) or (cursor.offset > 0)
-            has_previous = has_following_position
-            next_position = cursor.position if has_next else None
-            previous_position = following_position if has_previous else None
+        if page:
+            first_position = self._get_position_from_instance(page[0], order)
+            last_position = self._get_position_from_instance(page[-1], order)
         else:
-            has_next = has_following_position
-            has_previous = (cursor.position is not None) or (cursor.offset > 0)
-            next_position = following_position if has_next else None
-            previous_position = cursor.position if has_previous else None
+            first_position = last_position = cursor.position
 
-        return {
-            "results": page,
-            "count": total_count,
-            "next": self.next_link(
-                base_url,
-                page,
-                cursor,
-                order,
-                has_previous,
-                limit,
-                next_position,
-                previous_position,
-            )
+        next = (
+            self._encode_cursor(Cursor(position=last_position), base_url)
             if has_next
-            else None,
-            "previous": self.previous_link(
-                base_url,
-                page,
-                cursor,
-                order,
-                has_next,
-                limit,
-                next_position,
-                previous_position,
-            )
+            else None
+        )
+        previous = (
+            self._encode_cursor(Cursor(reverse=True, position=first_position), base_url)
             if has_previous
-            else None,
-        }
+            else None
+        )
+        return page, next, previous
 
     def _encode_cursor(self, cursor: Cursor, base_url: str) -> str:
-        tokens = {}
-        if cursor.offset != 0:
-            tokens["o"] = str(cursor.offset)
-        if cursor.reverse:
-            tokens["r"] = "1"
-        if cursor.position is not None:
-            tokens["p"] = cursor.position
-
-        querystring = parse.urlencode(tokens, doseq=True)
-        encoded = b64encode(querystring.encode()).decode()
-        return _replace_query_param(base_url, "cursor", encoded)
-
-    def next_link(
-        self,
-        base_url: str,
-        page: list,
-        cursor: Cursor,
-        order: tuple,
-        has_previous: bool,
-        limit: int,
-        next_position: str,
-        previous_position: str,
-    ) -> str:
-        if page and cursor.reverse and cursor.offset:
-            # If we're reversing direction and we have an offset cursor
-            # then we cannot use the first position we find as a marker.
-            compare = self._get_position_from_instance(page[-1], order)
-        else:
-            compare = next_position
-        offset = 0
-
-        has_item_with_unique_position = False
-        for item in reversed(page):
-            position = self._get_position_from_instance(item, order)
-            if position != compare:
-                # The item in this position and the item following it
-                # have different positions. We can use this position as
-                # our marker.
-                has_item_with_unique_position = True
-                break
-
-            # The item in this position has the same position as the item
-            # following it, we can't use it as a marker position, so increment
-            # the offset and keep seeking to the previous item.
-            compare = position
-            offset += 1
-
-        if page and not has_item_with_unique_position:
-            # There were no unique positions in the page.
-            if not has_previous:
-                # We are on the first page.
-                # Our cursor will have an offset equal to the page size,
-                # but no position to filter against yet.
-                offset = limit
-                position = None
-            elif cursor.reverse:
-                # The change in direction will introduce a paging artifact,
-                # where we end up skipping forward a few extra items.
-                offset = 0
-                position = previous_position
+        tokens = [int(cursor.reverse)] + (cursor.position or [])
+        encoded = urlsafe_b64encode(orjson.dumps(tokens, default=str)).decode()
+        return _replace_query_param(base_url, "cursor", encoded.rstrip("="))
+
+    def _get_position_from_instance(self, instance, ordering: tuple) -> list:
+        position = []
+        for name in ordering:
+            field_name = name.lstrip("-")
+            if isinstance(instance, dict):
+                attr = instance[field_name]
+            elif field_name == "pk":
+                attr = instance.pk
             else:
-                # Use the position from the existing cursor and increment
-                # it's offset by the page size.
-                offset = cursor.offset + limit
-                position = previous_position
-
-        if not page:
-            position = next_position
-
-        next_cursor = Cursor(offset=offset, reverse=False, position=position)
-        return self._encode_cursor(next_cursor, base_url)
-
-    def previous_link(
-        self,
-        base_url: str,
-        page: list,
-        cursor: Cursor,
-        order: tuple,
-        has_next: bool,
-        limit: int,
-        next_position: str,
-        previous_position: str,
-    ):
-        if page and not cursor.reverse and cursor.offset:
-            # If we're reversing direction and we have an offset cursor
-            # then we cannot use the first position we find as a marker.
-            compare = self._get_position_from_instance(page[0], order)
-        else:
-            compare = previous_position
-        offset = 0
-
-        has_item_with_unique_position = False
-        for item in page:
-            position = self._get_position_from_instance(item, order)
-            if position != compare:
-                # The item in this position and the item following it
-                # have different positions. We can use this position as
-                # our marker.
-                has_item_with_unique_position = True
-                break
-
-            # The item in this position has the same position as the item
-            # following it, we can't use it as a marker position, so increment
-            # the offset and keep seeking to the previous item.
-            compare = position
-            offset += 1
-
-        if page and not has_item_with_unique_position:
-            # There were no unique positions in the page.
-            if not has_next:
-                # We are on the final page.
-                # Our cursor will have an offset equal to the page size,
-                # but no position to filter against yet.
-                offset = limit
-                position = None
-            elif cursor.reverse:
-                # Use the position from the existing cursor and increment
-                # it's offset by the page size.
-                offset = cursor.offset + limit
-                position = next_position
-            else:
-                # The change in direction will introduce a paging artifact,
-                # where we end up skipping back a few extra items.
-                offset = 0
-                position = next_position
-
-        if not page:
-            position = previous_position
-
-        cursor = Cursor(offset=offset, reverse=True, position=position)
-        return self._encode_cursor(cursor, base_url)
-
-    def _get_position_from_instance(self, instance, ordering) -> str:
-        field_name = ordering[0].lstrip("-")
-        if isinstance(instance, dict):
-            attr = instance[field_name]
-        else:
-            attr = getattr(instance, field_name)
-        return str(attr)
+                attr = getattr(instance, field_name)
+            position.append(attr)
+        return position
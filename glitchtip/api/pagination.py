@@ -5,7 +5,8 @@ from asgiref.sync import sync_to_async
 from django.http import HttpRequest, HttpResponse
 from ninja.conf import settings as ninja_settings
 
-from .cursor_pagination import CursorPagination, _clamp, _reverse_order
+from .counting import CappedCount, CountStrategy
+from .cursor_pagination import CursorPagination, _clamp
 
 if TYPE_CHECKING:
     from django.db.models import QuerySet
@@ -17,6 +18,14 @@ class AsyncLinkHeaderPagination(CursorPagination):
     # Remove Output schema because we only want to return a list of items
     Output = None
 
+    def __init__(self, *, count_strategy: CountStrategy | None = None, **kwargs):
+        """
+        count_strategy determines how the X-Hits total is calculated, for example
+        @paginate(count_strategy=CachedCount(EstimatedCount()))
+        """
+        super().__init__(**kwargs)
+        self.count_strategy = count_strategy or CappedCount()
+
     async def apaginate_queryset(
         self,
         queryset: "QuerySet",
@@ -35,82 +44,19 @@ class AsyncLinkHeaderPagination(CursorPagination):
         if not queryset.query.order_by:
             queryset = queryset.order_by(*self.default_ordering)
 
-        order = queryset.query.order_by
-
-        base_url = request.build_absolute_uri()
         cursor = pagination.cursor
-
-        if cursor.reverse:
-            queryset = queryset.order_by(*_reverse_order(order))
-
-        if cursor.position is not None:
-            is_reversed = order[0].startswith("-")
-            order_attr = order[0].lstrip("-")
-
-            if cursor.reverse != is_reversed:
-                queryset = queryset.filter(**{f"{order_attr}__lt": cursor.position})
-            else:
-                queryset = queryset.filter(**{f"{order_attr}__gt": cursor.position})
+        queryset, order = self._get_keyset_queryset(queryset, cursor)
 
         @sync_to_async
         def get_results():
-            return list(queryset[cursor.offset : cursor.offset + limit + 1])
+            return list(queryset[: limit + 1])
 
         results = await get_results()
-        page = list(results[:limit])
-
-        if len(results) > len(page):
-            has_following_position = True
-            following_position = self._get_position_from_instance(results[-1], order)
-        else:
-            has_following_position = False
-            following_position = None
-
-        if cursor.reverse:
-            page = list(reversed(page))
-
-            has_next = (cursor.position is not None) or (cursor.offset > 0)
-            has_previous = has_following_position
-            next_position = cursor.position if has_next else None
-            previous_position = following_position if has_previous else None
-        else:
-            has_next = has_following_position
-            has_previous = (cursor.position is not None) or (cursor.offset > 0)
-            next_position = following_position if has_next else None
-            previous_position = cursor.position if has_previous else None
-
-        next = (
-            self.next_link(
-                base_url,
-                page,
-                cursor,
-                order,
-                has_previous,
-                limit,
-                next_position,
-                previous_position,
-            )
-            if has_next
-            else None
-        )
-
-        previous = (
-            self.previous_link(
-                base_url,
-                page,
-                cursor,
-                order,
-                has_next,
-                limit,
-                next_position,
-                previous_position,
-            )
-            if has_previous
-            else None
-        )
+        base_url = request.build_absolute_uri()
+        page, next, previous = self._get_page(results, cursor, order, limit, base_url)
 
         total_count = 0
-        if has_next or has_previous:
+        if next or previous:
             total_count = await self._aitems_count(full_queryset)
         else:
             total_count = len(page)
@@ -138,4 +84,4 @@ class AsyncLinkHeaderPagination(CursorPagination):
         return page
 
     async def _aitems_count(self, queryset: "QuerySet") -> int:
-        return await queryset.order_by()[: self.max_hits].acount()  # type: ignore
+        return await self.count_strategy.acount(queryset, self.max_hits)
@@ -2,10 +2,12 @@ from dateutil.relativedelta import relativedelta
 from django.conf import settings
 
 from apps.issue_events.models import IssueEvent, IssueTag
-from apps.performance.models import TransactionEvent
+from apps.performance.models import TransactionEvent, TransactionGroupTag
 from apps.projects.models import (
     IssueEventProjectHourlyStatistic,
+    IssueEventProjectMinuteStatistic,
     TransactionEventProjectHourlyStatistic,
+    TransactionEventProjectMinuteStatistic,
 )
 from apps.uptime.models import MonitorCheck
 from psqlextra.partitioning import (
@@ -30,6 +32,12 @@ project_stat_strategy = PostgresCurrentTimePartitioningStrategy(
     count=4,
     max_age=relativedelta(days=settings.GLITCHTIP_MAX_EVENT_LIFE_DAYS * 4),
 )
+# Minute statistics only serve short ranges, stats_v2 allows at most 1000 intervals
+project_minute_stat_strategy = PostgresCurrentTimePartitioningStrategy(
+    size=PostgresTimePartitionSize(days=1),
+    count=2,
+    max_age=relativedelta(days=2),
+)
 uptime_strategy = PostgresCurrentTimePartitioningStrategy(
     size=PostgresTimePartitionSize(days=1),
     count=4,
@@ -43,12 +51,23 @@ manager = PostgresPartitioningManager(
         PostgresPartitioningConfig(
             model=TransactionEvent, strategy=transaction_strategy
         ),
+        PostgresPartitioningConfig(
+            model=TransactionGroupTag, strategy=transaction_strategy
+        ),
         PostgresPartitioningConfig(
             model=IssueEventProjectHourlyStatistic, strategy=project_stat_strategy
         ),
         PostgresPartitioningConfig(
             model=TransactionEventProjectHourlyStatistic, strategy=project_stat_strategy
         ),
+        PostgresPartitioningConfig(
+            model=IssueEventProjectMinuteStatistic,
+            strategy=project_minute_stat_strategy,
+        ),
+        PostgresPartitioningConfig(
+            model=TransactionEventProjectMinuteStatistic,
+            strategy=project_minute_stat_strategy,
+        ),
         PostgresPartitioningConfig(model=MonitorCheck, strategy=uptime_strategy),
     ]
 )
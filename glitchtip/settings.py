@@ -111,6 +111,30 @@ GLITCHTIP_MAX_FILE_LIFE_DAYS = env.int(
 # Check if a throttle is needed 1 out of every 5000 event requests
 GLITCHTIP_THROTTLE_CHECK_INTERVAL = env.int("GLITCHTIP_THROTTLE_CHECK_INTERVAL", 5000)
 
+# Dynamic transaction sampling, for projects with a transaction sample rate below 1.
+# Always keep transactions at least this slow (milliseconds), and the first
+# transactions of each transaction name per minute, per web worker.
+GLITCHTIP_SAMPLING_SLOW_TRANSACTION_MS = env.int(
+    "GLITCHTIP_SAMPLING_SLOW_TRANSACTION_MS", 3000
+)
+GLITCHTIP_SAMPLING_MIN_PER_TRANSACTION = env.int(
+    "GLITCHTIP_SAMPLING_MIN_PER_TRANSACTION", 5
+)
+
+# Event id dedupe backend, "key" (a cache key per event), "set" or "bloom".
+# The compact set and bloom backends require a redis cache.
+GLITCHTIP_EVENT_DEDUPE = env.str("GLITCHTIP_EVENT_DEDUPE", "key")
+GLITCHTIP_EVENT_DEDUPE_BLOOM_CAPACITY = env.int(
+    "GLITCHTIP_EVENT_DEDUPE_BLOOM_CAPACITY", 100_000
+)
+GLITCHTIP_EVENT_DEDUPE_BLOOM_ERROR_RATE = env.float(
+    "GLITCHTIP_EVENT_DEDUPE_BLOOM_ERROR_RATE", 1e-6
+)
+
+# Days that event ids are kept in redis, to find an event's day partition when
+# looking it up by id. Older events are found with a slower query. 0 disables.
+GLITCHTIP_EVENT_LOCATOR_DAYS = env.int("GLITCHTIP_EVENT_LOCATOR_DAYS", 7)
+
 # Freezes acceptance of new events, for use during db maintenance
 MAINTENANCE_EVENT_FREEZE = env.bool("MAINTENANCE_EVENT_FREEZE", False)
 
@@ -497,6 +521,11 @@ if broker_sentinel_password := env.str("CELERY_BROKER_SENTINEL_KWARGS_PASSWORD",
 # Time in seconds to debounce some frequently run tasks
 TASK_DEBOUNCE_DELAY = env.int("TASK_DEBOUNCE_DELAY", 30)
 UPTIME_CHECK_INTERVAL = 10
+# Perform uptime checks in the long lived run_uptime_executor process, requires redis
+UPTIME_EXECUTOR = env.bool("UPTIME_EXECUTOR", False)
+# Maximum checks in flight and connections per host for the uptime executor
+UPTIME_EXECUTOR_CONCURRENCY = env.int("UPTIME_EXECUTOR_CONCURRENCY", 1000)
+UPTIME_EXECUTOR_LIMIT_PER_HOST = env.int("UPTIME_EXECUTOR_LIMIT_PER_HOST", 10)
 ALERT_NOTIFICATION_INTERVAL = env.int("ALERT_NOTIFICATION_INTERVAL", 60)
 CELERY_BEAT_SCHEDULE = {
     "send-alert-notifications": {
@@ -514,6 +543,15 @@ CELERY_BEAT_SCHEDULE = {
 }
 # Maximum number of issues send in a single alert payload
 MAX_ISSUES_PER_ALERT = env.int("MAX_ISSUES_PER_ALERT", 3)
+# Seconds to coalesce an alert's notifications into one digest, 0 sends immediately
+ALERT_DIGEST_WINDOW = env.int("ALERT_DIGEST_WINDOW", 0)
+# Maximum deliveries per alert recipient per hour, by recipient type. 0 is unlimited
+ALERT_RATE_LIMITS = {
+    "email": env.int("ALERT_EMAIL_RATE_LIMIT", 0),
+    "webhook": env.int("ALERT_WEBHOOK_RATE_LIMIT", 0),
+    "discord": env.int("ALERT_DISCORD_RATE_LIMIT", 0),
+    "googlechat": env.int("ALERT_GOOGLE_CHAT_RATE_LIMIT", 0),
+}
 
 if os.environ.get("CACHE_URL"):
     CACHES = {
@@ -766,9 +804,14 @@ if BILLING_ENABLED:
     STRIPE_LIVE_PUBLIC_KEY = env.str("STRIPE_LIVE_PUBLIC_KEY", None)
     STRIPE_LIVE_SECRET_KEY = env.str("STRIPE_LIVE_SECRET_KEY", None)
     DJSTRIPE_WEBHOOK_SECRET = env.str("DJSTRIPE_WEBHOOK_SECRET", None)
+    # Throttling reads real time quota counters, reconciled hourly
     CELERY_BEAT_SCHEDULE["set-organization-throttle"] = {
         "task": "apps.organizations_ext.tasks.set_organization_throttle",
-        "schedule": crontab(hour=7, minute=1),
+        "schedule": 10,
+    }
+    CELERY_BEAT_SCHEDULE["reconcile-organization-quotas"] = {
+        "task": "apps.organizations_ext.tasks.reconcile_organization_quotas",
+        "schedule": crontab(minute=1),
     }
     CELERY_BEAT_SCHEDULE["warn-organization-throttle"] = {
         "task": "apps.djstripe_ext.tasks.warn_organization_throttle",
@@ -4,6 +4,8 @@ from django.core.management import call_command
 from apps.files.tasks import cleanup_old_files
 from apps.issue_events.maintenance import cleanup_old_issues
 from apps.performance.maintenance import cleanup_old_transaction_events
+from apps.projects.maintenance import cleanup_old_daily_statistics
+from apps.uptime.maintenance import cleanup_old_check_statistics
 
 
 @shared_task
@@ -15,3 +17,5 @@ def perform_maintenance():
     cleanup_old_transaction_events()
     cleanup_old_files()
     cleanup_old_issues()
+    cleanup_old_daily_statistics()
+    cleanup_old_check_statistics()
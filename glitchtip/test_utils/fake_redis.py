@@ -0,0 +1,179 @@
+"""
+In memory stand in for the redis commands GlitchTip uses directly
+
+Tests run with a local memory cache, so code paths that call redis, rather than
+the Django cache, are exercised by patching get_redis_connection with FakeRedis,
+or the ingest async client with FakeAsyncRedis. Keys expire by time.time(), so
+expiry follows freezegun.
+"""
+
+import time
+from datetime import datetime
+
+from redis.commands.core import BitFieldOperation
+
+
+def _encode(value) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode()
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data: dict[bytes, object] = {}
+        self.expiry: dict[bytes, float] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def _get(self, key, default=None):
+        key = _encode(key)
+        if key in self.expiry and self.expiry[key] <= time.time():
+            self.delete(key)
+        if key not in self.data and default is not None:
+            self.data[key] = default
+        return self.data.get(key)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def keys(self, pattern="*"):
+        return [key for key in list(self.data) if self._get(key) is not None]
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(_encode(key), None)
+            self.expiry.pop(_encode(key), None)
+
+    def expire(self, key, seconds):
+        self.expiry[_encode(key)] = time.time() + seconds
+
+    def expireat(self, key, when):
+        if isinstance(when, datetime):
+            when = when.timestamp()
+        self.expiry[_encode(key)] = when
+        self._get(key)
+
+    def ttl(self, key):
+        if self._get(key) is None:
+            return -2
+        if (expiry := self.expiry.get(_encode(key))) is None:
+            return -1
+        return round(expiry - time.time())
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        mapping = {**(mapping or {}), **({field: value} if field else {})}
+        hash_ = self._get(key, {})
+        added = sum(_encode(f) not in hash_ for f in mapping)
+        hash_.update({_encode(f): _encode(v) for f, v in mapping.items()})
+        return added
+
+    def hget(self, key, field):
+        return (self._get(key) or {}).get(_encode(field))
+
+    def hmget(self, key, fields):
+        hash_ = self._get(key) or {}
+        return [hash_.get(_encode(field)) for field in fields]
+
+    def hincrby(self, key, field, amount=1):
+        hash_ = self._get(key, {})
+        value = int(hash_.get(_encode(field), 0)) + amount
+        hash_[_encode(field)] = _encode(value)
+        return value
+
+    def sadd(self, key, *values):
+        set_ = self._get(key, set())
+        added = sum(_encode(v) not in set_ for v in values)
+        set_.update(_encode(v) for v in values)
+        return added
+
+    def sismember(self, key, value):
+        return int(_encode(value) in (self._get(key) or set()))
+
+    def getbit(self, key, offset):
+        bitmap = self._get(key) or bytearray()
+        byte = offset // 8
+        return (bitmap[byte] >> (7 - offset % 8)) & 1 if byte < len(bitmap) else 0
+
+    def setbit(self, key, offset, value):
+        bitmap = self._get(key, bytearray())
+        previous = self.getbit(key, offset)
+        byte = offset // 8
+        if byte >= len(bitmap):
+            bitmap.extend(bytes(byte + 1 - len(bitmap)))
+        mask = 1 << (7 - offset % 8)
+        bitmap[byte] = bitmap[byte] | mask if value else bitmap[byte] & ~mask
+        return previous
+
+    def bitfield(self, key, default_overflow=None):
+        return BitFieldOperation(self, key, default_overflow=default_overflow)
+
+    def execute_command(self, *args):
+        """Only BITFIELD with u1 GET and SET operations is supported"""
+        command, key, *operations = args
+        assert command == "BITFIELD"
+        results = []
+        while operations:
+            operation, encoding, offset, *operations = operations
+            assert encoding == "u1"
+            if operation == "GET":
+                results.append(self.getbit(key, int(offset)))
+            else:
+                value, *operations = operations
+                results.append(self.setbit(key, int(offset), int(value)))
+        return results
+
+
+class FakePipeline:
+    """Queues commands, run in order by execute"""
+
+    def __init__(self, client: FakeRedis):
+        self.client = client
+        self.commands: list[tuple[str, tuple, dict]] = []
+        self.command_count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def __getattr__(self, name):
+        getattr(self.client, name)  # Unsupported commands raise AttributeError
+
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    def bitfield(self, key, default_overflow=None):
+        return BitFieldOperation(self, key, default_overflow=default_overflow)
+
+    def execute(self):
+        commands, self.commands = self.commands, []
+        self.command_count += len(commands)
+        return [
+            getattr(self.client, name)(*args, **kwargs)
+            for name, args, kwargs in commands
+        ]
+
+
+class FakeAsyncRedis(FakeRedis):
+    def pipeline(self, transaction=True):
+        return FakeAsyncPipeline(self)
+
+
+class FakeAsyncPipeline(FakePipeline):
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def execute(self):
+        return super().execute()
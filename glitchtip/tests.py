@@ -1,8 +1,13 @@
 import requests_mock
+from asgiref.sync import async_to_sync
 from django.test import TestCase
 from django.urls import reverse
 from model_bakery import baker
 
+from apps.issue_events.models import Issue
+
+from .api.counting import CachedCount, CappedCount, EstimatedCount, ExactCount
+
 
 class SettingsTestCase(TestCase):
     def setUp(self):
@@ -62,3 +67,33 @@ class APIRootTestCase(TestCase):
         res = self.client.get(self.url, headers=headers)
         self.assertContains(res, auth_token.token)
         self.assertContains(res, user.email)
+
+
+class CountStrategyTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = baker.make("projects.Project")
+        baker.make("issue_events.Issue", project=cls.project, _quantity=5)
+
+    def setUp(self):
+        self.queryset = Issue.objects.filter(project=self.project)
+
+    def test_exact_and_capped(self):
+        self.assertEqual(async_to_sync(ExactCount().acount)(self.queryset, 3), 5)
+        self.assertEqual(async_to_sync(CappedCount().acount)(self.queryset, 3), 3)
+
+    def test_estimated(self):
+        with self.assertNumQueries(1):
+            count = async_to_sync(EstimatedCount().acount)(self.queryset, 3)
+        self.assertLessEqual(count, 3)
+
+    def test_cached(self):
+        strategy = CachedCount(timeout=5)
+        self.assertEqual(async_to_sync(strategy.acount)(self.queryset, 100), 5)
+        baker.make("issue_events.Issue", project=self.project)
+        with self.assertNumQueries(0):
+            count = async_to_sync(strategy.acount)(self.queryset, 100)
+        self.assertEqual(count, 5)
+        self.assertEqual(
+            async_to_sync(strategy.acount)(self.queryset.filter(level=1), 100), 0
+        )